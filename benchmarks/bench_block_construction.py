@@ -0,0 +1,92 @@
+"""
+Benchmark of the construction of a `SodaCLCheck` block holding a large checks
+file, comparing the YAML validation it used to run on every construction,
+a full parse with the pure-Python safe loader, with the current one.
+
+Usage:
+    python benchmarks/bench_block_construction.py --runs 50 --tables 500
+"""
+import argparse
+import statistics
+import time
+
+from yaml import SafeLoader, load
+
+from prefect_soda_core.sodacl_check import SodaCLCheck
+from prefect_soda_core.yaml_parsing import SafeLoader as FastSafeLoader
+
+
+def _build_sodacl_yaml_str(tables):
+    """
+    Build a SodaCL checks file with a few checks for each of `tables` tables.
+    """
+    sections = []
+    for index in range(tables):
+        sections.append(
+            f"checks for table_{index}:\n"
+            "  - row_count > 0\n"
+            "  - missing_count(id) = 0\n"
+            "  - duplicate_count(id) = 0\n"
+            "  - freshness(updated_at) < ${MAX_DELAY}\n"
+        )
+    return "".join(sections)
+
+
+def _time_runs(function, runs):
+    """
+    Call `function` `runs` times and return the durations, in seconds.
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _report(name, durations):
+    """
+    Print a summary of the provided durations.
+    """
+    print(
+        f"{name:<16} runs={len(durations):<4} "
+        f"mean={statistics.mean(durations) * 1000:9.3f}ms "
+        f"median={statistics.median(durations) * 1000:9.3f}ms "
+        f"min={min(durations) * 1000:9.3f}ms "
+        f"max={max(durations) * 1000:9.3f}ms"
+    )
+
+
+def main():
+    """
+    Run the benchmark and print its results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20, help="Runs per mode.")
+    parser.add_argument(
+        "--tables", type=int, default=500, help="Tables in the checks file."
+    )
+    args = parser.parse_args()
+
+    sodacl_yaml_str = _build_sodacl_yaml_str(args.tables)
+    print(f"checks file: {len(sodacl_yaml_str.splitlines())} lines")
+
+    def construct_block():
+        """
+        Construct a block, validating its YAML string.
+        """
+        SodaCLCheck(sodacl_yaml_path="checks.yaml", sodacl_yaml_str=sodacl_yaml_str)
+
+    _report(
+        "python_loader",
+        _time_runs(lambda: load(sodacl_yaml_str, Loader=SafeLoader), args.runs),
+    )
+    _report(
+        "fast_loader",
+        _time_runs(lambda: load(sodacl_yaml_str, Loader=FastSafeLoader), args.runs),
+    )
+    _report("block", _time_runs(construct_block, args.runs))
+
+
+if __name__ == "__main__":
+    main()
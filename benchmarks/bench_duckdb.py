@@ -0,0 +1,248 @@
+"""
+End-to-end benchmark of `soda_scan_execute` against synthetic tables stored
+in a local DuckDB database file, which runs fully offline.
+
+A table is generated for each requested number of rows, then every SodaCL
+suite is scanned against each table with the requested execution mode,
+reporting the scan latency, the throughput in rows per second and the peak
+resident memory of the benchmark process and of its subprocesses.
+The benchmark stops as soon as a scan has errors or warnings, so that only
+scans that ran all their checks are timed.
+
+Peak memory is a high-water mark over the whole benchmark process, so run one
+execution mode per invocation to compare execution modes. Scans run by the
+`fork_server` execution mode are children of the fork server, which outlives
+the benchmark, and are thus not accounted for in the peak memory.
+
+Requires the DuckDB data source of soda-core:
+    pip install -e ".[duckdb]"
+
+Usage:
+    python benchmarks/bench_duckdb.py --rows 10000 1000000 --execution-mode cli
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+import duckdb
+from prefect import flow
+
+from prefect_soda_core.scan_engines import ExecutionMode
+from prefect_soda_core.soda_configuration import SodaConfiguration
+from prefect_soda_core.sodacl_check import SodaCLCheck
+from prefect_soda_core.tasks import soda_scan_execute
+from prefect_soda_core.worker_pool import SodaWorkerPool
+
+# SodaCL suites scanned against each table, `{table}` being its name
+SODACL_SUITES = {
+    "row_count": "checks for {table}:\n  - row_count > 0\n",
+    "missing": (
+        "checks for {table}:\n"
+        "  - missing_count(customer_id) = 0\n"
+        "  - missing_percent(email) < 5\n"
+    ),
+    "duplicate": "checks for {table}:\n  - duplicate_count(id) = 0\n",
+    "schema": (
+        "checks for {table}:\n"
+        "  - schema:\n"
+        "      fail:\n"
+        "        when required column missing:\n"
+        "          [id, customer_id, email, amount, updated_at]\n"
+    ),
+    "freshness": "checks for {table}:\n  - freshness(updated_at) < 2d\n",
+}
+# All the checks of the suites above, in a single scan
+SODACL_SUITES["all"] = "checks for {table}:\n" + "".join(
+    suite.split(":\n", 1)[1] for suite in SODACL_SUITES.values()
+)
+
+# Synthetic table with 1% of missing emails, updated over the last day
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {table} AS
+SELECT
+    i AS id,
+    i % 100000 AS customer_id,
+    CASE WHEN i % 100 = 0 THEN NULL ELSE 'customer_' || i || '@example.com' END
+        AS email,
+    (i % 100000) / 100.0 AS amount,
+    CAST(current_timestamp - to_seconds(i % 86400) AS TIMESTAMP) AS updated_at
+FROM range({rows}) AS t(i)
+"""
+
+
+def _get_peak_memory_mb(who):
+    """
+    Get the peak resident memory of the current process or of its
+    terminated subprocesses, in MB.
+    """
+    max_rss = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is expressed in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+def _generate_tables(database_path, rows_list):
+    """
+    Generate a synthetic table for each number of rows, if not already there,
+    and return the table names keyed by number of rows.
+    """
+    tables = {}
+    with duckdb.connect(database_path) as connection:
+        for rows in rows_list:
+            table = f"orders_{rows}"
+            start = time.perf_counter()
+            connection.execute(CREATE_TABLE_SQL.format(table=table, rows=rows))
+            print(
+                f"Table {table} ready in {time.perf_counter() - start:.1f}s",
+                file=sys.stderr,
+            )
+            tables[rows] = table
+    return tables
+
+
+def _report(name, rows, durations):
+    """
+    Print a summary of the provided scan durations.
+    """
+    median = statistics.median(durations)
+    print(
+        f"{name:<24} runs={len(durations):<4} "
+        f"median={median * 1000:10.1f}ms "
+        f"min={min(durations) * 1000:10.1f}ms "
+        f"max={max(durations) * 1000:10.1f}ms "
+        f"throughput={rows / median:14,.0f} rows/s"
+    )
+
+
+def _check_scan_results(scan_results, suite, table):
+    """
+    Stop the benchmark if a scan did not complete, with an exit code other
+    than 0 or 2, so that the durations of failed scans are never reported.
+    """
+    if scan_results["hasErrors"] or scan_results["hasWarnings"]:
+        raise RuntimeError(
+            f"The {suite} suite did not complete against {table}, "
+            "its durations are not representative."
+        )
+
+
+@flow(name="bench_duckdb")
+async def bench_duckdb(
+    configuration, tables, suites, runs, work_dir, execution_mode, worker_pool
+):
+    """
+    Scan every suite against every table in a flow run,
+    as tasks need a run context.
+    """
+    durations = {}
+    for rows, table in tables.items():
+        for suite in suites:
+            checks = SodaCLCheck(
+                sodacl_yaml_path=os.path.join(work_dir, f"{suite}_{table}.yaml"),
+                sodacl_yaml_str=SODACL_SUITES[suite].format(table=table),
+            )
+            scan_durations = durations.setdefault((suite, rows), [])
+            for _ in range(runs):
+                start = time.perf_counter()
+                scan_results = await soda_scan_execute.fn(
+                    data_source_name="benchmark",
+                    configuration=configuration,
+                    checks=checks,
+                    variables=None,
+                    scan_results_file=os.path.join(work_dir, "scan_results.json"),
+                    return_scan_result_file_content=True,
+                    execution_mode=execution_mode,
+                    worker_pool=worker_pool,
+                )
+                scan_durations.append(time.perf_counter() - start)
+                _check_scan_results(scan_results, suite, table)
+    return durations
+
+
+def main():
+    """
+    Run the benchmark and print its results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3, help="Scans per suite.")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[10_000, 1_000_000],
+        help="Numbers of rows of the generated tables.",
+    )
+    parser.add_argument(
+        "--suites",
+        nargs="+",
+        choices=list(SODACL_SUITES),
+        default=list(SODACL_SUITES),
+        help="SodaCL suites to scan.",
+    )
+    parser.add_argument(
+        "--execution-mode",
+        choices=[execution_mode.value for execution_mode in ExecutionMode],
+        default=ExecutionMode.CLI.value,
+        help="Execution mode of the scans.",
+    )
+    parser.add_argument(
+        "--database",
+        help=(
+            "DuckDB database file holding the generated tables, kept between "
+            "invocations to skip generating them again. Default to a temporary file."
+        ),
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        database_path = args.database or os.path.join(work_dir, "benchmark.duckdb")
+        tables = _generate_tables(database_path, args.rows)
+
+        configuration = SodaConfiguration(
+            configuration_yaml_path=os.path.join(work_dir, "configuration.yaml"),
+            configuration_yaml_str=(
+                "data_source benchmark:\n"
+                "  type: duckdb\n"
+                f"  path: {os.path.abspath(database_path)}\n"
+                "  read_only: true\n"
+            ),
+        )
+        execution_mode = ExecutionMode(args.execution_mode)
+        worker_pool = (
+            SodaWorkerPool(size=1)
+            if execution_mode is ExecutionMode.WORKER_POOL
+            else None
+        )
+        try:
+            durations = asyncio.run(
+                bench_duckdb(
+                    configuration=configuration,
+                    tables=tables,
+                    suites=args.suites,
+                    runs=args.runs,
+                    work_dir=work_dir,
+                    execution_mode=execution_mode,
+                    worker_pool=worker_pool,
+                )
+            )
+        finally:
+            if worker_pool is not None:
+                # Workers are accounted for in the peak memory once terminated
+                worker_pool.shutdown()
+
+    for (suite, rows), scan_durations in durations.items():
+        _report(f"{suite} {rows:,} rows", rows, scan_durations)
+    print(
+        f"peak memory: benchmark={_get_peak_memory_mb(resource.RUSAGE_SELF):.0f}MB "
+        f"subprocesses={_get_peak_memory_mb(resource.RUSAGE_CHILDREN):.0f}MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
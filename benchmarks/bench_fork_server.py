@@ -0,0 +1,91 @@
+"""
+Benchmark of the start-up overhead of a Soda scan subprocess, comparing the
+`soda scan` CLI spawned through a shell with the `fork_server` execution mode.
+
+The benchmarked scan points to a configuration file that does not exist,
+so that soda-core fails fast and the measured time is dominated by the cost
+of starting the scan subprocess rather than by the scan itself.
+
+Like a flow script, this module imports Prefect at module level, which the
+scan subprocesses must not import again.
+
+Usage:
+    python benchmarks/bench_fork_server.py --runs 20
+"""
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from prefect import flow
+
+from prefect_soda_core.fork_server import execute_scan_in_fork_server
+from prefect_soda_core.scan_engines import build_soda_command
+
+
+def _time_runs(function, runs):
+    """
+    Call `function` `runs` times and return the durations, in seconds.
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _report(name, durations):
+    """
+    Print a summary of the provided durations.
+    """
+    print(
+        f"{name:<12} runs={len(durations):<4} "
+        f"mean={statistics.mean(durations) * 1000:9.1f}ms "
+        f"median={statistics.median(durations) * 1000:9.1f}ms "
+        f"min={min(durations) * 1000:9.1f}ms "
+        f"max={max(durations) * 1000:9.1f}ms"
+    )
+
+
+@flow
+def main():
+    """
+    Run the benchmark and print its results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Scans per mode.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scan_kwargs = dict(
+            data_source_name="benchmark",
+            configuration_yaml_path=str(Path(tmp_dir) / "configuration.yaml"),
+            sodacl_yaml_paths=[str(Path(tmp_dir) / "checks.yaml")],
+        )
+        command = build_soda_command(**scan_kwargs)
+
+        def run_cli():
+            """
+            Run the scan with the `soda` CLI.
+            """
+            subprocess.run(command, shell=True, capture_output=True)
+
+        def run_fork_server():
+            """
+            Run the scan in a subprocess forked from the fork server.
+            """
+            execute_scan_in_fork_server(**scan_kwargs)
+
+        # Start the fork server outside of the measured runs,
+        #   as it is started only once per worker process
+        run_fork_server()
+
+        _report("cli", _time_runs(run_cli, args.runs))
+        _report("fork_server", _time_runs(run_fork_server, args.runs))
+
+
+if __name__ == "__main__":
+    main()
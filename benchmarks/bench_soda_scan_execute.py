@@ -0,0 +1,187 @@
+"""
+Benchmark of the overhead of `soda_scan_execute`, broken down by phase,
+using a stub `soda` executable put on the `PATH` so that it runs offline.
+
+The phases are:
+- persist: persisting the configuration and checks blocks,
+- build_command: building the `soda scan` command,
+- spawn: from running the command until the stub `soda` starts,
+- log_capture: from the end of the stub startup delay until all the logs
+    are captured and the command exits,
+- parse_json: parsing the scan results file with `json.load`,
+- parse_results: parsing the scan results file into a `ScanResult`,
+- end_to_end: the whole `soda_scan_execute` task.
+
+Usage:
+    python benchmarks/bench_soda_scan_execute.py --runs 20 --log-lines 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import stat
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from prefect import flow
+from prefect_shell import shell_run_command
+
+from prefect_soda_core.scan_engines import build_soda_command
+from prefect_soda_core.scan_results import ScanResult
+from prefect_soda_core.soda_configuration import SodaConfiguration
+from prefect_soda_core.sodacl_check import SodaCLCheck
+from prefect_soda_core.tasks import soda_scan_execute
+
+STUB_SODA_PATH = Path(__file__).parent / "stub_soda.py"
+
+
+def _install_stub_soda(bin_dir: Path):
+    """
+    Install a `soda` executable running the stub in `bin_dir`.
+    """
+    soda_path = bin_dir / "soda"
+    soda_path.write_text(
+        f'#!/bin/sh\nexec "{sys.executable}" "{STUB_SODA_PATH}" "$@"\n'
+    )
+    soda_path.chmod(soda_path.stat().st_mode | stat.S_IEXEC)
+
+
+def _report(name, durations):
+    """
+    Print a summary of the provided durations.
+    """
+    print(
+        f"{name:<14} runs={len(durations):<4} "
+        f"mean={statistics.mean(durations) * 1000:9.3f}ms "
+        f"median={statistics.median(durations) * 1000:9.3f}ms "
+        f"min={min(durations) * 1000:9.3f}ms "
+        f"max={max(durations) * 1000:9.3f}ms"
+    )
+
+
+@flow(name="bench_soda_scan_execute")
+async def bench_soda_scan_execute(runs: int, work_dir: str, stub_env: dict):
+    """
+    Measure every phase of the scans in a flow run, as tasks need a run context.
+    """
+    configuration = SodaConfiguration(
+        configuration_yaml_path=os.path.join(work_dir, "configuration.yaml"),
+        configuration_yaml_str="data_source benchmark:\n  type: postgres\n",
+    )
+    checks = SodaCLCheck(
+        sodacl_yaml_path=os.path.join(work_dir, "checks.yaml"),
+        sodacl_yaml_str="checks for benchmark:\n  - row_count > 0\n",
+    )
+    scan_results_file = os.path.join(work_dir, "scan_results.json")
+    timing_file = os.path.join(work_dir, "timing.json")
+    env = {**stub_env, "STUB_SODA_TIMING_FILE": timing_file}
+    durations = {
+        phase: []
+        for phase in (
+            "persist",
+            "build_command",
+            "spawn",
+            "log_capture",
+            "parse_json",
+            "parse_results",
+            "end_to_end",
+        )
+    }
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        configuration.persist_configuration()
+        checks.persist_checks()
+        durations["persist"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        command = build_soda_command(
+            data_source_name="benchmark",
+            configuration_yaml_path=configuration.configuration_yaml_path,
+            sodacl_yaml_paths=[checks.sodacl_yaml_path],
+            scan_results_file=scan_results_file,
+        )
+        durations["build_command"].append(time.perf_counter() - start)
+
+        start = time.time()
+        try:
+            await shell_run_command.fn(command=command, env=env, return_all=True)
+        except RuntimeError:
+            # Failing scans are measured too
+            pass
+        end = time.time()
+        with open(timing_file, "r") as f:
+            timing = json.load(f)
+        durations["spawn"].append(timing["started_at"] - start)
+        durations["log_capture"].append(end - timing["ready_at"])
+
+        start = time.perf_counter()
+        with open(scan_results_file, "r") as f:
+            json.load(f)
+        durations["parse_json"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ScanResult.from_file(scan_results_file)
+        durations["parse_results"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        try:
+            await soda_scan_execute.fn(
+                data_source_name="benchmark",
+                configuration=configuration,
+                checks=checks,
+                variables=None,
+                scan_results_file=scan_results_file,
+                return_scan_result_file_content=True,
+                shell_env=env,
+            )
+        except RuntimeError:
+            pass
+        durations["end_to_end"].append(time.perf_counter() - start)
+
+    return durations
+
+
+def main():
+    """
+    Run the benchmark and print its results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Scans to run.")
+    parser.add_argument(
+        "--startup-delay", type=float, default=0, help="Stub startup delay, in s."
+    )
+    parser.add_argument("--log-lines", type=int, default=100, help="Log lines.")
+    parser.add_argument(
+        "--results-checks", type=int, default=100, help="Checks in scan results."
+    )
+    parser.add_argument("--exit-code", type=int, default=0, help="Scan exit code.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        bin_dir = Path(work_dir) / "bin"
+        bin_dir.mkdir()
+        _install_stub_soda(bin_dir)
+        os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ['PATH']}"
+
+        stub_env = {
+            "STUB_SODA_STARTUP_DELAY": str(args.startup_delay),
+            "STUB_SODA_LOG_LINES": str(args.log_lines),
+            "STUB_SODA_RESULTS_CHECKS": str(args.results_checks),
+            "STUB_SODA_EXIT_CODE": str(args.exit_code),
+        }
+        durations = asyncio.run(
+            bench_soda_scan_execute(
+                runs=args.runs, work_dir=work_dir, stub_env=stub_env
+            )
+        )
+
+    for phase, phase_durations in durations.items():
+        _report(phase, phase_durations)
+
+
+if __name__ == "__main__":
+    main()
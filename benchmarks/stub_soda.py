@@ -0,0 +1,70 @@
+"""
+Stub of the `soda` CLI used by the benchmarks, behaving like `soda scan`
+without connecting to any data source. Its behaviour is tuned through
+environment variables:
+
+- `STUB_SODA_STARTUP_DELAY`: Seconds to wait before producing any log,
+    to mimic the import of soda-core. Default to `0`.
+- `STUB_SODA_LOG_LINES`: Number of log lines to print. Default to `10`.
+- `STUB_SODA_RESULTS_CHECKS`: Number of checks in the scan results file,
+    written if `-srf` is provided. Default to `10`.
+- `STUB_SODA_EXIT_CODE`: Exit code of the scan. Default to `0`.
+- `STUB_SODA_TIMING_FILE`: File where the stub writes, as JSON, the times
+    at which it started and at which it was done with its startup delay.
+"""
+import json
+import os
+import sys
+import time
+
+
+def main():
+    """
+    Run the stub scan.
+    """
+    started_at = time.time()
+    time.sleep(float(os.environ.get("STUB_SODA_STARTUP_DELAY", "0")))
+    ready_at = time.time()
+
+    timing_file = os.environ.get("STUB_SODA_TIMING_FILE")
+    if timing_file:
+        with open(timing_file, "w") as f:
+            json.dump({"started_at": started_at, "ready_at": ready_at}, f)
+
+    log_lines = int(os.environ.get("STUB_SODA_LOG_LINES", "10"))
+    for index in range(log_lines):
+        print(f"[00:00:00] Stub log line {index} of the benchmark scan")
+    print("[00:00:00] All is good. No failures. No warnings. No errors.")
+    sys.stdout.flush()
+
+    args = sys.argv[1:]
+    if "-srf" in args:
+        checks_count = int(os.environ.get("STUB_SODA_RESULTS_CHECKS", "10"))
+        scan_results = {
+            "defaultDataSource": args[args.index("-d") + 1],
+            "scanStartTimestamp": "2023-01-01T00:00:00+00:00",
+            "scanEndTimestamp": "2023-01-01T00:00:01+00:00",
+            "hasErrors": False,
+            "hasWarnings": False,
+            "hasFailures": False,
+            "metrics": [],
+            "checks": [
+                {
+                    "name": f"row_count > {index}",
+                    "table": "benchmark",
+                    "outcome": "pass",
+                    "location": {"filePath": args[-1], "line": index, "col": 1},
+                    "diagnostics": {"value": index, "blocks": []},
+                }
+                for index in range(checks_count)
+            ],
+            "logs": [],
+        }
+        with open(args[args.index("-srf") + 1], "w") as f:
+            json.dump(scan_results, f)
+
+    sys.exit(int(os.environ.get("STUB_SODA_EXIT_CODE", "0")))
+
+
+if __name__ == "__main__":
+    main()
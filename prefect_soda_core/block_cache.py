@@ -0,0 +1,171 @@
+"""
+Worker-local cache of loaded Soda blocks, that can be used to avoid
+reading and validating the same block documents on every flow run.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Type, TypeVar
+
+from prefect.blocks.core import Block
+from prefect.utilities.asyncutils import sync_compatible
+
+B = TypeVar("B", bound=Block)
+
+
+def _get_block_document_checksum(block_document) -> str:
+    """
+    Get the SHA-256 checksum of the data of a block document.
+    """
+    data = json.dumps(block_document.data, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class BlockCache:
+    """
+    In-memory cache of loaded blocks, local to the current worker process.
+    Within `ttl_seconds` of being loaded, a block is served from memory
+    without calling the Prefect API. Once expired, its block document is
+    read again, and the block is only validated again if the checksum of
+    the block document data changed.
+
+    Args:
+        ttl_seconds: Number of seconds during which a loaded block is served
+            from memory. Default to `300`.
+        max_entries: Maximum number of blocks kept in the cache, the least
+            recently used ones being evicted first. Default to `128`.
+
+    Example:
+        Load blocks through the default block cache.
+        ```python
+        from prefect import flow
+        from prefect_soda_core.block_cache import get_default_block_cache
+        from prefect_soda_core.soda_configuration import SodaConfiguration
+        from prefect_soda_core.sodacl_check import SodaCLCheck
+
+        @flow
+        def run_soda_scan():
+            block_cache = get_default_block_cache()
+            soda_configuration_block = block_cache.load(
+                SodaConfiguration, "SODA_CONF_BLOCK_NAME"
+            )
+            sodacl_check_block = block_cache.load(
+                SodaCLCheck, "SODACL_CHECK_BLOCK_NAME"
+            )
+        ```
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 128):
+        if max_entries < 1:
+            raise ValueError("The cache must be able to hold at least 1 block.")
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Loaded blocks, with their load time and block document checksum,
+        #   ordered from the least to the most recently used
+        self._entries: "OrderedDict[Tuple[Type[Block], str], Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_entry(
+        self, key: Tuple[Type[Block], str]
+    ) -> Optional[Tuple[float, str, Block]]:
+        """
+        Get the entry of a block, marking it as the most recently used one.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _set_entry(self, key: Tuple[Type[Block], str], checksum: str, block: Block):
+        """
+        Store the entry of a block, evicting the least recently used ones.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), checksum, block)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @sync_compatible
+    async def load(self, block_class: Type[B], name: str) -> B:
+        """
+        Load a block, from memory if possible.
+
+        Args:
+            block_class: The class of the block to load,
+                like `SodaConfiguration` or `SodaCLCheck`.
+            name: The name of the block document.
+
+        Raises:
+            `ValueError` if the block document does not exist.
+
+        Returns:
+            A copy of the loaded block, that can be modified without
+                affecting the cached one.
+        """
+        key = (block_class, name)
+        entry = self._get_entry(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[2].copy()
+
+        # Relies on the same internals as `Block.load`, so that the block
+        #   is only validated again if its data changed
+        block_document, _ = await block_class._get_block_document(name)
+        checksum = _get_block_document_checksum(block_document)
+        if entry is not None and entry[1] == checksum:
+            block = entry[2]
+        else:
+            block = block_class._from_block_document(block_document)
+
+        self._set_entry(key, checksum, block)
+        return block.copy()
+
+    def invalidate(
+        self, block_class: Optional[Type[Block]] = None, name: Optional[str] = None
+    ):
+        """
+        Remove blocks from the cache, so that they are read again on next load.
+
+        Args:
+            block_class: The class of the blocks to remove. If not provided,
+                blocks of all classes are removed.
+            name: The name of the block document to remove. If not provided,
+                blocks of all names are removed.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if block_class is not None and key[0] is not block_class:
+                    continue
+                if name is not None and key[1] != name:
+                    continue
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        """
+        The number of blocks in the cache, expired ones included.
+        """
+        with self._lock:
+            return len(self._entries)
+
+
+_default_block_cache: Optional[BlockCache] = None
+_default_block_cache_lock = threading.Lock()
+
+
+def get_default_block_cache() -> BlockCache:
+    """
+    Get the block cache shared by the whole process, creating it on first use.
+
+    Returns:
+        The default `BlockCache`.
+    """
+    global _default_block_cache
+
+    with _default_block_cache_lock:
+        if _default_block_cache is None:
+            _default_block_cache = BlockCache()
+        return _default_block_cache
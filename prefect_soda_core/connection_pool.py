@@ -0,0 +1,272 @@
+"""
+Worker-local pool of data source connections, that can be used to reuse
+warehouse connections across the Soda scans run in the same process.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_PoolKey = Tuple[str, str]
+
+
+def _close_connection(connection: Any):
+    """
+    Close a connection, ignoring the errors of connections already broken.
+    """
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class DataSourceConnectionPool:
+    """
+    Pool of idle DB-API connections to data sources, local to the current
+    worker process and keyed by data source name and hash of the data source
+    configuration, so that a configuration change never reuses a connection
+    opened with the previous configuration.
+
+    A connection is handed out to a single scan at a time. Before being
+    handed out again, it is closed if it has been idle for more than
+    `idle_timeout_seconds`, and checked with `health_check_query` otherwise.
+
+    Args:
+        max_size: Maximum number of idle connections kept in the pool, the
+            least recently released ones being closed first. Default to `8`.
+        idle_timeout_seconds: Number of seconds after which an idle
+            connection is closed. Default to `300`.
+        health_check_query: The query run on an idle connection before
+            reusing it. If not provided, connections are reused unchecked.
+            Default to `SELECT 1`.
+
+    Example:
+        Reuse connections across in-process scans of the same worker.
+        ```python
+        from prefect import flow
+        from prefect_soda_core.tasks import soda_scan_execute
+
+        @flow
+        def run_soda_scans():
+            for checks in [orders_checks_block, users_checks_block]:
+                soda_scan_execute(
+                    data_source_name="datasource",
+                    configuration=soda_configuration_block,
+                    checks=checks,
+                    variables={"key": "value"},
+                    execution_mode="in_process",
+                    reuse_connections=True,
+                )
+        ```
+    """
+
+    def __init__(
+        self,
+        max_size: int = 8,
+        idle_timeout_seconds: float = 300,
+        health_check_query: Optional[str] = "SELECT 1",
+    ):
+        if max_size < 1:
+            raise ValueError("The pool must be able to hold at least 1 connection.")
+
+        self.max_size = max_size
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.health_check_query = health_check_query
+        # Idle connections, with their release time, ordered from the least
+        #   to the most recently released
+        self._idle: "OrderedDict[int, Tuple[_PoolKey, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(data_source_name: str, data_source_properties: Dict) -> _PoolKey:
+        """
+        Build the key of the connections to a data source.
+
+        Args:
+            data_source_name: The name of the data source.
+            data_source_properties: The configuration of the data source,
+                as parsed from the Soda configuration.
+
+        Returns:
+            The data source name and the SHA-256 hash of its configuration.
+        """
+        properties = json.dumps(data_source_properties, sort_keys=True, default=str)
+        return data_source_name, hashlib.sha256(properties.encode()).hexdigest()
+
+    def _is_healthy(self, connection: Any) -> bool:
+        """
+        Check that a connection can still run queries.
+        """
+        if self.health_check_query is None:
+            return True
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(self.health_check_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    def _pop_expired(self) -> List[Any]:
+        """
+        Remove the connections idle for too long, which must be done while
+        holding the lock, and return them to be closed.
+        """
+        expired_before = time.monotonic() - self.idle_timeout_seconds
+        expired_ids = [
+            connection_id
+            for connection_id, (_, released_at, _) in self._idle.items()
+            if released_at < expired_before
+        ]
+        return [self._idle.pop(connection_id)[2] for connection_id in expired_ids]
+
+    def acquire(self, key: _PoolKey) -> Optional[Any]:
+        """
+        Take a healthy idle connection out of the pool.
+
+        Args:
+            key: The key of the connections to the data source.
+
+        Returns:
+            The most recently released healthy connection with this key,
+                or `None` if there is none.
+        """
+        while True:
+            with self._lock:
+                to_close = self._pop_expired()
+                connection = None
+                for connection_id in reversed(self._idle):
+                    if self._idle[connection_id][0] == key:
+                        connection = self._idle.pop(connection_id)[2]
+                        break
+            for expired_connection in to_close:
+                _close_connection(expired_connection)
+
+            # Health checks run outside of the lock, as they query the warehouse
+            if connection is None or self._is_healthy(connection):
+                return connection
+            _close_connection(connection)
+
+    def release(self, key: _PoolKey, connection: Any):
+        """
+        Put a connection back into the pool, once the scan using it is done.
+        Its pending transaction, if any, is rolled back.
+
+        Args:
+            key: The key of the connections to the data source.
+            connection: The connection to put back.
+        """
+        try:
+            connection.rollback()
+        except Exception:
+            # Connections in autocommit mode may not support rollbacks, and
+            #   broken ones are discarded by the next health check
+            pass
+
+        with self._lock:
+            self._idle[id(connection)] = (key, time.monotonic(), connection)
+            to_close = self._pop_expired()
+            while len(self._idle) > self.max_size:
+                to_close.append(self._idle.popitem(last=False)[1][2])
+        for expired_connection in to_close:
+            _close_connection(expired_connection)
+
+    def clear(self):
+        """
+        Close all the idle connections of the pool.
+        """
+        with self._lock:
+            connections = [connection for _, _, connection in self._idle.values()]
+            self._idle.clear()
+        for connection in connections:
+            _close_connection(connection)
+
+    def __len__(self) -> int:
+        """
+        The number of idle connections in the pool.
+        """
+        with self._lock:
+            return len(self._idle)
+
+
+@contextmanager
+def pooled_data_source(
+    scan, data_source_name: str, pool: DataSourceConnectionPool
+) -> Iterator[None]:
+    """
+    Make a soda-core scan use a pooled connection to its data source, if any,
+    and put the connection of the data source back into the pool once
+    the scan in the context is done, instead of leaving it open.
+
+    The data source is registered in the data source manager of the scan,
+    which soda-core only connects when no data source is registered yet.
+
+    Args:
+        scan: The soda-core `Scan`, configured but not executed yet.
+        data_source_name: The name of the data source of the scan.
+        pool: The pool to take the connection from and put it back to.
+    """
+    data_source_manager = scan._data_source_manager
+    data_source_properties = data_source_manager.data_source_properties_by_name.get(
+        data_source_name
+    )
+    if not data_source_properties or not data_source_properties.get("type"):
+        # Misconfigured data sources are reported by soda-core
+        yield
+        return
+
+    from soda.execution.data_source import DataSource
+
+    key = pool.make_key(data_source_name, data_source_properties)
+    connection = pool.acquire(key)
+    if connection is not None:
+        data_source = DataSource.create(
+            scan._logs,
+            data_source_name,
+            data_source_properties["type"],
+            data_source_properties,
+        )
+        if data_source is None:
+            # Let soda-core report why the data source cannot be created
+            pool.release(key, connection)
+            connection = None
+        else:
+            data_source.connection = connection
+            data_source_manager.data_sources[data_source_name] = data_source
+
+    try:
+        yield
+    except BaseException:
+        if connection is not None:
+            _close_connection(connection)
+        raise
+
+    # On a miss, the connection opened by soda-core joins the pool
+    data_source = data_source_manager.data_sources.get(data_source_name)
+    if data_source is not None and data_source.connection is not None:
+        pool.release(key, data_source.connection)
+
+
+_default_connection_pool: Optional[DataSourceConnectionPool] = None
+_default_connection_pool_lock = threading.Lock()
+
+
+def get_default_connection_pool() -> DataSourceConnectionPool:
+    """
+    Get the connection pool shared by the whole process, creating it on first use.
+
+    Returns:
+        The default `DataSourceConnectionPool`.
+    """
+    global _default_connection_pool
+
+    with _default_connection_pool_lock:
+        if _default_connection_pool is None:
+            _default_connection_pool = DataSourceConnectionPool()
+        return _default_connection_pool
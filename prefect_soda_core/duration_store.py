@@ -0,0 +1,151 @@
+"""
+Local store of the durations of past Soda scans, that can be used to
+schedule the longest scans first.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+from prefect.settings import PREFECT_HOME
+
+T = TypeVar("T")
+
+# Number of most recent durations averaged to estimate the next one
+DURATION_HISTORY_SIZE = 10
+
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS scan_durations (
+    data_source_name TEXT NOT NULL,
+    checks_hash TEXT NOT NULL,
+    duration REAL NOT NULL,
+    recorded_at REAL NOT NULL
+)
+"""
+_CREATE_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS scan_durations_key
+ON scan_durations (data_source_name, checks_hash, recorded_at)
+"""
+
+
+def hash_sodacl_content(sodacl_yaml_str: str) -> str:
+    """
+    Get the hash identifying the content of a SodaCL checks file.
+
+    Args:
+        sodacl_yaml_str: The content of the SodaCL checks file.
+
+    Returns:
+        The SHA-256 hex digest of the content.
+    """
+    return hashlib.sha256(sodacl_yaml_str.encode()).hexdigest()
+
+
+class ScanDurationStore:
+    """
+    SQLite store of the wall-clock durations of Soda scans, keyed by data
+    source name and hash of the content of the checks.
+    It can be shared by several processes of the same machine.
+
+    Args:
+        path: The path of the SQLite database. If not provided,
+            `soda_scan_durations.db` in the Prefect home directory is used.
+
+    Example:
+        Run the longest scans first, based on the durations of past scans.
+        ```python
+        from prefect_soda_core.duration_store import ScanDurationStore
+        from prefect_soda_core.tasks import soda_scan_execute_fan_out
+
+        @flow
+        def run_soda_scans():
+            return soda_scan_execute_fan_out(
+                configuration=soda_configuration_block,
+                variables={"key": "value"},
+                scans=[("orders_db", orders_checks), ("users_db", users_checks)],
+                duration_store=ScanDurationStore(),
+            )
+        ```
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(PREFECT_HOME.value(), "soda_scan_durations.db")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(_CREATE_TABLE_SQL)
+            connection.execute(_CREATE_INDEX_SQL)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a new connection to the database, waiting for concurrent writers.
+        """
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, data_source_name: str, checks_hash: str, duration: float):
+        """
+        Record the duration of a scan.
+
+        Args:
+            data_source_name: The name of the data source of the scan.
+            checks_hash: The hash of the content of the checks of the scan.
+            duration: The wall-clock duration of the scan, in seconds.
+        """
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO scan_durations VALUES (?, ?, ?, ?)",
+                (data_source_name, checks_hash, duration, time.time()),
+            )
+
+    def get_expected_duration(
+        self, data_source_name: str, checks_hash: str
+    ) -> Optional[float]:
+        """
+        Estimate the duration of a scan from the most recent durations
+        recorded for the same data source and checks.
+
+        Args:
+            data_source_name: The name of the data source of the scan.
+            checks_hash: The hash of the content of the checks of the scan.
+
+        Returns:
+            The average of the most recent durations, in seconds,
+                or `None` if no duration was recorded.
+        """
+        with closing(self._connect()) as connection:
+            (expected_duration,) = connection.execute(
+                "SELECT AVG(duration) FROM ("
+                "  SELECT duration FROM scan_durations"
+                "  WHERE data_source_name = ? AND checks_hash = ?"
+                "  ORDER BY recorded_at DESC LIMIT ?"
+                ")",
+                (data_source_name, checks_hash, DURATION_HISTORY_SIZE),
+            ).fetchone()
+        return expected_duration
+
+    def sort_longest_first(
+        self, jobs: Sequence[T], get_key: Callable[[T], Sequence[str]]
+    ) -> List[T]:
+        """
+        Sort jobs by decreasing expected duration. Jobs without recorded
+        durations come first, as they may be the longest ones, and the order
+        of jobs with the same expected duration is kept.
+
+        Args:
+            jobs: The jobs to sort.
+            get_key: A function returning the data source name and
+                the checks hash of a job.
+
+        Returns:
+            The sorted jobs.
+        """
+        expected_durations = [self.get_expected_duration(*get_key(job)) for job in jobs]
+        order = sorted(
+            range(len(jobs)),
+            key=lambda index: (
+                expected_durations[index] is not None,
+                -(expected_durations[index] or 0),
+            ),
+        )
+        return [jobs[index] for index in order]
@@ -0,0 +1,129 @@
+"""
+Fork server that can be used to run every Soda scan in its own subprocess,
+forked from a parent that has already imported soda-core and the
+installed data source packages.
+"""
+import multiprocessing
+import threading
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+from prefect_soda_core.scan_engines import (
+    execute_scan_in_process,
+    get_installed_data_source_modules,
+    patched_environment,
+)
+
+_fork_server_context = None
+_fork_server_context_lock = threading.Lock()
+
+
+def _get_fork_server_context():
+    """
+    Get the multiprocessing context used to fork scan subprocesses,
+    configuring the modules preloaded by the fork server on first use.
+    """
+    global _fork_server_context
+
+    with _fork_server_context_lock:
+        if _fork_server_context is None:
+            context = multiprocessing.get_context("forkserver")
+            # The fork server imports these modules once, and every scan
+            #   subprocess then inherits them through copy-on-write memory.
+            #   `__main__` is the default preload, without which every scan
+            #   subprocess would import the flow module, and Prefect, again
+            context.set_forkserver_preload(
+                [
+                    "__main__",
+                    "prefect",
+                    "soda.scan",
+                    "prefect_soda_core.fork_server",
+                    *get_installed_data_source_modules(),
+                ]
+            )
+            _fork_server_context = context
+        return _fork_server_context
+
+
+def _run_scan_job(connection, job: Dict, env: Optional[Dict[str, str]] = None):
+    """
+    Entrypoint of a scan subprocess: run the scan job with the environment
+    variables of `env` and send its outcome back through `connection`.
+    """
+    try:
+        with patched_environment(env):
+            exit_code, soda_logs = execute_scan_in_process(**job)
+        connection.send((exit_code, soda_logs, None))
+    except Exception:
+        connection.send((None, None, traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def execute_scan_in_fork_server(
+    data_source_name: str,
+    configuration_yaml_path: str,
+    sodacl_yaml_paths: List[str],
+    variables: Optional[Dict[str, str]] = None,
+    scan_results_file: Optional[str] = None,
+    verbose: bool = False,
+    env: Optional[Dict[str, str]] = None,
+) -> Tuple[int, List[str]]:
+    """
+    Execute a Soda scan in a new subprocess forked from the fork server,
+    blocking until the scan is complete.
+    The fork server is started on first use and imports soda-core and
+    the installed soda-core data source packages once.
+
+    Args:
+        data_source_name: The name of the data source against
+            which the checks will be executed.
+        configuration_yaml_path: Path of the Soda configuration file.
+        sodacl_yaml_paths: Paths of the SodaCL checks files.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scan_results_file: The path to the file where the scan results
+            will be stored, if any.
+        verbose: Whether to run the checks with a verbose log or not.
+        env: A `Dict[str, str]` that contains environment variables
+            to set in the scan subprocess, on top of the ones it inherits
+            from the fork server.
+
+    Raises:
+        `RuntimeError` if the scan subprocess fails or dies
+            while running the scan.
+
+    Returns:
+        A tuple made of the scan exit code and the scan log lines.
+    """
+    context = _get_fork_server_context()
+    job = dict(
+        data_source_name=data_source_name,
+        configuration_yaml_path=configuration_yaml_path,
+        sodacl_yaml_paths=sodacl_yaml_paths,
+        variables=variables,
+        scan_results_file=scan_results_file,
+        verbose=verbose,
+    )
+
+    parent_connection, child_connection = context.Pipe(duplex=False)
+    process = context.Process(target=_run_scan_job, args=(child_connection, job, env))
+    process.start()
+    child_connection.close()
+
+    try:
+        exit_code, soda_logs, error = parent_connection.recv()
+    except EOFError as exc:
+        process.join()
+        raise RuntimeError(
+            "The Soda scan subprocess died while running the scan "
+            f"with exit code {process.exitcode}."
+        ) from exc
+    finally:
+        parent_connection.close()
+        process.join()
+
+    if error is not None:
+        raise RuntimeError(f"The Soda scan subprocess failed to run the scan: {error}")
+
+    return exit_code, soda_logs
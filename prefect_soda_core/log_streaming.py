@@ -0,0 +1,186 @@
+"""
+Utilities to consume the logs of Soda scans as they are produced,
+keeping memory usage flat no matter how verbose a scan is.
+"""
+import os
+import re
+import signal
+import subprocess
+import sys
+from collections import deque
+from typing import AsyncIterator, Dict, Optional
+
+from anyio import open_process
+from anyio.streams.text import TextReceiveStream
+
+from prefect_soda_core.scan_engines import SCAN_CHECKS_FAILED_EXIT_CODE
+from prefect_soda_core.scan_timing import (
+    PHASE_FIRST_OUTPUT,
+    PHASE_PROCESS_START,
+    ScanTimer,
+)
+
+# Soda ends every scan with problems with a summary line like
+#   "Oops! 1 error. 2 failures. 0 warnings. 3 pass."
+SUMMARY_COUNT_PATTERN = re.compile(r"(\d+) (error|failure|warning|pass)")
+
+# Soda lists the checks of each outcome under a line like "3/5 checks PASSED:",
+#   which is the only count of passing checks when all checks pass
+CHECKS_OUTCOME_PATTERN = re.compile(r"(\d+)/\d+ checks? (PASSED|WARNED|FAILED):")
+
+
+class ScanLogSummary:
+    """
+    Bounded summary of the logs of a Soda scan: the last log lines,
+    the number and size of all the log lines, and the outcome counters
+    reported by Soda at the end of the scan.
+
+    Args:
+        tail_size: Number of log lines kept at the end of the logs.
+            Default to `100`.
+    """
+
+    def __init__(self, tail_size: int = 100):
+        self.tail = deque(maxlen=tail_size)
+        self.lines_count = 0
+        self.bytes_count = 0
+        self.errors_count = 0
+        self.failures_count = 0
+        self.warnings_count = 0
+        self.passes_count = 0
+
+    def add_line(self, line: str):
+        """
+        Add a log line to the summary.
+
+        Args:
+            line: The log line, without its trailing new line.
+        """
+        self.tail.append(line)
+        self.lines_count += 1
+        self.bytes_count += len(line.encode()) + 1
+
+        counts = {
+            kind: int(count) for count, kind in SUMMARY_COUNT_PATTERN.findall(line)
+        }
+        checks_outcome = CHECKS_OUTCOME_PATTERN.search(line)
+        if checks_outcome is not None:
+            count, outcome = checks_outcome.groups()
+            if outcome == "PASSED":
+                self.passes_count = int(count)
+            elif outcome == "WARNED":
+                self.warnings_count = int(count)
+            else:
+                self.failures_count = int(count)
+
+        # Only the summary line reports all the outcome counters
+        if len(counts) == 4:
+            self.errors_count = counts["error"]
+            self.failures_count = counts["failure"]
+            self.warnings_count = counts["warning"]
+            self.passes_count = counts["pass"]
+
+    def to_dict(self) -> Dict:
+        """
+        Get the summary as a dictionary.
+
+        Returns:
+            The summary as a JSON-serializable dictionary.
+        """
+        return {
+            "tail": list(self.tail),
+            "lines": self.lines_count,
+            "bytes": self.bytes_count,
+            "errors": self.errors_count,
+            "failures": self.failures_count,
+            "warnings": self.warnings_count,
+            "passes": self.passes_count,
+        }
+
+
+def _kill_process_group(process):
+    """
+    Kill a process together with the processes of its session.
+    """
+    if sys.platform == "win32":
+        process.kill()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def stream_soda_scan_logs(
+    command: str,
+    env: Optional[Dict[str, str]] = None,
+    timer: Optional[ScanTimer] = None,
+) -> AsyncIterator[str]:
+    """
+    Run a `soda scan` command and yield its log lines as they are produced,
+    without keeping them in memory.
+
+    Args:
+        command: The `soda scan` command to run.
+        env: A `Dict[str, str]` that contains environment variables
+            to set on top of the current ones.
+        timer: The `ScanTimer` recording how long the process took to start
+            and to produce its first output, if any.
+
+    Raises:
+        `RuntimeError` if the command fails with an exit code different from
+            the one returned by Soda when checks fail.
+
+    Yields:
+        The log lines of the scan, without their trailing new line.
+
+    Example:
+        ```python
+        from prefect_soda_core.log_streaming import stream_soda_scan_logs
+
+        async for line in stream_soda_scan_logs("soda scan -d ds -c c.yml checks.yml"):
+            print(line)
+        ```
+    """
+    current_env = os.environ.copy()
+    current_env.update(env or {})
+
+    last_line = ""
+    # The scan runs in its own session, so that it can be stopped
+    #   together with the shell running it
+    timer = timer or ScanTimer()
+    with timer.phase(PHASE_PROCESS_START):
+        process = await open_process(
+            command,
+            env=current_env,
+            stderr=subprocess.STDOUT,
+            start_new_session=sys.platform != "win32",
+        )
+    first_output_timing = timer.start(PHASE_FIRST_OUTPUT)
+    try:
+        buffer = ""
+        async for text in TextReceiveStream(process.stdout):
+            first_output_timing.end()
+            buffer += text
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                last_line = line
+                yield line
+        if buffer:
+            last_line = buffer
+            yield buffer
+
+        await process.wait()
+    finally:
+        # Processes without any output end their first output phase on exit
+        first_output_timing.end()
+        # Do not leave the scan running if the consumer stopped early
+        if process.returncode is None:
+            _kill_process_group(process)
+            await process.wait()
+        await process.aclose()
+
+    if process.returncode not in (0, SCAN_CHECKS_FAILED_EXIT_CODE):
+        raise RuntimeError(
+            f"Command failed with exit code {process.returncode}:\n{last_line}\n"
+        )
@@ -0,0 +1,319 @@
+"""
+Metrics of Soda scans in the Prometheus text format, that can be exported
+through the textfile collector of the node exporter or a local HTTP endpoint.
+"""
+import os
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from prefect_soda_core.persistence import DEFAULT_FILE_MODE, _create_temporary_file
+
+# Upper bounds, in seconds, of the buckets of the duration histograms
+DEFAULT_DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+SCAN_STATUS_SUCCESS = "success"
+SCAN_STATUS_ERROR = "error"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Type and help of every metric, keyed by name without namespace
+_METRICS = {
+    "scans_started_total": ("counter", "Number of Soda scans started."),
+    "scans_finished_total": ("counter", "Number of Soda scans finished, by status."),
+    "scan_duration_seconds": ("histogram", "Wall-clock duration of Soda scans."),
+    "scan_queue_wait_seconds": (
+        "histogram",
+        "Time Soda scans waited for a concurrency slot before starting.",
+    ),
+    "scan_checks_total": ("counter", "Number of checks of Soda scans, by outcome."),
+    "scan_log_bytes_total": ("counter", "Size of the logs of Soda scans."),
+    "scan_results_bytes_total": ("counter", "Size of the results files of Soda scans."),
+}
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape_label_value(value: str) -> str:
+    """
+    Escape a label value for the Prometheus text format.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: _Labels) -> str:
+    """
+    Format labels for the Prometheus text format, like `{key="value"}`.
+    """
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels)
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value for the Prometheus text format.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class ScanMetrics:
+    """
+    Thread-safe counters and histograms of Soda scans: scans started and
+    finished, their durations and the time they waited for a concurrency slot,
+    the outcomes of their checks, and the size of their logs and results.
+    All the metrics are labelled with the name of the scanned data source.
+
+    Args:
+        textfile_path: The path of the file, with a `.prom` extension, where
+            the metrics are written after every scan, in the directory read
+            by the textfile collector of the Prometheus node exporter.
+            Use a path of its own for every worker process, as every write
+            replaces the whole file. If not provided, metrics are only
+            written on demand.
+        namespace: The prefix of the names of the metrics. Default to `soda`.
+        duration_buckets: The upper bounds, in seconds, of the buckets of
+            the duration histograms.
+
+    Example:
+        Export the metrics of scans to the textfile collector.
+        ```python
+        import os
+        from prefect_soda_core.metrics import ScanMetrics
+        from prefect_soda_core.tasks import soda_scan_execute
+
+        scan_metrics = ScanMetrics(
+            textfile_path=f"/var/lib/node_exporter/soda-{os.getpid()}.prom"
+        )
+
+        @flow
+        def run_soda_scan():
+            return soda_scan_execute(
+                data_source_name="datasource",
+                configuration=soda_configuration_block,
+                checks=sodacl_check_block,
+                variables={"key": "value"},
+                metrics=scan_metrics,
+            )
+        ```
+    """
+
+    def __init__(
+        self,
+        textfile_path: Optional[str] = None,
+        namespace: str = "soda",
+        duration_buckets: Sequence[float] = DEFAULT_DURATION_BUCKETS,
+    ):
+        self.textfile_path = textfile_path
+        self.namespace = namespace
+        self.duration_buckets = tuple(sorted(duration_buckets))
+        self._counters: Dict[Tuple[str, _Labels], float] = {}
+        # Count of every bucket, the last one being +Inf, and sum of the
+        #   observations, keyed by metric name and labels
+        self._histograms: Dict[Tuple[str, _Labels], Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def _increment(self, name: str, labels: _Labels, value: float = 1):
+        """
+        Increment a counter, which must be done while holding the lock.
+        """
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0) + value
+
+    def _observe(self, name: str, labels: _Labels, value: float):
+        """
+        Add an observation to a histogram, which must be done while
+        holding the lock.
+        """
+        bucket_counts, total = self._histograms.get(
+            (name, labels), ([0] * (len(self.duration_buckets) + 1), 0.0)
+        )
+        bucket_counts[bisect_left(self.duration_buckets, value)] += 1
+        self._histograms[(name, labels)] = (bucket_counts, total + value)
+
+    def scan_started(self, data_source_name: str):
+        """
+        Record the start of a scan.
+
+        Args:
+            data_source_name: The name of the scanned data source.
+        """
+        with self._lock:
+            self._increment("scans_started_total", (("data_source", data_source_name),))
+
+    def scan_finished(
+        self,
+        data_source_name: str,
+        duration: float,
+        status: str = SCAN_STATUS_SUCCESS,
+        outcome_counts: Optional[Dict[str, int]] = None,
+        log_bytes: int = 0,
+        results_bytes: int = 0,
+    ):
+        """
+        Record the end of a scan, and write the metrics to the textfile
+        if `textfile_path` is set.
+
+        Args:
+            data_source_name: The name of the scanned data source.
+            duration: The wall-clock duration of the scan, in seconds.
+            status: Either `success`, including scans with failing checks,
+                or `error` if the scan could not run.
+            outcome_counts: The number of checks by outcome, among
+                `pass`, `warn`, `fail` and `error`.
+            log_bytes: The size of the logs of the scan.
+            results_bytes: The size of the results file of the scan.
+        """
+        labels = (("data_source", data_source_name),)
+        with self._lock:
+            self._increment("scans_finished_total", labels + (("status", status),))
+            self._observe("scan_duration_seconds", labels, duration)
+            for outcome, count in (outcome_counts or {}).items():
+                self._increment(
+                    "scan_checks_total", labels + (("outcome", outcome),), count
+                )
+            self._increment("scan_log_bytes_total", labels, log_bytes)
+            self._increment("scan_results_bytes_total", labels, results_bytes)
+
+        if self.textfile_path is not None:
+            self.write_textfile()
+
+    def observe_queue_wait(self, data_source_name: str, wait: float):
+        """
+        Record the time a scan waited for a concurrency slot before starting.
+
+        Args:
+            data_source_name: The name of the scanned data source.
+            wait: The time the scan waited, in seconds.
+        """
+        with self._lock:
+            self._observe(
+                "scan_queue_wait_seconds", (("data_source", data_source_name),), wait
+            )
+
+    def render(self) -> str:
+        """
+        Render the metrics in the Prometheus text format.
+
+        Returns:
+            The metrics, in the Prometheus text exposition format.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (list(bucket_counts), total)
+                for key, (bucket_counts, total) in self._histograms.items()
+            }
+
+        lines = []
+        for name, (metric_type, help_text) in _METRICS.items():
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            if metric_type == "counter":
+                for (sample_name, labels), value in sorted(counters.items()):
+                    if sample_name == name:
+                        value_str = _format_value(value)
+                        lines.append(f"{full_name}{_format_labels(labels)} {value_str}")
+                continue
+
+            for (sample_name, labels), (bucket_counts, total) in sorted(
+                histograms.items()
+            ):
+                if sample_name != name:
+                    continue
+                cumulative_count = 0
+                for upper_bound, count in zip(
+                    self.duration_buckets + (float("inf"),), bucket_counts
+                ):
+                    cumulative_count += count
+                    bucket_labels = labels + (("le", _format_value(upper_bound)),)
+                    lines.append(
+                        f"{full_name}_bucket{_format_labels(bucket_labels)} "
+                        f"{cumulative_count}"
+                    )
+                lines.append(
+                    f"{full_name}_sum{_format_labels(labels)} {_format_value(total)}"
+                )
+                lines.append(
+                    f"{full_name}_count{_format_labels(labels)} {cumulative_count}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Optional[str] = None):
+        """
+        Write the metrics to a file, atomically so that the textfile
+        collector never reads a partial file.
+
+        Args:
+            path: The path of the file. If not provided, `textfile_path`
+                is used.
+
+        Raises:
+            `ValueError` if no path is provided and `textfile_path` is not set.
+        """
+        path = path or self.textfile_path
+        if path is None:
+            raise ValueError("A path is needed to write the metrics to a textfile.")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        # Unlike `mkstemp`, the file is readable by other users as the umask
+        #   allows, such as a node exporter running as another user
+        file_descriptor, tmp_path = _create_temporary_file(directory, DEFAULT_FILE_MODE)
+        try:
+            with os.fdopen(file_descriptor, "w") as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def serve(self, port: int, address: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve the metrics over HTTP, from a background thread, so that
+        Prometheus can scrape them at any path of `http://<address>:<port>`.
+
+        Args:
+            port: The port to listen on. Use `0` to pick a free port.
+            address: The address to listen on. Default to the loopback
+                interface, use `""` to listen on all interfaces so that
+                a Prometheus server on another host can scrape the metrics.
+
+        Returns:
+            The HTTP server, which can be stopped with its `shutdown` method.
+        """
+        scan_metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            """
+            Handler rendering the metrics on every GET request.
+            """
+
+            def do_GET(self):
+                """
+                Respond with the metrics in the Prometheus text format.
+                """
+                body = scan_metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                """
+                Do not log requests, as scrapes are too frequent to be logged.
+                """
+
+        server = ThreadingHTTPServer((address, port), MetricsHandler)
+        thread = threading.Thread(
+            target=server.serve_forever, name="soda-scan-metrics", daemon=True
+        )
+        thread.start()
+        return server
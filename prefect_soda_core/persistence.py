@@ -0,0 +1,143 @@
+"""
+Utilities to persist Soda configuration and checks on the file system,
+skipping unchanged files and replacing changed ones atomically.
+"""
+import hashlib
+import os
+import secrets
+import tempfile
+import threading
+from enum import Enum
+from typing import Dict, Tuple
+
+# Permissions of newly persisted files before the umask of the process
+#   is applied, as `open` would create them
+DEFAULT_FILE_MODE = 0o666
+
+# RAM-backed directories where transient files can be materialized, by preference
+MEMORY_DIRECTORIES = ("/dev/shm",)
+
+
+class Materialization(str, Enum):
+    """
+    Enumeration of the supported ways of materializing the YAML string
+    of a block on the file system before running a scan.
+
+    Attributes:
+        DISK: Persist the YAML string at the path configured on the block,
+            where it is kept after the scan.
+        MEMORY: Write the YAML string to a temporary RAM-backed directory,
+            like `/dev/shm`, removed as soon as the task ends.
+    """
+
+    DISK = "disk"
+    MEMORY = "memory"
+
+
+def get_memory_directory() -> str:
+    """
+    Get a RAM-backed directory where transient files can be written,
+    falling back to the temporary directory of the system if none is available.
+
+    Returns:
+        The path of the directory.
+    """
+    for directory in MEMORY_DIRECTORIES:
+        if os.path.isdir(directory) and os.access(directory, os.W_OK | os.X_OK):
+            return directory
+    return tempfile.gettempdir()
+
+
+# Digests of the files persisted or checked by the current process, keyed by
+#   path, together with the modification time and size they were computed for
+_persisted_digests: Dict[str, Tuple[int, int, str]] = {}
+_persisted_digests_lock = threading.Lock()
+
+
+def _get_file_digest(path: str) -> str:
+    """
+    Get the SHA-256 digest of a file, reusing the last computed one
+    if the file has not been modified since.
+    """
+    stat = os.stat(path)
+    with _persisted_digests_lock:
+        cached = _persisted_digests.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+
+    with _persisted_digests_lock:
+        _persisted_digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def _create_temporary_file(directory: str, mode: int) -> Tuple[int, str]:
+    """
+    Create a new hidden temporary file in `directory`, with the permissions
+    of `mode` restricted by the umask of the process, unlike `mkstemp` which
+    creates files only readable by their owner.
+
+    Returns:
+        The file descriptor, open for writing, and the path of the file.
+    """
+    while True:
+        temp_path = os.path.join(directory, f".{secrets.token_hex(8)}.tmp")
+        try:
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, mode)
+        except FileExistsError:
+            continue
+        return fd, temp_path
+
+
+def persist_yaml_str(yaml_str: str, path: str) -> bool:
+    """
+    Persist a YAML string at `path`, if its content changed.
+    The file is written to a temporary file first and then renamed,
+    so that concurrent readers never see a partially written file and
+    concurrent writers of the same content do not conflict.
+
+    Args:
+        yaml_str: The YAML string to persist.
+        path: The path of the file where the YAML string is persisted.
+
+    Returns:
+        `True` if the file has been written, `False` if it was up to date.
+    """
+    # The YAML string is written as is, to keep its comments and formatting
+    content = yaml_str.encode()
+    digest = hashlib.sha256(content).hexdigest()
+
+    try:
+        if _get_file_digest(path) == digest:
+            return False
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = None
+
+    fd, temp_path = _create_temporary_file(
+        os.path.dirname(path) or ".", DEFAULT_FILE_MODE
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        # Replaced files keep their permissions
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        # The rename keeps the modification time of the temporary file
+        stat = os.stat(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    with _persisted_digests_lock:
+        _persisted_digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return True
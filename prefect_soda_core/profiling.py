@@ -0,0 +1,147 @@
+"""
+Profiling of Soda scans with `cProfile`, that can be used to find where
+the time of a slow scan goes inside soda-core.
+
+Run as a module, it is the `soda` CLI itself running under `cProfile`,
+so that CLI scans can be profiled with
+`python -m prefect_soda_core.profiling <profile file> scan ...`.
+"""
+import cProfile
+import os
+import pstats
+import shlex
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Number of functions listed in the hot functions table of a profile
+PROFILE_TOP_N = 20
+
+
+def run_profiled(function: Callable[..., T], profile_file: str, **kwargs) -> T:
+    """
+    Call a function under `cProfile`, in the current thread.
+
+    Args:
+        function: The function to profile.
+        profile_file: The path of the file where the raw profile is written,
+            in the `pstats` format, even if the function raises.
+        **kwargs: The keyword arguments of the function.
+
+    Returns:
+        The result of the function.
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, **kwargs)
+    finally:
+        profiler.dump_stats(profile_file)
+
+
+def build_profiled_soda_command(command: str, profile_file: str) -> str:
+    """
+    Build a `soda` CLI command that runs under `cProfile`.
+
+    Args:
+        command: The `soda` CLI command to profile.
+        profile_file: The path of the file where the raw profile is written,
+            in the `pstats` format.
+
+    Raises:
+        `ValueError` if the command is not a `soda` CLI command.
+
+    Returns:
+        The profiled command, running the `soda` CLI with the current
+            Python interpreter.
+    """
+    if not command.startswith("soda "):
+        raise ValueError(f"Not a soda CLI command: {command}")
+
+    # `python -m cProfile` would exit with 0 whatever the exit code of soda
+    return (
+        f"{shlex.quote(sys.executable)} -m prefect_soda_core.profiling "
+        f"{shlex.quote(profile_file)} {command[len('soda '):]}"
+    )
+
+
+def get_hot_functions(
+    profile_file: str, top_n: int = PROFILE_TOP_N
+) -> List[Dict[str, Any]]:
+    """
+    Get the functions of a raw profile that took the most time on their own,
+    excluding the time spent in the functions they called.
+
+    Args:
+        profile_file: The path of the raw profile, in the `pstats` format.
+        top_n: The number of functions to return.
+
+    Returns:
+        The hot functions, from the hottest, with their number of calls,
+            their own time and their cumulative time, in seconds.
+    """
+    stats = pstats.Stats(profile_file).stats
+    hot_functions = sorted(
+        stats.items(), key=lambda function_stats: function_stats[1][2], reverse=True
+    )[:top_n]
+    return [
+        {
+            "function": pstats.func_std_string(function),
+            "calls": calls,
+            "own_time": round(own_time, 6),
+            "cumulative_time": round(cumulative_time, 6),
+        }
+        for function, (_, calls, own_time, cumulative_time, _) in hot_functions
+    ]
+
+
+async def create_profile_artifacts(
+    profile_file: str, top_n: int = PROFILE_TOP_N, key: Optional[str] = None
+):
+    """
+    Publish a raw profile as Prefect artifacts of the current run: a table of
+    its hot functions, and a link to the raw profile file.
+
+    Args:
+        profile_file: The path of the raw profile, in the `pstats` format.
+        top_n: The number of functions in the table of hot functions.
+        key: The key of the table artifact, made of lowercase letters,
+            numbers and dashes. The link artifact key has a `-file` suffix.
+            If not provided, the artifacts are not listed in the Artifacts
+            page of the UI, but only in the run they belong to.
+    """
+    # Imported here so that profiled CLI scans do not pay for Prefect import
+    from prefect.artifacts import create_link_artifact, create_table_artifact
+
+    profile_path = Path(profile_file).resolve()
+    await create_table_artifact(
+        table=get_hot_functions(profile_file, top_n=top_n),
+        key=key,
+        description=(
+            f"Top {top_n} functions of the Soda scan by own time. "
+            f"Raw profile: `{profile_path}`, to open with `pstats` or `snakeviz`."
+        ),
+    )
+    await create_link_artifact(
+        link=profile_path.as_uri(),
+        link_text=os.path.basename(profile_file),
+        key=f"{key}-file" if key else None,
+        description="Raw profile of the Soda scan, in the `pstats` format.",
+    )
+
+
+if __name__ == "__main__":
+    # Running `soda.cli.cli` as a module would call its entrypoint
+    #   before its commands are registered
+    from soda.cli.cli import main
+
+    profile_file = sys.argv.pop(1)
+    sys.argv[0] = "soda"
+    # soda exits with the exit code of the scan, which `run_profiled` lets
+    #   through once the profile is written
+    try:
+        run_profiled(main, profile_file)
+    except SystemExit as exc:
+        sys.exit(exc.code)
+    sys.exit(0)
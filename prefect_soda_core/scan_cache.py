@@ -0,0 +1,243 @@
+"""
+Content-addressed cache of Soda scan results, that can be used to skip
+scans identical to a recent one.
+"""
+import hashlib
+import json
+import os
+import pickle
+import stat
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from prefect.settings import PREFECT_HOME
+
+# Suffix of the files storing the entries of the cache
+CACHE_ENTRY_SUFFIX = ".pickle"
+
+
+def _ensure_private_directory(directory: str):
+    """
+    Create a directory only accessible to the current user, or check that
+    an existing one cannot be written by other users, as the entries read
+    from it are unpickled.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # Ownership and permission bits are not meaningful on Windows
+    if not hasattr(os, "getuid"):
+        return
+
+    directory_stat = os.stat(directory)
+    if directory_stat.st_uid != os.getuid() or directory_stat.st_mode & (
+        stat.S_IWGRP | stat.S_IWOTH
+    ):
+        raise ValueError(
+            f"The cache directory {directory} must be owned by the current user "
+            "and not be writable by other users."
+        )
+
+
+def _hash_file(path: str, hasher):
+    """
+    Feed the content of a file to `hasher`, chunk by chunk.
+    """
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            hasher.update(chunk)
+
+
+class ScanResultCache:
+    """
+    Local disk cache of the results of Soda scans, keyed by a hash of
+    everything that determines the outcome of a scan: the content of the
+    configuration and checks files, the variables and the data source name.
+    Entries expire after `ttl_seconds`, and the least recently used ones
+    are evicted once the cache holds more than `max_entries`.
+
+    Args:
+        directory: The directory where the entries of the cache are stored,
+            which must be owned by the current user and not be writable by
+            other users. If not provided, a `soda_scan_cache` directory in
+            the Prefect home directory is used.
+        ttl_seconds: Number of seconds after which an entry expires.
+            Default to `3600`.
+        max_entries: Maximum number of entries kept in the cache.
+            Default to `256`.
+
+    Raises:
+        `ValueError` if `max_entries` is lower than 1, or if the directory
+            can be written by other users.
+
+    Example:
+        Skip scans identical to one that ran within the last 10 minutes.
+        ```python
+        from prefect_soda_core.scan_cache import ScanResultCache
+        from prefect_soda_core.tasks import soda_scan_execute
+
+        scan_result_cache = ScanResultCache(ttl_seconds=600)
+
+        @flow
+        def run_soda_scan():
+            return soda_scan_execute(
+                data_source_name="datasource",
+                configuration=soda_configuration_block,
+                checks=sodacl_check_block,
+                variables={"key": "value"},
+                cache=scan_result_cache,
+            )
+        ```
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        ttl_seconds: float = 3600,
+        max_entries: int = 256,
+    ):
+        if max_entries < 1:
+            raise ValueError("The cache must be able to hold at least 1 entry.")
+
+        self.directory = directory or os.path.join(
+            PREFECT_HOME.value(), "soda_scan_cache"
+        )
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        _ensure_private_directory(self.directory)
+
+    @staticmethod
+    def make_key(
+        data_source_name: str,
+        configuration_yaml_path: str,
+        sodacl_yaml_paths: List[str],
+        variables: Optional[Dict[str, str]] = None,
+        **options: Any,
+    ) -> str:
+        """
+        Compute the cache key of a scan.
+
+        Args:
+            data_source_name: The name of the data source against
+                which the checks are executed.
+            configuration_yaml_path: Path of the persisted Soda configuration file.
+            sodacl_yaml_paths: Paths of the persisted SodaCL checks files.
+            variables: A `Dict[str, str]` that contains all variables
+                references within checks.
+            options: Any other option changing the result of the scan,
+                like what the task returns.
+
+        Returns:
+            The SHA-256 hex digest identifying the scan.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(
+            json.dumps(
+                [data_source_name, variables or {}, options],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        )
+        _hash_file(configuration_yaml_path, hasher)
+        for sodacl_yaml_path in sodacl_yaml_paths:
+            hasher.update(b"\0")
+            _hash_file(sodacl_yaml_path, hasher)
+        return hasher.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        """
+        Path of the file storing the entry of `key`.
+        """
+        return os.path.join(self.directory, f"{key}{CACHE_ENTRY_SUFFIX}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get the cached result of a scan, if still fresh.
+
+        Args:
+            key: The cache key of the scan.
+            default: The value returned when the scan is not cached.
+
+        Returns:
+            The cached result of the scan, or `default`.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as f:
+                created_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+
+        if time.time() - created_at > self.ttl_seconds:
+            self._remove(entry_path)
+            return default
+
+        # The modification time of an entry tracks when it was last used
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: Any):
+        """
+        Cache the result of a scan, evicting the least recently
+        used entries if the cache is full.
+
+        Args:
+            key: The cache key of the scan.
+            value: The result of the scan, which must be picklable.
+        """
+        # Write to a temporary file first, so that concurrent readers
+        #   never see a partially written entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((time.time(), value), f)
+            os.replace(temp_path, self._entry_path(key))
+        except BaseException:
+            self._remove(temp_path)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        """
+        Remove the expired entries, and the least recently used ones
+        above `max_entries`.
+        """
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHE_ENTRY_SUFFIX):
+                continue
+            entry_path = os.path.join(self.directory, name)
+            try:
+                last_used_at = os.path.getmtime(entry_path)
+            except OSError:
+                continue
+            if now - last_used_at > self.ttl_seconds:
+                self._remove(entry_path)
+            else:
+                entries.append((last_used_at, entry_path))
+
+        entries.sort()
+        for _, entry_path in entries[: max(len(entries) - self.max_entries, 0)]:
+            self._remove(entry_path)
+
+    @staticmethod
+    def _remove(path: str):
+        """
+        Remove a file, ignoring it if it is already gone.
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """
+        Remove all the entries of the cache.
+        """
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_ENTRY_SUFFIX):
+                self._remove(os.path.join(self.directory, name))
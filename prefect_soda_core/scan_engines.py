@@ -0,0 +1,374 @@
+"""
+Engines that can be used to execute Soda scans.
+"""
+import importlib
+import importlib.util
+import os
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from prefect_soda_core.connection_pool import (
+    get_default_connection_pool,
+    pooled_data_source,
+)
+
+# Exit code returned by Soda when the scan runs successfully but some checks fail
+SCAN_CHECKS_FAILED_EXIT_CODE = 2
+
+# DB engines currently supported by Soda Core, keep in sync with `setup.py`
+SODA_CORE_DATA_SOURCES = (
+    "athena",
+    "redshift",
+    "spark-df",
+    "bigquery",
+    "db2",
+    "sqlserver",
+    "mysql",
+    "postgres",
+    "snowflake",
+    "trino",
+    "duckdb",
+)
+
+
+class ExecutionMode(str, Enum):
+    """
+    Enumeration of the supported ways of executing a Soda scan.
+
+    Attributes:
+        CLI: Run the scan through the `soda scan` CLI command in a shell.
+        IN_PROCESS: Run the scan inside the current process using
+            the soda-core `Scan` Python API.
+        WORKER_POOL: Run the scan in a pool of long-lived worker processes
+            that have soda-core already imported.
+        FORK_SERVER: Run the scan in a new subprocess forked from a fork
+            server that has soda-core already imported.
+    """
+
+    CLI = "cli"
+    IN_PROCESS = "in_process"
+    WORKER_POOL = "worker_pool"
+    FORK_SERVER = "fork_server"
+
+
+def get_installed_data_source_modules() -> List[str]:
+    """
+    Get the modules of the soda-core data source packages
+    installed in the current environment.
+
+    Returns:
+        The names of the installed `soda.data_sources` modules.
+    """
+    modules = []
+    for data_source in SODA_CORE_DATA_SOURCES:
+        module_name = f"soda.data_sources.{data_source.replace('-', '_')}_data_source"
+        try:
+            if importlib.util.find_spec(module_name) is not None:
+                modules.append(module_name)
+        except ModuleNotFoundError:
+            continue
+    return modules
+
+
+def preload_soda_modules(modules: Optional[List[str]] = None) -> List[str]:
+    """
+    Import soda-core and the provided data source modules, so that
+    subsequent scans in the current process do not pay for their import.
+
+    Args:
+        modules: The modules to import on top of soda-core. If not provided,
+            all the installed soda-core data source modules are imported.
+
+    Returns:
+        The names of the modules that have been successfully imported.
+    """
+    importlib.import_module("soda.scan")
+
+    if modules is None:
+        modules = get_installed_data_source_modules()
+
+    imported_modules = []
+    for module_name in modules:
+        # A data source module may fail to import if its driver is missing,
+        #   in which case the scan will report it when using it
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            continue
+        imported_modules.append(module_name)
+    return imported_modules
+
+
+@contextmanager
+def patched_environment(env: Optional[Dict[str, str]] = None) -> Iterator[None]:
+    """
+    Set environment variables on top of the current ones in the context,
+    restoring the previous environment on exit. As the environment is shared
+    by the whole process, only use it in processes running a single scan
+    at a time.
+
+    Args:
+        env: A `Dict[str, str]` that contains the environment variables to set.
+    """
+    if not env:
+        yield
+        return
+
+    previous_environ = os.environ.copy()
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(previous_environ)
+
+
+def build_soda_command(
+    data_source_name: str,
+    configuration_yaml_path: str,
+    sodacl_yaml_paths: List[str],
+    variables: Optional[Dict[str, str]] = None,
+    scan_results_file: Optional[str] = None,
+    verbose: bool = False,
+) -> str:
+    """
+    Build the `soda scan` CLI command for the provided scan options.
+
+    Args:
+        data_source_name: The name of the data source against
+            which the checks will be executed.
+        configuration_yaml_path: Path of the Soda configuration file.
+        sodacl_yaml_paths: Paths of the SodaCL checks files.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scan_results_file: The path to the file where the scan results
+            will be stored, if any.
+        verbose: Whether to run the checks with a verbose log or not.
+
+    Returns:
+        The `soda scan` command as a string.
+    """
+    # Soda command initial definition
+    command = f"soda scan -d {data_source_name} -c {configuration_yaml_path}"
+
+    # If variables are provided, add the to Soda command
+    if variables:
+        var_str = "".join(
+            [
+                f'-v "{var_name}={var_value}" '
+                for var_name, var_value in variables.items()
+            ]
+        )
+
+        command = f"{command} {var_str}"
+
+    # If a scan results file is provided, save the output of the scan to it
+    if scan_results_file is not None:
+        command = f"{command} -srf {scan_results_file}"
+
+    # If verbose logging is requested, add corresponding option to Soda command
+    if verbose:
+        command = f"{command} -V"
+
+    # Build final Soda command
+    return f"{command} {' '.join(sodacl_yaml_paths)}"
+
+
+def execute_scan_in_process(
+    data_source_name: str,
+    configuration_yaml_path: str,
+    sodacl_yaml_paths: List[str],
+    variables: Optional[Dict[str, str]] = None,
+    scan_results_file: Optional[str] = None,
+    verbose: bool = False,
+    reuse_connections: bool = False,
+) -> Tuple[int, List[str]]:
+    """
+    Execute a Soda scan inside the current process using the soda-core
+    `Scan` API, configured exactly as the `soda scan` CLI command would be.
+
+    Args:
+        data_source_name: The name of the data source against
+            which the checks will be executed.
+        configuration_yaml_path: Path of the Soda configuration file.
+        sodacl_yaml_paths: Paths of the SodaCL checks files.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scan_results_file: The path to the file where the scan results
+            will be stored, if any.
+        verbose: Whether to run the checks with a verbose log or not.
+        reuse_connections: Whether to reuse a connection to the data source
+            from the connection pool of the current process, and to put
+            the connection back into the pool after the scan.
+
+    Returns:
+        A tuple made of the scan exit code and the scan log lines.
+    """
+    # Imported here so that CLI-only users do not pay for soda-core import
+    from soda.scan import Scan
+
+    scan = Scan()
+
+    # Add variables before any other config as they might be used
+    if variables:
+        scan.add_variables(variables)
+
+    if verbose:
+        scan.set_verbose()
+
+    scan.set_data_source_name(data_source_name)
+    scan.add_configuration_yaml_file(configuration_yaml_path)
+
+    for sodacl_yaml_path in sodacl_yaml_paths:
+        scan.add_sodacl_yaml_files(sodacl_yaml_path)
+
+    if scan_results_file is not None:
+        scan.set_scan_results_file(scan_results_file)
+
+    if reuse_connections:
+        with pooled_data_source(scan, data_source_name, get_default_connection_pool()):
+            exit_code = scan.execute()
+    else:
+        exit_code = scan.execute()
+    soda_logs = (scan.get_logs_text() or "").splitlines()
+
+    return exit_code, soda_logs
+
+
+def _is_pandas_dataframe(dataframe: Any) -> bool:
+    """
+    Whether a data frame is a pandas DataFrame, any other data frame
+    being scanned as a Dask one.
+    """
+    # Imported here as pandas is only installed with the `pandas-dask` option
+    import pandas
+
+    return isinstance(dataframe, pandas.DataFrame)
+
+
+def execute_dataframe_scan_in_process(
+    data_source_name: str,
+    dataframes: Dict[str, Any],
+    sodacl_yaml_strs: List[str],
+    variables: Optional[Dict[str, str]] = None,
+    scan_results_file: Optional[str] = None,
+    verbose: bool = False,
+) -> Tuple[int, List[str]]:
+    """
+    Execute a Soda scan of in-memory pandas or Dask DataFrames inside
+    the current process, using the soda-core `Scan` API and the Dask data
+    source of `soda-core-pandas-dask`. The data frames are never serialized,
+    pandas ones being wrapped into single-partition Dask DataFrames.
+
+    Args:
+        data_source_name: The name of the data source the data frames
+            are registered in, that the checks are executed against.
+        dataframes: The data frames to scan, keyed by the dataset name
+            the checks refer to them with.
+        sodacl_yaml_strs: The SodaCL checks, as YAML strings.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scan_results_file: The path to the file where the scan results
+            will be stored, if any.
+        verbose: Whether to run the checks with a verbose log or not.
+
+    Returns:
+        A tuple made of the scan exit code and the scan log lines.
+    """
+    # Imported here so that CLI-only users do not pay for soda-core import
+    from soda.scan import Scan
+
+    scan = Scan()
+
+    # Add variables before any other config as they might be used
+    if variables:
+        scan.add_variables(variables)
+
+    if verbose:
+        scan.set_verbose()
+
+    scan.set_data_source_name(data_source_name)
+    for dataset_name, dataframe in dataframes.items():
+        if _is_pandas_dataframe(dataframe):
+            scan.add_pandas_dataframe(
+                dataset_name, dataframe, data_source_name=data_source_name
+            )
+        else:
+            scan.add_dask_dataframe(
+                dataset_name, dataframe, data_source_name=data_source_name
+            )
+
+    for sodacl_yaml_str in sodacl_yaml_strs:
+        scan.add_sodacl_yaml_str(sodacl_yaml_str)
+
+    if scan_results_file is not None:
+        scan.set_scan_results_file(scan_results_file)
+
+    exit_code = scan.execute()
+    soda_logs = (scan.get_logs_text() or "").splitlines()
+
+    return exit_code, soda_logs
+
+
+def execute_spark_scan_in_process(
+    data_source_name: str,
+    spark_session: Any,
+    sodacl_yaml_strs: List[str],
+    dataframes: Optional[Dict[str, Any]] = None,
+    variables: Optional[Dict[str, str]] = None,
+    scan_results_file: Optional[str] = None,
+    verbose: bool = False,
+) -> Tuple[int, List[str]]:
+    """
+    Execute a Soda scan of Spark DataFrames inside the current process,
+    using the soda-core `Scan` API and the `spark-df` data source of
+    `soda-core-spark-df`, so that the queries of the checks run on the
+    Spark session and the data never leaves the cluster.
+
+    Args:
+        data_source_name: The name of the data source of the Spark session,
+            that the checks are executed against.
+        spark_session: The `SparkSession` running the queries of the checks.
+        sodacl_yaml_strs: The SodaCL checks, as YAML strings.
+        dataframes: The Spark DataFrames to scan, registered as temporary
+            views of the Spark session named after their key, that the
+            checks refer to them with. If not provided, the checks run
+            against the tables and views already in the Spark session.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scan_results_file: The path to the file where the scan results
+            will be stored, if any.
+        verbose: Whether to run the checks with a verbose log or not.
+
+    Returns:
+        A tuple made of the scan exit code and the scan log lines.
+    """
+    # Imported here so that CLI-only users do not pay for soda-core import
+    from soda.scan import Scan
+
+    for view_name, dataframe in (dataframes or {}).items():
+        dataframe.createOrReplaceTempView(view_name)
+
+    scan = Scan()
+
+    # Add variables before any other config as they might be used
+    if variables:
+        scan.add_variables(variables)
+
+    if verbose:
+        scan.set_verbose()
+
+    scan.set_data_source_name(data_source_name)
+    scan.add_spark_session(spark_session, data_source_name=data_source_name)
+
+    for sodacl_yaml_str in sodacl_yaml_strs:
+        scan.add_sodacl_yaml_str(sodacl_yaml_str)
+
+    if scan_results_file is not None:
+        scan.set_scan_results_file(scan_results_file)
+
+    exit_code = scan.execute()
+    soda_logs = (scan.get_logs_text() or "").splitlines()
+
+    return exit_code, soda_logs
@@ -0,0 +1,667 @@
+"""
+Utilities to work with the results of Soda scans.
+"""
+import json
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+# Outcomes of a Soda check, as reported in the scan results
+CHECK_OUTCOME_PASS = "pass"
+CHECK_OUTCOME_WARN = "warn"
+CHECK_OUTCOME_FAIL = "fail"
+
+# Size of the chunks read from scan results files when parsing them incrementally
+SCAN_RESULTS_CHUNK_SIZE = 64 * 1024
+
+_JSON_WHITESPACE = " \t\n\r"
+# Characters a JSON number may continue with, like `.` or the exponent of `0.1e-3`
+_JSON_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+def _normalize_path(path: str) -> str:
+    """
+    Normalize a file path the same way Soda does before reporting it
+    in the location of a check.
+    """
+    return os.path.normpath(os.path.expanduser(path))
+
+
+def split_scan_results_by_checks_file(
+    scan_results: Dict, sodacl_yaml_paths: List[str]
+) -> Dict[str, Dict]:
+    """
+    Split the results of a scan that ran several SodaCL checks files
+    into the results of each checks file.
+    Scan-level attributes, like timestamps and `hasErrors`, are shared
+    by all the checks files, while checks, `hasWarnings` and `hasFailures`
+    are specific to each checks file.
+
+    Args:
+        scan_results: The content of the scan results file.
+        sodacl_yaml_paths: Paths of the SodaCL checks files of the scan.
+
+    Returns:
+        The scan results of each checks file, keyed by checks file path.
+    """
+    # Lists, like metrics, queries and logs, cannot be attributed to a checks file
+    shared_results = {
+        key: value for key, value in scan_results.items() if not isinstance(value, list)
+    }
+    checks_by_path = {_normalize_path(path): [] for path in sodacl_yaml_paths}
+
+    for check in scan_results.get("checks", []):
+        file_path = (check.get("location") or {}).get("filePath")
+        if file_path is None:
+            continue
+        checks_by_path.setdefault(_normalize_path(file_path), []).append(check)
+
+    results_by_checks_file = {}
+    for path in sodacl_yaml_paths:
+        checks = checks_by_path[_normalize_path(path)]
+        outcomes = {check.get("outcome") for check in checks}
+        results_by_checks_file[path] = {
+            **shared_results,
+            "hasWarnings": CHECK_OUTCOME_WARN in outcomes,
+            "hasFailures": CHECK_OUTCOME_FAIL in outcomes,
+            "checks": checks,
+        }
+
+    return results_by_checks_file
+
+
+def merge_scan_results(scan_results_list: List[Dict]) -> Dict:
+    """
+    Merge the results of several scans, like the shards of a checks file,
+    into the results of a single scan.
+    Lists, like checks and metrics, are concatenated, the scan spans from
+    the earliest start to the latest end, and the outcome flags are set
+    if any of the scans set them.
+
+    Args:
+        scan_results_list: The contents of the scan results files.
+
+    Returns:
+        The merged scan results.
+    """
+    merged_results = {}
+    for scan_results in scan_results_list:
+        for key, value in scan_results.items():
+            if isinstance(value, list):
+                merged_results.setdefault(key, []).extend(value)
+            elif key not in merged_results:
+                merged_results[key] = value
+            elif key in ("hasErrors", "hasWarnings", "hasFailures"):
+                merged_results[key] = merged_results[key] or value
+            elif key == "scanStartTimestamp" and value:
+                merged_results[key] = min(merged_results[key] or value, value)
+            elif key == "scanEndTimestamp" and value:
+                merged_results[key] = max(merged_results[key] or value, value)
+
+    return merged_results
+
+
+class _JSONChunkReader:
+    """
+    Minimal reader of a JSON document that reads the underlying file in chunks,
+    so that only the value being decoded is kept in memory.
+    """
+
+    def __init__(self, stream: IO[str], chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _read(self, size: int) -> bool:
+        """
+        Append up to `size` characters from the file to the buffer,
+        dropping the part of the buffer that has already been consumed.
+        """
+        if self._eof:
+            return False
+        chunk = self._stream.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespaces and return the next character, without consuming it.
+        """
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in _JSON_WHITESPACE
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read(self._chunk_size):
+                raise ValueError("Unexpected end of the scan results file.")
+
+    def expect(self, characters: str) -> str:
+        """
+        Consume the next character, which must be one of `characters`.
+        """
+        character = self.peek()
+        if character not in characters:
+            raise ValueError(
+                f"Invalid scan results file: expected one of {characters!r}, "
+                f"found {character!r}."
+            )
+        self._position += 1
+        return character
+
+    def decode_value(self) -> Any:
+        """
+        Decode and consume the next JSON value, reading more of the file
+        as long as the value is incomplete.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                # Grow the buffer geometrically, to keep parsing linear
+                #   in the size of the value
+                if not self._read(max(self._chunk_size, len(self._buffer))):
+                    raise
+                continue
+            # A number may continue in the next chunk, even when the chunk
+            #   ends right after its `.` or its exponent, which `raw_decode`
+            #   leaves out of the number
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and _JSON_NUMBER_TAIL.fullmatch(self._buffer, end)
+                and self._read(self._chunk_size)
+            ):
+                continue
+            self._position = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """
+        Decode and consume the next JSON array, one item at a time.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._position += 1
+            return
+        while True:
+            yield self.decode_value()
+            if self.expect(",]") == "]":
+                return
+
+
+def _compact_payload(
+    value: Any,
+    max_payload_bytes: int,
+    spill_directory: Optional[str],
+    spill_name: str,
+) -> Any:
+    """
+    Replace a value by a placeholder if its JSON serialization is larger than
+    `max_payload_bytes`, spilling it to `spill_directory` if provided.
+    """
+    serialized_value = json.dumps(value)
+    if len(serialized_value) <= max_payload_bytes:
+        return value
+
+    placeholder = {"truncated": True, "bytes": len(serialized_value)}
+    if spill_directory is not None:
+        spill_path = os.path.join(spill_directory, f"{spill_name}.json")
+        with open(spill_path, "w") as f:
+            f.write(serialized_value)
+        placeholder["spilledTo"] = spill_path
+    return placeholder
+
+
+def _compact_check(
+    check: Dict,
+    index: int,
+    max_payload_bytes: int,
+    spill_directory: Optional[str],
+) -> Dict:
+    """
+    Replace the large fields of a check, and of its diagnostics,
+    by placeholders.
+    """
+    compact_check = {}
+    for key, value in check.items():
+        if key == "diagnostics" and isinstance(value, dict):
+            value = {
+                diagnostics_key: _compact_payload(
+                    diagnostics_value,
+                    max_payload_bytes=max_payload_bytes,
+                    spill_directory=spill_directory,
+                    spill_name=f"check-{index}-diagnostics-{diagnostics_key}",
+                )
+                for diagnostics_key, diagnostics_value in value.items()
+            }
+        else:
+            value = _compact_payload(
+                value,
+                max_payload_bytes=max_payload_bytes,
+                spill_directory=spill_directory,
+                spill_name=f"check-{index}-{key}",
+            )
+        compact_check[key] = value
+    return compact_check
+
+
+def iter_scan_results(
+    scan_results_file: str, chunk_size: int = SCAN_RESULTS_CHUNK_SIZE
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Parse a scan results file incrementally, yielding its content one
+    top-level attribute or list item at a time, so that the whole
+    document is never loaded in memory.
+
+    Args:
+        scan_results_file: The path of the scan results file.
+        chunk_size: Number of characters read from the file at once.
+
+    Raises:
+        `ValueError` if the scan results file is not a valid JSON object.
+
+    Yields:
+        `(key, value)` pairs: for top-level lists, like `checks`, one pair
+            is yielded for each item of the list, otherwise one pair is yielded
+            for the whole value.
+    """
+    with open(scan_results_file, "r") as f:
+        reader = _JSONChunkReader(f, chunk_size=chunk_size)
+        reader.expect("{")
+        if reader.peek() == "}":
+            return
+        while True:
+            key = reader.decode_value()
+            reader.expect(":")
+            if reader.peek() == "[":
+                for item in reader.iter_array():
+                    yield key, item
+            else:
+                yield key, reader.decode_value()
+            if reader.expect(",}") == "}":
+                return
+
+
+def iter_scan_results_checks(
+    scan_results_file: str,
+    max_payload_bytes: Optional[int] = None,
+    spill_directory: Optional[str] = None,
+) -> Iterator[Dict]:
+    """
+    Parse the checks of a scan results file incrementally, yielding one check
+    at a time, so that peak memory is bounded by the largest check rather than
+    by the whole scan results file.
+
+    Args:
+        scan_results_file: The path of the scan results file.
+        max_payload_bytes: If provided, fields of a check, or of its diagnostics,
+            whose JSON serialization is larger than this number of bytes,
+            like failed rows samples, are replaced by a placeholder
+            containing their size.
+        spill_directory: If provided together with `max_payload_bytes`,
+            large fields are written to this directory before being replaced,
+            and the placeholder contains the path of the file they were
+            written to.
+
+    Yields:
+        The checks of the scan results file, in order.
+
+    Example:
+        ```python
+        from prefect_soda_core.scan_results import iter_scan_results_checks
+
+        for check in iter_scan_results_checks("scan_results.json", 1024 * 1024):
+            print(check["name"], check["outcome"])
+        ```
+    """
+    index = 0
+    for key, check in iter_scan_results(scan_results_file):
+        if key != "checks":
+            continue
+        if max_payload_bytes is not None:
+            check = _compact_check(
+                check,
+                index=index,
+                max_payload_bytes=max_payload_bytes,
+                spill_directory=spill_directory,
+            )
+        index += 1
+        yield check
+
+
+def _parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 timestamp of the scan results, if any.
+    """
+    if not timestamp:
+        return None
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+class CheckOutcome:
+    """
+    Typed representation of the outcome of a Soda check.
+
+    Attributes:
+        name: The name of the check.
+        outcome: The outcome of the check, either `pass`, `warn`, `fail`
+            or `None` if the check was not evaluated.
+        data_source: The name of the data source of the check.
+        table: The name of the table of the check.
+        column: The name of the column of the check, if any.
+        definition: The SodaCL definition of the check.
+        file_path: The path of the checks file that defines the check.
+        line: The line of the checks file that defines the check.
+        metrics: The identities of the metrics used by the check.
+        diagnostics: The diagnostics of the check, like the values of its
+            metrics or its failed rows samples, if any.
+    """
+
+    __slots__ = (
+        "name",
+        "outcome",
+        "data_source",
+        "table",
+        "column",
+        "definition",
+        "file_path",
+        "line",
+        "metrics",
+        "diagnostics",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        outcome: Optional[str],
+        data_source: Optional[str] = None,
+        table: Optional[str] = None,
+        column: Optional[str] = None,
+        definition: Optional[str] = None,
+        file_path: Optional[str] = None,
+        line: Optional[int] = None,
+        metrics: Tuple[str, ...] = (),
+        diagnostics: Optional[Dict] = None,
+    ):
+        self.name = name
+        self.outcome = outcome
+        self.data_source = data_source
+        self.table = table
+        self.column = column
+        self.definition = definition
+        self.file_path = file_path
+        self.line = line
+        self.metrics = tuple(metrics)
+        self.diagnostics = diagnostics
+
+    @classmethod
+    def from_dict(cls, check: Dict) -> "CheckOutcome":
+        """
+        Build a check outcome from a check of the scan results file.
+
+        Args:
+            check: The check, as found in the scan results file.
+
+        Returns:
+            The outcome of the check.
+        """
+        location = check.get("location") or {}
+        return cls(
+            name=check.get("name"),
+            outcome=check.get("outcome"),
+            data_source=check.get("dataSource"),
+            table=check.get("table"),
+            column=check.get("column"),
+            definition=check.get("definition"),
+            file_path=location.get("filePath"),
+            line=location.get("line"),
+            metrics=check.get("metrics") or (),
+            diagnostics=check.get("diagnostics"),
+        )
+
+    def __repr__(self) -> str:
+        """
+        Represent the check outcome by its name and outcome.
+        """
+        return f"CheckOutcome(name={self.name!r}, outcome={self.outcome!r})"
+
+    def __eq__(self, other) -> bool:
+        """
+        Compare all the attributes of two check outcomes.
+        """
+        if not isinstance(other, CheckOutcome):
+            return NotImplemented
+        return all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
+
+
+class ScanResult:
+    """
+    Typed representation of the results of a Soda scan, with access
+    to outcome counts, checks, metrics and duration.
+    Other sections of the scan results, like logs and queries,
+    are available with `get_section`.
+
+    Attributes:
+        data_source: The name of the default data source of the scan.
+        definition_name: The name of the scan definition, if any.
+        data_timestamp: The data timestamp of the scan.
+        scan_start_timestamp: When the scan started.
+        scan_end_timestamp: When the scan ended.
+        has_errors: Whether the scan produced error logs.
+        has_warnings: Whether any check of the scan warned.
+        has_failures: Whether any check of the scan failed.
+        checks: The outcomes of the checks of the scan.
+        metrics: The values of the metrics computed by the scan,
+            keyed by metric identity.
+
+    Example:
+        ```python
+        from prefect_soda_core.scan_results import ScanResult
+
+        scan_result = ScanResult.from_file("scan_results.json")
+        print(scan_result.outcome_counts, scan_result.duration)
+        for check in scan_result.failed_checks:
+            print(check.name, check.diagnostics)
+        ```
+    """
+
+    __slots__ = (
+        "data_source",
+        "definition_name",
+        "data_timestamp",
+        "scan_start_timestamp",
+        "scan_end_timestamp",
+        "has_errors",
+        "has_warnings",
+        "has_failures",
+        "checks",
+        "metrics",
+        "_sections",
+    )
+
+    def __init__(
+        self,
+        data_source: Optional[str] = None,
+        definition_name: Optional[str] = None,
+        data_timestamp: Optional[datetime] = None,
+        scan_start_timestamp: Optional[datetime] = None,
+        scan_end_timestamp: Optional[datetime] = None,
+        has_errors: bool = False,
+        has_warnings: bool = False,
+        has_failures: bool = False,
+        checks: Tuple[CheckOutcome, ...] = (),
+        metrics: Optional[Dict[str, Any]] = None,
+        sections: Optional[Dict[str, List]] = None,
+    ):
+        self.data_source = data_source
+        self.definition_name = definition_name
+        self.data_timestamp = data_timestamp
+        self.scan_start_timestamp = scan_start_timestamp
+        self.scan_end_timestamp = scan_end_timestamp
+        self.has_errors = has_errors
+        self.has_warnings = has_warnings
+        self.has_failures = has_failures
+        self.checks = tuple(checks)
+        self.metrics = metrics or {}
+        self._sections = sections or {}
+
+    @classmethod
+    def _from_items(cls, items: Iterator[Tuple[str, Any]]) -> "ScanResult":
+        """
+        Build a scan result from the `(key, value)` pairs of `iter_scan_results`.
+        """
+        attributes = {}
+        checks = []
+        metrics = {}
+        sections = {}
+        for key, value in items:
+            if key == "checks":
+                checks.append(CheckOutcome.from_dict(value))
+            elif key == "metrics":
+                metrics[value.get("identity")] = value.get("value")
+            elif key in ("logs", "queries", "profiling", "metadata") or isinstance(
+                value, (dict, list)
+            ):
+                sections.setdefault(key, []).append(value)
+            else:
+                attributes[key] = value
+
+        return cls(
+            data_source=attributes.get("defaultDataSource"),
+            definition_name=attributes.get("definitionName"),
+            data_timestamp=_parse_timestamp(attributes.get("dataTimestamp")),
+            scan_start_timestamp=_parse_timestamp(attributes.get("scanStartTimestamp")),
+            scan_end_timestamp=_parse_timestamp(attributes.get("scanEndTimestamp")),
+            has_errors=bool(attributes.get("hasErrors")),
+            has_warnings=bool(attributes.get("hasWarnings")),
+            has_failures=bool(attributes.get("hasFailures")),
+            checks=checks,
+            metrics=metrics,
+            sections=sections,
+        )
+
+    @classmethod
+    def from_dict(cls, scan_results: Dict) -> "ScanResult":
+        """
+        Build a scan result from the content of a scan results file.
+
+        Args:
+            scan_results: The content of the scan results file.
+
+        Returns:
+            The scan result.
+        """
+
+        def iter_items():
+            """
+            Iterate over the content as `iter_scan_results` would.
+            """
+            for key, value in scan_results.items():
+                if isinstance(value, list):
+                    for item in value:
+                        yield key, item
+                else:
+                    yield key, value
+
+        return cls._from_items(iter_items())
+
+    @classmethod
+    def from_file(cls, scan_results_file: str) -> "ScanResult":
+        """
+        Build a scan result from a scan results file, parsing it incrementally.
+
+        Args:
+            scan_results_file: The path of the scan results file.
+
+        Returns:
+            The scan result.
+        """
+        return cls._from_items(iter_scan_results(scan_results_file))
+
+    @property
+    def duration(self) -> Optional[float]:
+        """
+        The duration of the scan, in seconds.
+        """
+        if self.scan_start_timestamp is None or self.scan_end_timestamp is None:
+            return None
+        return (self.scan_end_timestamp - self.scan_start_timestamp).total_seconds()
+
+    @property
+    def outcome_counts(self) -> Dict[str, int]:
+        """
+        The number of checks for each outcome, including `pass`, `warn`
+        and `fail`, and `None` for the checks that were not evaluated.
+        """
+        counts = Counter(
+            {CHECK_OUTCOME_PASS: 0, CHECK_OUTCOME_WARN: 0, CHECK_OUTCOME_FAIL: 0}
+        )
+        counts.update(check.outcome for check in self.checks)
+        return dict(counts)
+
+    @property
+    def failed_checks(self) -> List[CheckOutcome]:
+        """
+        The checks that failed.
+        """
+        return [check for check in self.checks if check.outcome == CHECK_OUTCOME_FAIL]
+
+    @property
+    def warned_checks(self) -> List[CheckOutcome]:
+        """
+        The checks that warned.
+        """
+        return [check for check in self.checks if check.outcome == CHECK_OUTCOME_WARN]
+
+    def get_section(self, name: str) -> List:
+        """
+        Decode a list section of the scan results, like `logs` or `queries`.
+
+        Args:
+            name: The name of the section in the scan results file.
+
+        Returns:
+            The items of the section, or an empty list if the section is missing.
+        """
+        return self._sections.get(name, [])
+
+    @property
+    def logs(self) -> List[Dict]:
+        """
+        The logs of the scan.
+        """
+        return self.get_section("logs")
+
+    def __repr__(self) -> str:
+        """
+        Represent the scan result by its data source and outcome counts.
+        """
+        return (
+            f"ScanResult(data_source={self.data_source!r}, "
+            f"outcome_counts={self.outcome_counts!r})"
+        )
+
+    def __eq__(self, other) -> bool:
+        """
+        Compare all the attributes of two scan results.
+        """
+        if not isinstance(other, ScanResult):
+            return NotImplemented
+        return all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
@@ -0,0 +1,138 @@
+"""
+Timing of the phases of Soda scans, that can be used to tell apart the time
+spent by the integration from the time spent by the scan itself.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional
+
+# Phases of a scan, in the order they happen
+PHASE_PERSIST_CONFIGURATION = "persist_configuration"
+PHASE_PERSIST_CHECKS = "persist_checks"
+PHASE_BUILD_COMMAND = "build_command"
+PHASE_SCAN = "scan"
+PHASE_PROCESS_START = "process_start"
+PHASE_FIRST_OUTPUT = "first_output"
+PHASE_PARSE_RESULTS = "parse_results"
+
+# Prefix of the names of the spans opened for the phases
+SPAN_NAME_PREFIX = "soda_scan."
+
+# Called with the name and the attributes of a span, like
+#   `opentelemetry.trace.Tracer.start_as_current_span`, and returning
+#   a context manager spanning the phase
+SpanHook = Callable[..., ContextManager]
+
+
+class _PhaseTiming:
+    """
+    Timing of a phase that is in progress.
+    """
+
+    def __init__(self, timer: "ScanTimer", name: str):
+        self._timer = timer
+        self._name = name
+        self._span = None
+        if timer.span_hook is not None:
+            self._span = timer.span_hook(
+                f"{SPAN_NAME_PREFIX}{name}", attributes=dict(timer.attributes)
+            )
+            self._span.__enter__()
+        self._start = time.perf_counter()
+
+    def end(self, exc: Optional[BaseException] = None):
+        """
+        End the phase, recording its duration and closing its span.
+
+        Args:
+            exc: The exception that ended the phase, if any.
+        """
+        if self._timer is None:
+            return
+        duration = time.perf_counter() - self._start
+        self._timer.durations[self._name] = (
+            self._timer.durations.get(self._name, 0.0) + duration
+        )
+        self._timer = None
+        if self._span is not None:
+            if exc is None:
+                self._span.__exit__(None, None, None)
+            else:
+                self._span.__exit__(type(exc), exc, exc.__traceback__)
+
+
+class ScanTimer:
+    """
+    Wall-clock durations of the phases of a Soda scan: persisting the
+    configuration and the checks, building the `soda scan` command,
+    running the scan, and parsing the scan results. When the logs of a
+    scan run through the CLI are streamed, the scan phase also includes
+    starting the process and waiting for its first output.
+
+    Args:
+        span_hook: A function called with the name and, as keyword argument,
+            the `attributes` of a span when a phase starts, and returning
+            a context manager that is exited when the phase ends,
+            like `tracer.start_as_current_span` of OpenTelemetry.
+        attributes: The attributes of the spans of the phases.
+
+    Example:
+        Time a phase of a scan, with an OpenTelemetry span.
+        ```python
+        from opentelemetry import trace
+        from prefect_soda_core.scan_timing import ScanTimer
+
+        timer = ScanTimer(span_hook=trace.get_tracer(__name__).start_as_current_span)
+        with timer.phase("persist_checks"):
+            sodacl_check_block.persist_checks()
+        print(timer.durations)
+        ```
+    """
+
+    def __init__(
+        self,
+        span_hook: Optional[SpanHook] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.span_hook = span_hook
+        self.attributes = attributes or {}
+        self.durations: Dict[str, float] = {}
+
+    def start(self, name: str) -> _PhaseTiming:
+        """
+        Start a phase, that must be ended by calling `end` on the result.
+        Durations of the phases started several times are added up.
+
+        Args:
+            name: The name of the phase.
+
+        Returns:
+            The timing of the phase in progress.
+        """
+        return _PhaseTiming(self, name)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time the phase running in the context.
+
+        Args:
+            name: The name of the phase.
+        """
+        phase_timing = self.start(name)
+        try:
+            yield
+        except BaseException as exc:
+            phase_timing.end(exc)
+            raise
+        phase_timing.end()
+
+    def to_event(self) -> Dict[str, Any]:
+        """
+        Get the durations of the phases as a structured event.
+
+        Returns:
+            The attributes of the timer, and the durations of the phases
+                in seconds, keyed by phase name.
+        """
+        return {**self.attributes, "durations": dict(self.durations)}
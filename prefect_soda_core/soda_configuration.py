@@ -1,12 +1,19 @@
 """Soda configuration block"""
-from typing import Optional
+import os
+import re
+from typing import List, Optional
 
 from prefect.blocks.core import Block
 from pydantic import HttpUrl, root_validator
-from yaml import safe_dump, safe_load
 from yaml.error import YAMLError
 
 from prefect_soda_core.exceptions import SodaConfigurationException
+from prefect_soda_core.persistence import Materialization, persist_yaml_str
+from prefect_soda_core.scan_engines import ExecutionMode
+from prefect_soda_core.yaml_parsing import load_yaml_str
+
+# Data sources are declared in the configuration as `data_source <name>` keys
+DATA_SOURCE_KEY_PATTERN = re.compile(r"^data_source\s+(\S+)$")
 
 
 class SodaConfiguration(Block):
@@ -21,6 +28,16 @@ class SodaConfiguration(Block):
         configuration_yaml_str (str): Optional YAML string containing the Soda configuration
             details. If provided, it will be saved
             at the path provided with `configuration_yaml_path`.
+        execution_mode (ExecutionMode): How scans using this configuration
+            are executed by default, either through the `soda` CLI (`cli`),
+            inside the worker process with the soda-core `Scan` API
+            (`in_process`), in a pool of pre-warmed worker processes
+            (`worker_pool`) or in subprocesses forked from a fork server
+            (`fork_server`). Default to `cli`.
+        materialization (Materialization): Where the YAML string is written
+            when running a scan, either at `configuration_yaml_path` (`disk`)
+            or in a temporary RAM-backed directory removed when the task
+            ends (`memory`). Default to `disk`.
 
     Example:
         Load stored Soda configuration.
@@ -32,6 +49,8 @@ class SodaConfiguration(Block):
 
     configuration_yaml_path: str
     configuration_yaml_str: Optional[str]
+    execution_mode: ExecutionMode = ExecutionMode.CLI
+    materialization: Materialization = Materialization.DISK
 
     _block_type_name: Optional[str] = "Soda Configuration"
     _logo_url: Optional[
@@ -55,20 +74,76 @@ class SodaConfiguration(Block):
         if configuration_yaml_str_exists:
             try:
                 yaml_str = values.get("configuration_yaml_str")
-                safe_load(yaml_str)
+                load_yaml_str(yaml_str)
             except YAMLError as exc:
                 msg = f"The provided configuration YAML is not valid. Error is: {exc}"
                 raise SodaConfigurationException(msg)
 
         return values
 
-    def persist_configuration(self):
+    def persist_configuration(self) -> bool:
         """
         Persist Soda configuration on the file system, if necessary.
-        Please note that, if the path already exists, it will be overwritten.
+        Please note that, if the path already exists with a different content,
+        it will be atomically replaced. If the content is unchanged,
+        the file is not written again.
+
+        Returns:
+            `True` if the file has been written, `False` otherwise.
         """
 
         # If a YAML string and path are passed, then persist the configuration
         if self.configuration_yaml_str and self.configuration_yaml_path:
-            with open(self.configuration_yaml_path, "w") as f:
-                safe_dump(data=self.configuration_yaml_str, stream=f)
+            return persist_yaml_str(
+                self.configuration_yaml_str, self.configuration_yaml_path
+            )
+        return False
+
+    def materialize_configuration(self, directory: Optional[str] = None) -> str:
+        """
+        Materialize Soda configuration on the file system before running a scan.
+        If a directory is provided and the block has a YAML string, the YAML
+        string is written to a file of that directory, named after
+        `configuration_yaml_path`. Otherwise, the configuration are persisted
+        at `configuration_yaml_path`, if necessary.
+
+        Args:
+            directory: The directory where the YAML string is written, if any.
+
+        Returns:
+            The path of the file to run the scan with.
+        """
+        if directory is not None and self.configuration_yaml_str:
+            path = os.path.join(
+                directory, os.path.basename(self.configuration_yaml_path)
+            )
+            persist_yaml_str(self.configuration_yaml_str, path)
+            return path
+
+        self.persist_configuration()
+        return self.configuration_yaml_path
+
+    def get_data_source_names(self) -> List[str]:
+        """
+        Get the names of the data sources declared in the Soda configuration,
+        read from `configuration_yaml_str` if provided, or from the file at
+        `configuration_yaml_path` otherwise.
+
+        Returns:
+            The names of the declared data sources, in declaration order.
+        """
+        if self.configuration_yaml_str:
+            configuration = load_yaml_str(self.configuration_yaml_str)
+        else:
+            with open(self.configuration_yaml_path, "r") as f:
+                configuration = load_yaml_str(f.read())
+
+        if not isinstance(configuration, dict):
+            return []
+
+        data_source_names = []
+        for key in configuration:
+            match = DATA_SOURCE_KEY_PATTERN.match(str(key))
+            if match:
+                data_source_names.append(match.group(1))
+        return data_source_names
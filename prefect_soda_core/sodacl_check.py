@@ -1,12 +1,15 @@
 """SodaCL check block"""
+import os
 from typing import Optional
 
 from prefect.blocks.core import Block
 from pydantic import HttpUrl, root_validator
-from yaml import safe_dump, safe_load
 from yaml.error import YAMLError
 
 from prefect_soda_core.exceptions import SodaConfigurationException
+from prefect_soda_core.persistence import Materialization, persist_yaml_str
+from prefect_soda_core.sodacl_index import SodaCLIndex, get_sodacl_index
+from prefect_soda_core.yaml_parsing import load_yaml_str
 
 
 class SodaCLCheck(Block):
@@ -18,6 +21,10 @@ class SodaCLCheck(Block):
         sodacl_yaml_str (str): Optional YAML string containing the Soda Checks
             details. If provided, it will be saved
             at the path provided with `sodacl_yaml_path`.
+        materialization (Materialization): Where the YAML string is written
+            when running a scan, either at `sodacl_yaml_path` (`disk`)
+            or in a temporary RAM-backed directory removed when the task
+            ends (`memory`). Default to `disk`.
 
     Example:
         ```python
@@ -28,6 +35,7 @@ class SodaCLCheck(Block):
 
     sodacl_yaml_path: str
     sodacl_yaml_str: Optional[str]
+    materialization: Materialization = Materialization.DISK
 
     _block_type_name: Optional[str] = "SodaCL Check"
     _logo_url: Optional[
@@ -52,20 +60,83 @@ class SodaCLCheck(Block):
         if sodacl_yaml_str_exists:
             try:
                 yaml_str = values.get("sodacl_yaml_str")
-                safe_load(yaml_str)
+                load_yaml_str(yaml_str)
             except YAMLError as exc:
                 msg = f"The provided checks YAML is not valid. Error is: {exc}"
                 raise SodaConfigurationException(msg)
 
         return values
 
-    def persist_checks(self):
+    def persist_checks(self) -> bool:
         """
         Persist Soda checks on the file system, if necessary.
-        Please note that, if the path already exists, it will be overwritten.
+        Please note that, if the path already exists with a different content,
+        it will be atomically replaced. If the content is unchanged,
+        the file is not written again.
+
+        Returns:
+            `True` if the file has been written, `False` otherwise.
         """
 
-        # If a YAML string and path are passed, then persist the configuration
+        # If a YAML string and path are passed, then persist the checks
         if self.sodacl_yaml_str and self.sodacl_yaml_path:
-            with open(self.sodacl_yaml_path, "w") as f:
-                safe_dump(data=self.sodacl_yaml_str, stream=f)
+            return persist_yaml_str(self.sodacl_yaml_str, self.sodacl_yaml_path)
+        return False
+
+    def materialize_checks(self, directory: Optional[str] = None) -> str:
+        """
+        Materialize Soda checks on the file system before running a scan.
+        If a directory is provided and the block has a YAML string, the YAML
+        string is written to a file of that directory, named after
+        `sodacl_yaml_path`. Otherwise, the checks are persisted
+        at `sodacl_yaml_path`, if necessary.
+
+        Args:
+            directory: The directory where the YAML string is written, if any.
+
+        Returns:
+            The path of the file to run the scan with.
+        """
+        if directory is not None and self.sodacl_yaml_str:
+            path = os.path.join(directory, os.path.basename(self.sodacl_yaml_path))
+            persist_yaml_str(self.sodacl_yaml_str, path)
+            return path
+
+        self.persist_checks()
+        return self.sodacl_yaml_path
+
+    def read_checks(self) -> str:
+        """
+        Read the SodaCL checks, from `sodacl_yaml_str` if provided,
+        or from the file at `sodacl_yaml_path` otherwise.
+
+        Returns:
+            The SodaCL checks, as a YAML string.
+        """
+        if self.sodacl_yaml_str:
+            return self.sodacl_yaml_str
+
+        with open(self.sodacl_yaml_path, "r") as f:
+            return f.read()
+
+    def get_index(self) -> SodaCLIndex:
+        """
+        Get the index of the SodaCL checks: the tables they cover,
+        the number of checks of each table, and the variables referenced
+        in each section. The checks are read from `sodacl_yaml_str` if
+        provided, or from the file at `sodacl_yaml_path` otherwise, and
+        are only parsed once per content.
+
+        Returns:
+            The index of the SodaCL checks.
+
+        Example:
+            ```python
+            from prefect_soda_core.sodacl_check import SodaCLCheck
+
+            sodacl_check_block = SodaCLCheck.load("BLOCK_NAME")
+            sodacl_index = sodacl_check_block.get_index()
+            print(sodacl_index.tables, sodacl_index.checks_count_by_table)
+            ```
+        """
+        return get_sodacl_index(self.read_checks())
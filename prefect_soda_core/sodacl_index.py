@@ -0,0 +1,268 @@
+"""
+Index of the content of SodaCL checks files, that can be used to reason
+about a checks file without parsing it again or running Soda.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from yaml import MappingNode, compose
+
+from prefect_soda_core.yaml_parsing import SafeLoader, load_yaml_str
+
+# Sections of checks against a table look like `checks for <table> [<filter>]`
+CHECKS_FOR_TABLE_PATTERN = re.compile(r"^checks\s+for\s+(?!each\s)(\S+)")
+
+# Filters used by partitioned checks look like `filter <table> [<filter>]`
+FILTER_FOR_TABLE_PATTERN = re.compile(r"^filter\s+(\S+)")
+
+# Variables are referenced in SodaCL as `${VARIABLE_NAME}`
+VARIABLE_REFERENCE_PATTERN = re.compile(r"\$\{\s*([A-Za-z_][A-Za-z0-9_.]*)\s*\}")
+
+# Number of indexes of SodaCL checks files kept in memory
+SODACL_INDEX_CACHE_SIZE = 128
+
+_sodacl_indexes: "OrderedDict[str, SodaCLIndex]" = OrderedDict()
+_sodacl_indexes_lock = threading.Lock()
+
+
+class SodaCLIndex(NamedTuple):
+    """
+    Index of the content of a SodaCL checks file.
+
+    Attributes:
+        tables: The tables covered by the `checks for` sections,
+            in order of appearance.
+        checks_count_by_table: The number of checks of each table.
+        variables_by_section: The names of the variables referenced
+            in each section of the checks file, keyed by section.
+    """
+
+    tables: Tuple[str, ...]
+    checks_count_by_table: Dict[str, int]
+    variables_by_section: Dict[str, Tuple[str, ...]]
+
+    @property
+    def checks_count(self) -> int:
+        """
+        The number of checks against tables in the checks file.
+        """
+        return sum(self.checks_count_by_table.values())
+
+    @property
+    def variables(self) -> Tuple[str, ...]:
+        """
+        The names of all the variables referenced in the checks file.
+        """
+        return tuple(
+            sorted(
+                {
+                    variable
+                    for variables in self.variables_by_section.values()
+                    for variable in variables
+                }
+            )
+        )
+
+
+def _iter_strings(value: Any) -> Iterator[str]:
+    """
+    Iterate over all the strings, keys included, of a parsed YAML value.
+    """
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _iter_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_strings(item)
+
+
+def _build_sodacl_index(sodacl: Any) -> SodaCLIndex:
+    """
+    Build the index of a parsed SodaCL checks file.
+    """
+    tables = []
+    checks_count_by_table = {}
+    variables_by_section = {}
+
+    if not isinstance(sodacl, dict):
+        sodacl = {}
+
+    for section, content in sodacl.items():
+        section = str(section)
+        match = CHECKS_FOR_TABLE_PATTERN.match(section)
+        if match:
+            table = match.group(1)
+            if table not in checks_count_by_table:
+                tables.append(table)
+                checks_count_by_table[table] = 0
+            if isinstance(content, list):
+                checks_count_by_table[table] += len(content)
+
+        variables = {
+            variable
+            for string in _iter_strings({section: content})
+            for variable in VARIABLE_REFERENCE_PATTERN.findall(string)
+        }
+        variables_by_section[section] = tuple(sorted(variables))
+
+    return SodaCLIndex(
+        tables=tuple(tables),
+        checks_count_by_table=checks_count_by_table,
+        variables_by_section=variables_by_section,
+    )
+
+
+def get_sodacl_index(sodacl_yaml_str: Optional[str]) -> SodaCLIndex:
+    """
+    Get the index of a SodaCL checks file, building it only once per content.
+
+    Args:
+        sodacl_yaml_str: The content of the SodaCL checks file.
+
+    Raises:
+        `YAMLError` if the content is not valid YAML.
+
+    Returns:
+        The index of the checks file. It is shared by all the callers
+            indexing the same content, and must not be modified.
+    """
+    sodacl_yaml_str = sodacl_yaml_str or ""
+    digest = hashlib.sha256(sodacl_yaml_str.encode()).hexdigest()
+    with _sodacl_indexes_lock:
+        sodacl_index = _sodacl_indexes.get(digest)
+        if sodacl_index is not None:
+            _sodacl_indexes.move_to_end(digest)
+            return sodacl_index
+
+    sodacl_index = _build_sodacl_index(load_yaml_str(sodacl_yaml_str))
+
+    with _sodacl_indexes_lock:
+        _sodacl_indexes[digest] = sodacl_index
+        while len(_sodacl_indexes) > SODACL_INDEX_CACHE_SIZE:
+            _sodacl_indexes.popitem(last=False)
+    return sodacl_index
+
+
+def _get_section_table(section: str) -> Optional[str]:
+    """
+    Get the table a section of a checks file belongs to, if any.
+    """
+    for pattern in (CHECKS_FOR_TABLE_PATTERN, FILTER_FOR_TABLE_PATTERN):
+        match = pattern.match(section)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _split_sections_text(
+    sodacl_yaml_str: str,
+) -> Optional[Tuple[str, List[Tuple[str, str]]]]:
+    """
+    Split the text of a checks file into its header, the comments and
+    directives before its first section, and the name and text of each of
+    its top-level sections, with the comments right before them, so that
+    sections can be written back as is.
+    Returns `None` if the checks file is not a mapping whose sections
+    start on lines of their own.
+    """
+    root = compose(sodacl_yaml_str, Loader=SafeLoader)
+    if not isinstance(root, MappingNode) or root.flow_style:
+        return None
+    key_lines = [key.start_mark.line for key, _ in root.value]
+    if key_lines != sorted(set(key_lines)):
+        return None
+
+    lines = sodacl_yaml_str.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    starts = []
+    previous_line = -1
+    for line in key_lines:
+        # Comments and blank lines above a section belong to it
+        while line - 1 > previous_line and (
+            not lines[line - 1].strip() or lines[line - 1].startswith("#")
+        ):
+            line -= 1
+        starts.append(line)
+        previous_line = line
+    ends = starts[1:] + [len(lines)]
+    header = "".join(lines[: starts[0]]) if starts else ""
+    return header, [
+        (str(key.value), "".join(lines[start:end]))
+        for (key, _), start, end in zip(root.value, starts, ends)
+    ]
+
+
+def split_sodacl_by_table(
+    sodacl_yaml_str: str, max_shards: Optional[int] = None
+) -> List[str]:
+    """
+    Split a SodaCL checks file into shards that can be scanned independently.
+    The sections of each table, including the filters its partitioned checks
+    rely on, always end up in the same shard, while the sections that do not
+    belong to a table, like `for each dataset`, end up in a shard of their own.
+    The text of every section is kept as is, comments included, in the order
+    of the checks file, so that Soda parses the shards as it would parse
+    the whole checks file.
+
+    Args:
+        sodacl_yaml_str: The content of the SodaCL checks file.
+        max_shards: The maximum number of shards of tables. If provided,
+            tables are balanced between shards by number of checks.
+            If not provided, there is one shard for each table.
+
+    Raises:
+        `ValueError` if `max_shards` is lower than 1.
+        `YAMLError` if the content is not valid YAML.
+
+    Returns:
+        The content of each shard, as a SodaCL YAML string.
+    """
+    if max_shards is not None and max_shards < 1:
+        raise ValueError("The number of shards must be at least 1.")
+
+    sections_text = _split_sections_text(sodacl_yaml_str)
+    if sections_text is None:
+        return [sodacl_yaml_str]
+    header, sections = sections_text
+
+    # Indexes of the sections of each table, and of the other sections
+    sections_by_table: Dict[str, List[int]] = {}
+    other_sections = []
+    for index, (section, _) in enumerate(sections):
+        table = _get_section_table(section)
+        if table is None:
+            other_sections.append(index)
+        else:
+            sections_by_table.setdefault(table, []).append(index)
+
+    checks_count_by_table = get_sodacl_index(sodacl_yaml_str).checks_count_by_table
+    if max_shards is None:
+        shards = list(sections_by_table.values())
+    else:
+        # Longest processing time first: assign the tables with the most
+        #   checks first, each to the shard with the fewest checks so far
+        shards = [[] for _ in range(min(max_shards, len(sections_by_table)))]
+        shard_sizes = [0] * len(shards)
+        for table in sorted(
+            sections_by_table,
+            key=lambda table: checks_count_by_table.get(table, 0),
+            reverse=True,
+        ):
+            index = shard_sizes.index(min(shard_sizes))
+            shards[index].extend(sections_by_table[table])
+            shard_sizes[index] += checks_count_by_table.get(table, 0)
+
+    if other_sections:
+        shards.append(other_sections)
+
+    return [
+        header + "".join(sections[index][1] for index in sorted(shard))
+        for shard in shards
+    ]
@@ -3,14 +3,448 @@ Collection of tasks that can be used to run Data Quality checks
 using Soda Core.
 """
 import json
-from typing import Dict, List, Optional, Union
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import partial
+from glob import glob
+from tempfile import TemporaryDirectory
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from anyio import CapacityLimiter, create_task_group, to_thread
 from prefect import get_run_logger, task
 from prefect.context import get_run_context
 from prefect_shell import shell_run_command
 
+from prefect_soda_core.duration_store import ScanDurationStore, hash_sodacl_content
+from prefect_soda_core.fork_server import execute_scan_in_fork_server
+from prefect_soda_core.log_streaming import ScanLogSummary, stream_soda_scan_logs
+from prefect_soda_core.metrics import (
+    SCAN_STATUS_ERROR,
+    SCAN_STATUS_SUCCESS,
+    ScanMetrics,
+)
+from prefect_soda_core.persistence import Materialization, get_memory_directory
+from prefect_soda_core.profiling import (
+    PROFILE_TOP_N,
+    build_profiled_soda_command,
+    create_profile_artifacts,
+    run_profiled,
+)
+from prefect_soda_core.scan_cache import ScanResultCache
+from prefect_soda_core.scan_engines import (
+    SCAN_CHECKS_FAILED_EXIT_CODE,
+    ExecutionMode,
+    build_soda_command,
+    execute_dataframe_scan_in_process,
+    execute_scan_in_process,
+    execute_spark_scan_in_process,
+)
+from prefect_soda_core.scan_results import (
+    ScanResult,
+    merge_scan_results,
+    split_scan_results_by_checks_file,
+)
+from prefect_soda_core.scan_timing import (
+    PHASE_BUILD_COMMAND,
+    PHASE_PARSE_RESULTS,
+    PHASE_PERSIST_CHECKS,
+    PHASE_PERSIST_CONFIGURATION,
+    PHASE_SCAN,
+    ScanTimer,
+    SpanHook,
+)
 from prefect_soda_core.soda_configuration import SodaConfiguration
 from prefect_soda_core.sodacl_check import SodaCLCheck
+from prefect_soda_core.sodacl_index import split_sodacl_by_table
+from prefect_soda_core.worker_pool import SodaWorkerPool, get_default_worker_pool
+
+# Sentinel telling apart a cache miss from a cached `None` result
+_CACHE_MISS = object()
+
+
+def _get_default_scan_results_file(
+    suffix: str = "", directory: Optional[str] = None, extension: str = ".json"
+) -> str:
+    """
+    Get the path of the scan results file of the current task run,
+    built from the task run name and start time, and an optional suffix.
+    The file is in `directory` if provided, in the current working
+    directory otherwise.
+    """
+    task_run_name = get_run_context().task_run.name
+    task_run_start_time = get_run_context().task_run.start_time
+    file_name = f"{task_run_start_time}--{task_run_name}{suffix}{extension}"
+    return os.path.join(directory, file_name) if directory else file_name
+
+
+class _ScanFiles(NamedTuple):
+    """
+    Paths of the materialized configuration and checks files of a scan,
+    and of its isolated workspace directory, if any.
+    """
+
+    configuration_yaml_path: str
+    sodacl_yaml_paths: List[str]
+    workspace: Optional[str] = None
+
+
+@contextmanager
+def _materialize_scan_files(
+    configuration: SodaConfiguration,
+    checks: List[SodaCLCheck],
+    isolate_workspace: bool = False,
+    timer: Optional[ScanTimer] = None,
+) -> Iterator[_ScanFiles]:
+    """
+    Materialize the configuration and checks of a scan on the file system.
+    The blocks using the `memory` materialization, or all of them if
+    `isolate_workspace` is `True`, are written to a temporary workspace
+    directory, which is removed on exit. The workspace is RAM-backed
+    if any of the blocks uses the `memory` materialization.
+    If `timer` is provided, it records how long persisting took.
+    """
+    timer = timer or ScanTimer()
+    blocks = [configuration, *checks]
+    uses_memory = any(
+        block.materialization is Materialization.MEMORY for block in blocks
+    )
+    if not uses_memory and not isolate_workspace:
+        with timer.phase(PHASE_PERSIST_CONFIGURATION):
+            configuration_yaml_path = configuration.materialize_configuration()
+        with timer.phase(PHASE_PERSIST_CHECKS):
+            sodacl_yaml_paths = [
+                sodacl_check.materialize_checks() for sodacl_check in checks
+            ]
+        yield _ScanFiles(
+            configuration_yaml_path=configuration_yaml_path,
+            sodacl_yaml_paths=sodacl_yaml_paths,
+        )
+        return
+
+    with TemporaryDirectory(
+        prefix="prefect-soda-", dir=get_memory_directory() if uses_memory else None
+    ) as workspace:
+
+        def get_directory(block, *parts):
+            """
+            Get the directory of the workspace where the YAML string of
+            a block is written, or `None` if it is written at its own path.
+            """
+            if block.materialization is Materialization.DISK and not isolate_workspace:
+                return None
+            directory = os.path.join(workspace, *parts)
+            os.makedirs(directory, exist_ok=True)
+            return directory
+
+        with timer.phase(PHASE_PERSIST_CONFIGURATION):
+            configuration_yaml_path = configuration.materialize_configuration(
+                get_directory(configuration)
+            )
+        # Checks files are written to their own directory, as several
+        #   of them may share the same file name
+        with timer.phase(PHASE_PERSIST_CHECKS):
+            sodacl_yaml_paths = [
+                sodacl_check.materialize_checks(
+                    get_directory(sodacl_check, "checks", str(index))
+                )
+                for index, sodacl_check in enumerate(checks)
+            ]
+        yield _ScanFiles(
+            configuration_yaml_path=configuration_yaml_path,
+            sodacl_yaml_paths=sodacl_yaml_paths,
+            workspace=workspace if isolate_workspace else None,
+        )
+
+
+async def _execute_scan(
+    data_source_name: str,
+    configuration: SodaConfiguration,
+    configuration_yaml_path: str,
+    sodacl_yaml_paths: List[str],
+    variables: Optional[Dict[str, str]],
+    scan_results_file: Optional[str],
+    verbose: bool,
+    shell_env: Optional[Dict[str, str]],
+    execution_mode: Optional[ExecutionMode],
+    worker_pool: Optional[SodaWorkerPool],
+    log_summary: Optional[ScanLogSummary] = None,
+    timer: Optional[ScanTimer] = None,
+    profile_file: Optional[str] = None,
+    reuse_connections: bool = False,
+    collect_logs: bool = False,
+) -> List[str]:
+    """
+    Execute a Soda scan of the provided checks files with the requested
+    execution mode, and return the logs it produced.
+    If `log_summary` is provided, logs are added to it as they are
+    produced instead of being returned.
+    If `timer` is provided, it records how long each phase took.
+    If `profile_file` is provided, the scan runs under `cProfile` and its
+    raw profile is written there, unless the execution mode runs scans
+    in processes that are not started for the scan.
+    If `reuse_connections` is `True`, scans running in long-lived processes
+    reuse pooled data source connections.
+    If `collect_logs` is `True`, the logs of CLI scans are collected as they
+    are produced, so that they are returned even when checks fail.
+    Failing checks are not considered an error.
+    """
+    execution_mode = ExecutionMode(execution_mode or configuration.execution_mode)
+    timer = timer or ScanTimer()
+
+    # Init soda_logs
+    soda_logs = []
+    if execution_mode is not ExecutionMode.CLI:
+        if execution_mode is ExecutionMode.WORKER_POOL:
+            execute_scan = (worker_pool or get_default_worker_pool()).execute_scan
+        elif execution_mode is ExecutionMode.FORK_SERVER:
+            execute_scan = execute_scan_in_fork_server
+        else:
+            execute_scan = execute_scan_in_process
+
+        scan_kwargs = {}
+        if reuse_connections:
+            if execution_mode is ExecutionMode.FORK_SERVER:
+                get_run_logger().warning(
+                    "Connections cannot be reused with execution mode "
+                    f"{execution_mode.value}, as every scan runs in a new process."
+                )
+            else:
+                scan_kwargs["reuse_connections"] = True
+
+        if shell_env:
+            if execution_mode is ExecutionMode.IN_PROCESS:
+                # The environment is shared by all the scans of the process
+                get_run_logger().warning(
+                    "Environment variables cannot be set with execution mode "
+                    f"{execution_mode.value}, shell_env is ignored."
+                )
+            else:
+                scan_kwargs["env"] = shell_env
+
+        if profile_file is not None:
+            if execution_mode is ExecutionMode.IN_PROCESS:
+                execute_scan = partial(run_profiled, execute_scan, profile_file)
+            else:
+                get_run_logger().warning(
+                    f"Profiling is not supported with execution mode "
+                    f"{execution_mode.value}, the scan is not profiled."
+                )
+
+        get_run_logger().debug(
+            f"Running Soda scan with execution mode {execution_mode.value} "
+            f"against data source {data_source_name}"
+        )
+        with timer.phase(PHASE_SCAN):
+            exit_code, soda_logs = await to_thread.run_sync(
+                partial(
+                    execute_scan,
+                    data_source_name=data_source_name,
+                    configuration_yaml_path=configuration_yaml_path,
+                    sodacl_yaml_paths=sodacl_yaml_paths,
+                    variables=variables,
+                    scan_results_file=scan_results_file,
+                    verbose=verbose,
+                    **scan_kwargs,
+                )
+            )
+        # Failing checks are not an error, consistently with the CLI execution
+        if exit_code not in (0, SCAN_CHECKS_FAILED_EXIT_CODE):
+            logs_str = "\n".join(soda_logs)
+            raise RuntimeError(f"Scan failed with exit code {exit_code}: {logs_str}")
+
+        if log_summary is not None:
+            for line in soda_logs:
+                log_summary.add_line(line)
+            soda_logs = []
+    else:
+        if reuse_connections:
+            get_run_logger().warning(
+                "Connections cannot be reused with execution mode "
+                f"{execution_mode.value}, as every scan runs in a new process."
+            )
+        with timer.phase(PHASE_BUILD_COMMAND):
+            command = build_soda_command(
+                data_source_name=data_source_name,
+                configuration_yaml_path=configuration_yaml_path,
+                sodacl_yaml_paths=sodacl_yaml_paths,
+                variables=variables,
+                scan_results_file=scan_results_file,
+                verbose=verbose,
+            )
+        if profile_file is not None:
+            command = build_profiled_soda_command(command, profile_file)
+
+        # Log Soda command for debuggin purpose
+        logger = get_run_logger()
+        logger.debug(f"Soda requested command is: {command}")
+
+        if log_summary is not None:
+            # Process logs as they arrive, without keeping them all in memory
+            with timer.phase(PHASE_SCAN):
+                async for line in stream_soda_scan_logs(
+                    command=command, env=shell_env, timer=timer
+                ):
+                    logger.info(line)
+                    log_summary.add_line(line)
+            return soda_logs
+
+        if collect_logs:
+            # The logs are lost when `shell_run_command` fails on failing checks
+            with timer.phase(PHASE_SCAN):
+                async for line in stream_soda_scan_logs(
+                    command=command, env=shell_env, timer=timer
+                ):
+                    logger.info(line)
+                    soda_logs.append(line)
+            return soda_logs
+
+        try:
+            # Execute Soda command
+            with timer.phase(PHASE_SCAN):
+                soda_logs = await shell_run_command.fn(
+                    command=command, env=shell_env, return_all=True
+                )
+        except RuntimeError as e:
+            # Ignoring the Runtime Error with code 2 that is raised
+            #   when the soda test runs successfully but the check fails
+            #   causing the flow to break.
+            if not str(e).startswith("Command failed with exit code 2:"):
+                raise e
+
+    return soda_logs
+
+
+def _log_scan_timings(timer: ScanTimer):
+    """
+    Log the durations of the phases of a scan, both readable in the message
+    and structured in the `soda_scan_timings` extra of the log record.
+    """
+    durations_str = ", ".join(
+        f"{phase}={duration:.3f}s" for phase, duration in timer.durations.items()
+    )
+    get_run_logger().info(
+        f"Soda scan phase timings: {durations_str}",
+        extra={"soda_scan_timings": timer.to_event()},
+    )
+
+
+def _record_scan_metrics(
+    metrics: ScanMetrics,
+    data_source_name: str,
+    duration: float,
+    soda_logs: List[str],
+    log_summary: Optional[ScanLogSummary] = None,
+    scan_results: Optional[Union[Dict, ScanResult]] = None,
+    scan_results_file: Optional[str] = None,
+):
+    """
+    Record a successful scan in `metrics`, counting the outcomes of its checks
+    from the Soda summary log line, or from its results when available.
+    """
+    if log_summary is None:
+        # Only used for its counters, so no log line is kept
+        log_summary = ScanLogSummary(tail_size=0)
+        for line in soda_logs:
+            log_summary.add_line(line)
+    outcome_counts = {
+        "pass": log_summary.passes_count,
+        "warn": log_summary.warnings_count,
+        "fail": log_summary.failures_count,
+        "error": log_summary.errors_count,
+    }
+
+    scan_result = scan_results
+    if isinstance(scan_results, dict):
+        scan_result = ScanResult.from_dict(scan_results)
+    if scan_result is not None and scan_result.checks:
+        for outcome, count in scan_result.outcome_counts.items():
+            if outcome in outcome_counts:
+                outcome_counts[outcome] = count
+
+    has_results_file = scan_results_file is not None and os.path.exists(
+        scan_results_file
+    )
+    metrics.scan_finished(
+        data_source_name=data_source_name,
+        duration=duration,
+        status=SCAN_STATUS_SUCCESS,
+        outcome_counts=outcome_counts,
+        log_bytes=log_summary.bytes_count,
+        results_bytes=os.path.getsize(scan_results_file) if has_results_file else 0,
+    )
+
+
+def _raise_for_scan_errors(errors: Dict[int, Tuple[str, Exception]], scans_count: int):
+    """
+    Raise a single error for the scans that failed among the `scans_count`
+    scans run together, if any, given the description and the error of each
+    failed scan, keyed by scan index.
+    """
+    if not errors:
+        return
+    sorted_errors = [errors[index] for index in sorted(errors)]
+    errors_str = "\n".join(
+        f"- {description}: {error}" for description, error in sorted_errors
+    )
+    raise RuntimeError(
+        f"{len(errors)} of {scans_count} Soda scans failed:\n{errors_str}"
+    ) from sorted_errors[0][1]
+
+
+async def _schedule_longest_first(
+    duration_store: Optional[ScanDurationStore],
+    jobs: List[Tuple[int, str, SodaCLCheck]],
+) -> List[Tuple[int, str, SodaCLCheck]]:
+    """
+    Order `(index, data_source_name, checks)` scan jobs so that the ones
+    expected to be the longest start first, if a duration store is provided.
+    The store is queried in a worker thread, not to block the event loop.
+    """
+    if duration_store is None:
+        return jobs
+    return await to_thread.run_sync(
+        partial(
+            duration_store.sort_longest_first,
+            jobs,
+            get_key=lambda job: (job[1], hash_sodacl_content(job[2].read_checks())),
+        )
+    )
+
+
+async def _record_scan_duration(
+    duration_store: ScanDurationStore,
+    data_source_name: str,
+    get_sodacl_content: Callable[[], str],
+    duration: float,
+):
+    """
+    Record the duration of a scan in a worker thread, as reading the checks
+    and writing to the store would otherwise block the event loop.
+    """
+
+    def record():
+        """
+        Hash the checks and record the duration of the scan.
+        """
+        duration_store.record(
+            data_source_name=data_source_name,
+            checks_hash=hash_sodacl_content(get_sodacl_content()),
+            duration=duration,
+        )
+
+    await to_thread.run_sync(record)
 
 
 @task
@@ -23,7 +457,20 @@ async def soda_scan_execute(
     verbose: bool = False,
     return_scan_result_file_content: bool = False,
     shell_env: Optional[Dict[str, str]] = None,
-) -> Union[List, str]:
+    execution_mode: Optional[ExecutionMode] = None,
+    worker_pool: Optional[SodaWorkerPool] = None,
+    stream_logs: bool = False,
+    log_tail_size: int = 100,
+    return_scan_result: bool = False,
+    cache: Optional[ScanResultCache] = None,
+    isolate_workspace: bool = False,
+    duration_store: Optional[ScanDurationStore] = None,
+    span_hook: Optional[SpanHook] = None,
+    profile: bool = False,
+    profile_top_n: int = PROFILE_TOP_N,
+    metrics: Optional[ScanMetrics] = None,
+    reuse_connections: bool = False,
+) -> Union[List, str, Dict, ScanResult]:
     """
     Task that execute a Soda Scan.
     First, the scan is created and configured using the provided
@@ -52,14 +499,77 @@ async def soda_scan_execute(
             otherwise it will return the stdout of the soda shell task.
             Default to `False`.
         shell_env: A `Dict[str, str]` that contains all environment variables
-            that will be passed to the soda shell task.
+            that will be passed to the soda shell task, or to the scan
+            subprocess with the `worker_pool` and `fork_server` execution
+            modes. Ignored, with a warning, with the `in_process` one.
+        execution_mode: How to execute the scan, either through the `soda`
+            CLI (`cli`), inside the current process with the soda-core
+            `Scan` API (`in_process`), in a pool of pre-warmed worker
+            processes (`worker_pool`) or in a subprocess forked from a fork
+            server (`fork_server`). If not provided, the `execution_mode`
+            of `configuration` will be used.
+        worker_pool: The `SodaWorkerPool` used to run the scan when the
+            execution mode is `worker_pool`. If not provided, a default pool
+            shared by the whole process will be used.
+        stream_logs: Whether to process the scan logs as they are produced,
+            keeping only a bounded summary of them, instead of returning
+            all of them. Default to `False`.
+        log_tail_size: Number of log lines kept at the end of the logs when
+            `stream_logs` is `True`. Default to `100`.
+        return_scan_result: Whether to return the scan results as a typed
+            `ScanResult` object, with typed access to the outcome counts,
+            checks, metrics and duration of the scan. Takes precedence over
+            `return_scan_result_file_content`. Default to `False`.
+        cache: The `ScanResultCache` used to return the result of an identical
+            scan that ran recently, without running the scan again. Scans are
+            identical when the content of their configuration and checks, their
+            variables, their data source and the options changing the result of
+            the task are the same. Please note that, on a cache hit, the scan
+            results file is not written. If not provided, scans always run.
+        isolate_workspace: Whether to run the scan in its own temporary
+            workspace directory, removed when the task ends. The YAML strings
+            of the configuration and checks are written there instead of at
+            their configured paths, together with the scan results file if
+            `scan_results_file` is not provided, so that concurrent scans
+            never share files. Default to `False`.
+        duration_store: The `ScanDurationStore` where the duration of the scan
+            is recorded. If not provided, the duration is not recorded.
+        span_hook: A function opening a span for each phase of the scan, called
+            with the name and, as keyword argument, the `attributes` of the
+            span, and returning a context manager that is exited when the
+            phase ends, like `tracer.start_as_current_span` of OpenTelemetry.
+            Whether or not it is provided, the durations of the phases are
+            logged as a structured event at the end of the scan.
+        profile: Whether to run the scan under `cProfile`, and publish the
+            functions that took the most time, together with a link to the
+            raw profile file written in the current working directory, as
+            artifacts of the task run. Supported by the `in_process` and `cli`
+            execution modes, the former profiling only the scan while the
+            latter also profiles the start of the `soda` CLI.
+            Default to `False`.
+        profile_top_n: Number of functions in the table of the functions that
+            took the most time, when `profile` is `True`. Default to `20`.
+        metrics: The `ScanMetrics` where the start and the end of the scan,
+            its duration, the outcomes of its checks and the size of its logs
+            and results are recorded. If not provided, they are not recorded.
+            When provided, the logs of scans executed through the CLI are
+            returned even when checks fail.
+        reuse_connections: Whether to reuse a live connection to the data source
+            from a previous scan of the same process, with the same data source
+            configuration, instead of opening a new one, and to keep the
+            connection open for the next scans. Supported by the `in_process`
+            and `worker_pool` execution modes, every worker having a pool of
+            its own. Default to `False`.
 
     Raises:
         `RuntimeError` in case `soda scan` encounters any error
             during execution.
 
     Returns:
-        Logs produced by running `soda scan` CLI command.
+        Logs produced by running `soda scan` CLI command. If `stream_logs`
+            is `True`, a summary of the logs made of their last lines,
+            their number and size, and the outcome counters of the scan.
+            If `return_scan_result` is `True`, a `ScanResult` object.
 
     Example:
         ```python
@@ -82,70 +592,891 @@ async def soda_scan_execute(
                 scan_results_file="scan_results.json",
                 verbose=False,
                 return_scan_result_file_content=False,
+                # Not set with the `in_process` execution mode, which shares
+                #   the environment of the flow run
                 shell_env={"SNOWFLAKE_PASSWORD": "********"}
             )
         ```
     """
-    # Persist the configuration on the file system, if necessary
-    configuration.persist_configuration()
+    timer = ScanTimer(
+        span_hook=span_hook,
+        attributes={
+            "data_source_name": data_source_name,
+            "execution_mode": ExecutionMode(
+                execution_mode or configuration.execution_mode
+            ).value,
+        },
+    )
+    # Persist the configuration and checks on the file system, if necessary
+    with _materialize_scan_files(
+        configuration, [checks], isolate_workspace=isolate_workspace, timer=timer
+    ) as scan_files:
+        # Return the result of an identical scan that ran recently, if any
+        if cache is not None:
+            cache_key = cache.make_key(
+                data_source_name=data_source_name,
+                configuration_yaml_path=scan_files.configuration_yaml_path,
+                sodacl_yaml_paths=scan_files.sodacl_yaml_paths,
+                variables=variables,
+                verbose=verbose,
+                return_scan_result_file_content=return_scan_result_file_content,
+                return_scan_result=return_scan_result,
+                stream_logs=stream_logs,
+                log_tail_size=log_tail_size,
+            )
+            cached_result = cache.get(cache_key, default=_CACHE_MISS)
+            if cached_result is not _CACHE_MISS:
+                get_run_logger().info(
+                    f"Returning the cached result of an identical scan ({cache_key})."
+                )
+                return cached_result
+
+        # If the scan results are returned, save the output of the scan to a file
+        if return_scan_result_file_content is True or return_scan_result is True:
+            # Implicitly use task run name and time to store
+            #   the JSON-based scan results file
+            if scan_results_file is None:
+                scan_results_file = _get_default_scan_results_file(
+                    directory=scan_files.workspace
+                )
+        else:
+            # The scan results file is only written when its content is returned
+            scan_results_file = None
+
+        log_summary = ScanLogSummary(tail_size=log_tail_size) if stream_logs else None
+        # The profile is kept once the task ends, whatever its workspace
+        profile_file = (
+            _get_default_scan_results_file(suffix="--profile", extension=".prof")
+            if profile
+            else None
+        )
+        if metrics is not None:
+            metrics.scan_started(data_source_name)
+        start_time = time.monotonic()
+        try:
+            soda_logs = await _execute_scan(
+                data_source_name=data_source_name,
+                configuration=configuration,
+                configuration_yaml_path=scan_files.configuration_yaml_path,
+                sodacl_yaml_paths=scan_files.sodacl_yaml_paths,
+                variables=variables,
+                scan_results_file=scan_results_file,
+                verbose=verbose,
+                shell_env=shell_env,
+                execution_mode=execution_mode,
+                worker_pool=worker_pool,
+                log_summary=log_summary,
+                timer=timer,
+                profile_file=profile_file,
+                reuse_connections=reuse_connections,
+                collect_logs=metrics is not None,
+            )
+        except Exception:
+            if metrics is not None:
+                metrics.scan_finished(
+                    data_source_name=data_source_name,
+                    duration=time.monotonic() - start_time,
+                    status=SCAN_STATUS_ERROR,
+                )
+            raise
+        duration = time.monotonic() - start_time
+        if duration_store is not None:
+            await _record_scan_duration(
+                duration_store,
+                data_source_name=data_source_name,
+                get_sodacl_content=checks.read_checks,
+                duration=duration,
+            )
+        scan_logs = soda_logs
+        if log_summary is not None:
+            soda_logs = log_summary.to_dict()
+        if profile_file is not None and os.path.exists(profile_file):
+            await create_profile_artifacts(profile_file, top_n=profile_top_n)
+
+        if return_scan_result is True:
+            # Parse the scan results file incrementally into a typed object
+            with timer.phase(PHASE_PARSE_RESULTS):
+                soda_logs = ScanResult.from_file(scan_results_file)
+        elif return_scan_result_file_content is True:
+            # Get logs from scan result file
+            with timer.phase(PHASE_PARSE_RESULTS), open(scan_results_file, "r") as f:
+                soda_logs = json.load(f)
+
+        if metrics is not None:
+            _record_scan_metrics(
+                metrics,
+                data_source_name=data_source_name,
+                duration=duration,
+                soda_logs=scan_logs,
+                log_summary=log_summary,
+                scan_results=soda_logs if scan_results_file is not None else None,
+                scan_results_file=scan_results_file,
+            )
+        _log_scan_timings(timer)
+
+        if cache is not None:
+            cache.set(cache_key, soda_logs)
+
+        return soda_logs
+
+
+@task
+async def soda_scan_execute_batch(
+    data_source_name: str,
+    configuration: SodaConfiguration,
+    checks: Union[List[SodaCLCheck], str],
+    variables: Optional[Dict[str, str]],
+    scan_results_file: Optional[str] = None,
+    verbose: bool = False,
+    shell_env: Optional[Dict[str, str]] = None,
+    execution_mode: Optional[ExecutionMode] = None,
+    worker_pool: Optional[SodaWorkerPool] = None,
+    isolate_workspace: bool = False,
+    duration_store: Optional[ScanDurationStore] = None,
+    metrics: Optional[ScanMetrics] = None,
+) -> Dict[str, Dict]:
+    """
+    Task that execute a single Soda Scan for several SodaCL checks files.
+    The connection to the data source and the metric queries shared by
+    several checks files are made only once, while the scan results are
+    still reported separately for each checks file.
+
+    Args:
+        data_source_name: The name of the data source against
+            which the checks will be executed. The data source name
+            must match one of the data sources provided in the
+            `configuration` object.
+        configuration: `SodaConfiguration` object that will be used
+            to configure the scan before its execution.
+        checks: Either a list of `SodaCLCheck` objects or a glob pattern
+            matching the SodaCL checks files to run together.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scan_results_file: The path to the file where the scan results
+            will be stored. If not provided, the scan results will be
+            stored in the current working directory, using the task run
+            name and start time as file name.
+        verbose: Whether to run the checks with a verbose log or not.
+            Default to `False`.
+        shell_env: A `Dict[str, str]` that contains all environment variables
+            that will be passed to the soda shell task, or to the scan
+            subprocess with the `worker_pool` and `fork_server` execution
+            modes. Ignored, with a warning, with the `in_process` one.
+        execution_mode: How to execute the scan, see `soda_scan_execute`.
+            If not provided, the `execution_mode` of `configuration`
+            will be used.
+        worker_pool: The `SodaWorkerPool` used to run the scan when the
+            execution mode is `worker_pool`. If not provided, a default pool
+            shared by the whole process will be used.
+        isolate_workspace: Whether to run the scan in its own temporary
+            workspace directory, see `soda_scan_execute`. Default to `False`.
+        duration_store: The `ScanDurationStore` where the duration of the scan
+            is recorded, keyed by the content of all its checks files.
+            If not provided, the duration is not recorded.
+        metrics: The `ScanMetrics` where the start and the end of the scan,
+            its duration, the outcomes of its checks and the size of its logs
+            and results are recorded. If not provided, they are not recorded.
+
+    Raises:
+        `ValueError` if no checks file is provided or matches the glob pattern,
+            or if several checks share the same `sodacl_yaml_path`.
+        `RuntimeError` in case `soda scan` encounters any error
+            during execution.
+
+    Returns:
+        The scan results of each checks file, keyed by checks file path.
+
+    Example:
+        ```python
+        from prefect_soda_core.soda_configuration import SodaConfiguration
+        from prefect_soda_core.tasks import soda_scan_execute_batch
+
+        from prefect import flow
+
+        soda_configuration_block = SodaConfiguration.load("SODA_CONF_BLOCK_NAME")
+
+        @flow
+        def run_soda_scan():
+            return soda_scan_execute_batch(
+                data_source_name="datasource",
+                configuration=soda_configuration_block,
+                checks="/path/to/checks/*.yaml",
+                variables={"key": "value"},
+            )
+        ```
+    """
+    if isinstance(checks, str):
+        sodacl_checks = [
+            SodaCLCheck(sodacl_yaml_path=sodacl_yaml_path)
+            for sodacl_yaml_path in sorted(glob(checks, recursive=True))
+        ]
+    else:
+        sodacl_checks = list(checks)
 
-    # Perists checks on the file system, if necessary
-    checks.persist_checks()
+    if not sodacl_checks:
+        raise ValueError(f"No SodaCL checks file to scan was found in {checks!r}.")
 
-    # Soda command initial definition
-    command = (
-        f"soda scan -d {data_source_name} -c {configuration.configuration_yaml_path}"
+    # Checks files sharing a path would overwrite each other's file,
+    #   and their results would be reported under the same key
+    sodacl_yaml_paths = Counter(
+        os.path.abspath(sodacl_check.sodacl_yaml_path) for sodacl_check in sodacl_checks
+    )
+    duplicate_paths = sorted(
+        path for path, count in sodacl_yaml_paths.items() if count > 1
     )
+    if duplicate_paths:
+        raise ValueError(
+            f"Several SodaCL checks share the same path: {', '.join(duplicate_paths)}."
+        )
 
-    # If variables are provided, add the to Soda command
-    if variables:
-        var_str = "".join(
-            [
-                f'-v "{var_name}={var_value}" '
-                for var_name, var_value in variables.items()
-            ]
+    # Persist the configuration and checks on the file system, if necessary
+    with _materialize_scan_files(
+        configuration, sodacl_checks, isolate_workspace=isolate_workspace
+    ) as scan_files:
+        # Scan results are needed to report them for each checks file
+        if scan_results_file is None:
+            scan_results_file = _get_default_scan_results_file(
+                directory=scan_files.workspace
+            )
+
+        if metrics is not None:
+            metrics.scan_started(data_source_name)
+        start_time = time.monotonic()
+        try:
+            soda_logs = await _execute_scan(
+                data_source_name=data_source_name,
+                configuration=configuration,
+                configuration_yaml_path=scan_files.configuration_yaml_path,
+                sodacl_yaml_paths=scan_files.sodacl_yaml_paths,
+                variables=variables,
+                scan_results_file=scan_results_file,
+                verbose=verbose,
+                shell_env=shell_env,
+                execution_mode=execution_mode,
+                worker_pool=worker_pool,
+                collect_logs=metrics is not None,
+            )
+        except Exception:
+            if metrics is not None:
+                metrics.scan_finished(
+                    data_source_name=data_source_name,
+                    duration=time.monotonic() - start_time,
+                    status=SCAN_STATUS_ERROR,
+                )
+            raise
+        duration = time.monotonic() - start_time
+        if duration_store is not None:
+            await _record_scan_duration(
+                duration_store,
+                data_source_name=data_source_name,
+                get_sodacl_content=lambda: "\0".join(
+                    sodacl_check.read_checks() for sodacl_check in sodacl_checks
+                ),
+                duration=duration,
+            )
+
+        with open(scan_results_file, "r") as f:
+            scan_results = json.load(f)
+        if metrics is not None:
+            _record_scan_metrics(
+                metrics,
+                data_source_name=data_source_name,
+                duration=duration,
+                soda_logs=soda_logs,
+                scan_results=scan_results,
+                scan_results_file=scan_results_file,
+            )
+
+    results_by_checks_file = split_scan_results_by_checks_file(
+        scan_results=scan_results, sodacl_yaml_paths=scan_files.sodacl_yaml_paths
+    )
+    # Report the results under the paths of the blocks, even when
+    #   the checks have been materialized somewhere else
+    return {
+        sodacl_check.sodacl_yaml_path: results_by_checks_file[sodacl_yaml_path]
+        for sodacl_check, sodacl_yaml_path in zip(
+            sodacl_checks, scan_files.sodacl_yaml_paths
         )
+    }
 
-        command = f"{command} {var_str}"
 
-    # If return_scan_result_file_content is True, save the output of the scan to a file
-    if return_scan_result_file_content is True:
-        # Implicitly use task run name and time to store
-        #   the JSON-based scan results file
-        if scan_results_file is None:
-            task_run_name = get_run_context().task_run.name
-            task_run_start_time = get_run_context().task_run.start_time
-            scan_results_file = f"{task_run_start_time}--{task_run_name}.json"
+@task
+async def soda_scan_execute_fan_out(
+    configuration: SodaConfiguration,
+    variables: Optional[Dict[str, str]],
+    scans: Optional[List[Tuple[str, SodaCLCheck]]] = None,
+    checks: Optional[SodaCLCheck] = None,
+    max_concurrency: int = 4,
+    max_concurrency_per_data_source: int = 1,
+    verbose: bool = False,
+    return_scan_result_file_content: bool = False,
+    shell_env: Optional[Dict[str, str]] = None,
+    execution_mode: Optional[ExecutionMode] = None,
+    worker_pool: Optional[SodaWorkerPool] = None,
+    isolate_workspace: bool = False,
+    duration_store: Optional[ScanDurationStore] = None,
+    metrics: Optional[ScanMetrics] = None,
+) -> Dict[str, List[Union[List, Dict]]]:
+    """
+    Task that execute several Soda Scans concurrently, against one or more
+    data sources, while bounding the number of scans running at the same time
+    overall and against each data source.
 
-        command = f"{command} -srf {scan_results_file}"
+    Args:
+        configuration: `SodaConfiguration` object that will be used
+            to configure the scans before their execution.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scans: A list of `(data_source_name, checks)` pairs, one for each
+            scan to execute. If not provided, `checks` will be executed
+            against every data source declared in `configuration`.
+        checks: `SodaCLCheck` object executed against every data source
+            declared in `configuration`. Ignored if `scans` is provided.
+        max_concurrency: Maximum number of scans running at the same time.
+            Default to `4`.
+        max_concurrency_per_data_source: Maximum number of scans running at
+            the same time against a single data source. Default to `1`.
+        verbose: Whether to run the checks with a verbose log or not.
+            Default to `False`.
+        return_scan_result_file_content: Controls the return of each scan.
+            If `True`, the content of the scan results will be returned,
+            otherwise the stdout of the soda shell task will be returned.
+            Default to `False`.
+        shell_env: A `Dict[str, str]` that contains all environment variables
+            that will be passed to the soda shell task, or to the scan
+            subprocess with the `worker_pool` and `fork_server` execution
+            modes. Ignored, with a warning, with the `in_process` one.
+        execution_mode: How to execute the scans, see `soda_scan_execute`.
+            If not provided, the `execution_mode` of `configuration`
+            will be used.
+        worker_pool: The `SodaWorkerPool` used to run the scans when the
+            execution mode is `worker_pool`. If not provided, a default pool
+            shared by the whole process will be used.
+        isolate_workspace: Whether to run each scan in its own temporary
+            workspace directory, see `soda_scan_execute`. Default to `False`.
+        duration_store: The `ScanDurationStore` where the duration of each
+            scan is recorded, and used to start the scans expected to be the
+            longest first. If not provided, scans are started in order.
+        metrics: The `ScanMetrics` where every scan, and the time it waited
+            for a concurrency slot, are recorded. If not provided,
+            they are not recorded.
 
-    # If verbose logging is requested, add corresponding option to Soda command
-    if verbose:
-        command = f"{command} -V"
+    Raises:
+        `ValueError` if neither `scans` nor `checks` is provided.
+        `RuntimeError` in case any `soda scan` encounters any error
+            during execution, once all the other scans are done, naming
+            the data sources of the failed scans.
 
-    # Build final Soda command
-    command = f"{command} {checks.sodacl_yaml_path}"
+    Returns:
+        The results of the scans, keyed by data source name. Each data source
+            is associated with the list of the results of its scans,
+            in the order they were requested.
 
-    # Log Soda command for debuggin purpose
-    get_run_logger().debug(f"Soda requested command is: {command}")
+    Example:
+        ```python
+        from prefect_soda_core.sodacl_check import SodaCLCheck
+        from prefect_soda_core.soda_configuration import SodaConfiguration
+        from prefect_soda_core.tasks import soda_scan_execute_fan_out
 
-    # Init soda_logs
-    soda_logs = []
+        from prefect import flow
+
+        sodacl_check_block = SodaCLCheck.load("SODACL_CHECK_BLOCK_NAME")
+        soda_configuration_block = SodaConfiguration.load("SODA_CONF_BLOCK_NAME")
+
+        @flow
+        def run_soda_scans():
+            return soda_scan_execute_fan_out(
+                configuration=soda_configuration_block,
+                variables={"key": "value"},
+                checks=sodacl_check_block,
+                max_concurrency=8,
+                max_concurrency_per_data_source=2,
+            )
+        ```
+    """
+    if scans is None:
+        if checks is None:
+            raise ValueError("Either scans or checks must be provided.")
+        scans = [
+            (data_source_name, checks)
+            for data_source_name in configuration.get_data_source_names()
+        ]
+
+    limiter = CapacityLimiter(max_concurrency)
+    data_source_limiters = {
+        data_source_name: CapacityLimiter(max_concurrency_per_data_source)
+        for data_source_name, _ in scans
+    }
+    results = [None] * len(scans)
+    errors = {}
+
+    async def run_scan(index: int, data_source_name: str, scan_checks: SodaCLCheck):
+        """
+        Run a scan once a concurrency slot of its data source is available,
+        keeping its result, or its error, at its index.
+        """
+        scan_results_file = None
+        if return_scan_result_file_content and not isolate_workspace:
+            # Every scan needs its own scan results file, unless
+            #   it already runs in its own workspace
+            scan_results_file = _get_default_scan_results_file(
+                suffix=f"--{data_source_name}--{index}"
+            )
+
+        queued_at = time.monotonic()
+        async with data_source_limiters[data_source_name], limiter:
+            if metrics is not None:
+                metrics.observe_queue_wait(
+                    data_source_name, time.monotonic() - queued_at
+                )
+            try:
+                results[index] = await soda_scan_execute.fn(
+                    data_source_name=data_source_name,
+                    configuration=configuration,
+                    checks=scan_checks,
+                    variables=variables,
+                    scan_results_file=scan_results_file,
+                    verbose=verbose,
+                    return_scan_result_file_content=return_scan_result_file_content,
+                    shell_env=shell_env,
+                    execution_mode=execution_mode,
+                    worker_pool=worker_pool,
+                    isolate_workspace=isolate_workspace,
+                    duration_store=duration_store,
+                    metrics=metrics,
+                )
+            except Exception as exc:
+                # Let the other scans finish, the errors are raised together
+                errors[index] = (f"data source {data_source_name}", exc)
+
+    jobs = [
+        (index, data_source_name, scan_checks)
+        for index, (data_source_name, scan_checks) in enumerate(scans)
+    ]
+    # Scans start in order, and then wait for the limiters in the same order
+    async with create_task_group() as task_group:
+        for index, data_source_name, scan_checks in await _schedule_longest_first(
+            duration_store, jobs
+        ):
+            task_group.start_soon(run_scan, index, data_source_name, scan_checks)
+    _raise_for_scan_errors(errors, len(scans))
+
+    results_by_data_source = {}
+    for (data_source_name, _), result in zip(scans, results):
+        results_by_data_source.setdefault(data_source_name, []).append(result)
+    return results_by_data_source
+
+
+@task
+async def soda_scan_execute_sharded(
+    data_source_name: str,
+    configuration: SodaConfiguration,
+    checks: SodaCLCheck,
+    variables: Optional[Dict[str, str]],
+    max_shards: Optional[int] = None,
+    max_concurrency: int = 4,
+    verbose: bool = False,
+    shell_env: Optional[Dict[str, str]] = None,
+    execution_mode: Optional[ExecutionMode] = None,
+    worker_pool: Optional[SodaWorkerPool] = None,
+    isolate_workspace: bool = False,
+    duration_store: Optional[ScanDurationStore] = None,
+    metrics: Optional[ScanMetrics] = None,
+) -> Dict:
+    """
+    Task that execute the checks of a large SodaCL checks file as several
+    scans running in parallel, one for each shard of tables of the checks
+    file, and merge their results into the results of a single scan.
+
+    Args:
+        data_source_name: The name of the data source against
+            which the checks will be executed. The data source name
+            must match one of the data sources provided in the
+            `configuration` object.
+        configuration: `SodaConfiguration` object that will be used
+            to configure the scans before their execution.
+        checks: `SodaCLCheck` object whose checks will be split into shards.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        max_shards: The maximum number of shards of tables, balanced by number
+            of checks. If not provided, there is one shard for each table.
+            The checks that do not belong to a table, like `for each dataset`
+            checks, are always run in a shard of their own.
+        max_concurrency: Maximum number of scans running at the same time.
+            Default to `4`.
+        verbose: Whether to run the checks with a verbose log or not.
+            Default to `False`.
+        shell_env: A `Dict[str, str]` that contains all environment variables
+            that will be passed to the soda shell task, or to the scan
+            subprocess with the `worker_pool` and `fork_server` execution
+            modes. Ignored, with a warning, with the `in_process` one.
+        execution_mode: How to execute the scans, see `soda_scan_execute`.
+            If not provided, the `execution_mode` of `configuration`
+            will be used.
+        worker_pool: The `SodaWorkerPool` used to run the scans when the
+            execution mode is `worker_pool`. If not provided, a default pool
+            shared by the whole process will be used.
+        isolate_workspace: Whether to run each scan in its own temporary
+            workspace directory, see `soda_scan_execute`. Default to `False`.
+        duration_store: The `ScanDurationStore` where the duration of each
+            scan is recorded, and used to start the scans expected to be the
+            longest first. If not provided, scans are started in order.
+        metrics: The `ScanMetrics` where every scan, and the time it waited
+            for a concurrency slot, are recorded. If not provided,
+            they are not recorded.
+
+    Raises:
+        `RuntimeError` in case any `soda scan` encounters any error
+            during execution, once all the other shards are done, naming
+            the failed shards.
+
+    Returns:
+        The merged content of the scan results of all the shards.
+
+    Example:
+        ```python
+        from prefect_soda_core.sodacl_check import SodaCLCheck
+        from prefect_soda_core.soda_configuration import SodaConfiguration
+        from prefect_soda_core.tasks import soda_scan_execute_sharded
+
+        from prefect import flow
+
+        sodacl_check_block = SodaCLCheck.load("SODACL_CHECK_BLOCK_NAME")
+        soda_configuration_block = SodaConfiguration.load("SODA_CONF_BLOCK_NAME")
+
+        @flow
+        def run_soda_scan():
+            return soda_scan_execute_sharded(
+                data_source_name="datasource",
+                configuration=soda_configuration_block,
+                checks=sodacl_check_block,
+                variables={"key": "value"},
+                max_shards=8,
+                max_concurrency=4,
+            )
+        ```
+    """
+    sodacl_yaml_str = checks.read_checks()
+
+    # Shards, and their scan results, are written to a directory of their
+    #   own, removed once they are merged, so that concurrent runs on
+    #   the same checks file never share files
+    name, extension = os.path.splitext(os.path.basename(checks.sodacl_yaml_path))
+    uses_memory = checks.materialization is Materialization.MEMORY
+    with TemporaryDirectory(
+        prefix="prefect-soda-shards-",
+        dir=get_memory_directory() if uses_memory else None,
+    ) as shards_directory:
+        shards = [
+            SodaCLCheck(
+                sodacl_yaml_path=os.path.join(
+                    shards_directory, f"{name}--shard-{index}{extension}"
+                ),
+                sodacl_yaml_str=shard_yaml_str,
+                materialization=checks.materialization,
+            )
+            for index, shard_yaml_str in enumerate(
+                split_sodacl_by_table(sodacl_yaml_str, max_shards=max_shards)
+            )
+        ]
+        get_run_logger().debug(
+            f"Running {len(shards)} shards of {checks.sodacl_yaml_path} "
+            f"against data source {data_source_name}"
+        )
+
+        limiter = CapacityLimiter(max_concurrency)
+        results = [None] * len(shards)
+        errors = {}
+
+        async def run_shard(index: int, shard: SodaCLCheck):
+            """
+            Run the scan of a shard once a concurrency slot is available,
+            keeping its result, or its error, at its index.
+            """
+            # Every shard needs its own scan results file
+            scan_results_file = _get_default_scan_results_file(
+                suffix=f"--shard-{index}", directory=shards_directory
+            )
+
+            queued_at = time.monotonic()
+            async with limiter:
+                if metrics is not None:
+                    metrics.observe_queue_wait(
+                        data_source_name, time.monotonic() - queued_at
+                    )
+                try:
+                    results[index] = await soda_scan_execute.fn(
+                        data_source_name=data_source_name,
+                        configuration=configuration,
+                        checks=shard,
+                        variables=variables,
+                        scan_results_file=scan_results_file,
+                        verbose=verbose,
+                        return_scan_result_file_content=True,
+                        shell_env=shell_env,
+                        execution_mode=execution_mode,
+                        worker_pool=worker_pool,
+                        isolate_workspace=isolate_workspace,
+                        duration_store=duration_store,
+                        metrics=metrics,
+                    )
+                except Exception as exc:
+                    # Let the other shards finish, the errors are raised together
+                    errors[index] = (f"shard {index}", exc)
+
+        jobs = [(index, data_source_name, shard) for index, shard in enumerate(shards)]
+        # Shards start in order, and then wait for the limiter in the same order
+        async with create_task_group() as task_group:
+            for index, _, shard in await _schedule_longest_first(duration_store, jobs):
+                task_group.start_soon(run_shard, index, shard)
+    _raise_for_scan_errors(errors, len(shards))
+
+    return merge_scan_results(results)
+
+
+async def _execute_dataframe_scan(
+    execute_scan: Callable[..., Tuple[int, List[str]]],
+    data_source_name: str,
+    checks: SodaCLCheck,
+    variables: Optional[Dict[str, str]],
+    scan_results_file: Optional[str],
+    verbose: bool,
+    return_scan_result_file_content: bool,
+    return_scan_result: bool,
+    metrics: Optional[ScanMetrics],
+) -> Union[List, Dict, ScanResult]:
+    """
+    Execute an in-process Soda scan of pandas, Dask or Spark data frames
+    with `execute_scan`, in a worker thread, and return its logs or its results.
+    Failing checks are not considered an error.
+    """
+    if return_scan_result_file_content is True or return_scan_result is True:
+        if scan_results_file is None:
+            scan_results_file = _get_default_scan_results_file()
+    else:
+        # The scan results file is only written when its content is returned
+        scan_results_file = None
+
+    if metrics is not None:
+        metrics.scan_started(data_source_name)
+    start_time = time.monotonic()
     try:
-        # Execute Soda command
-        soda_logs = await shell_run_command.fn(
-            command=command, env=shell_env, return_all=True
+        exit_code, soda_logs = await to_thread.run_sync(
+            partial(
+                execute_scan,
+                data_source_name=data_source_name,
+                sodacl_yaml_strs=[checks.read_checks()],
+                variables=variables,
+                scan_results_file=scan_results_file,
+                verbose=verbose,
+            )
         )
-    except RuntimeError as e:
-        # Ignoring the Runtime Error with code 2 that is raised
-        #   when the soda test runs successfully but the check fails
-        #   causing the flow to break.
-        if not str(e).startswith("Command failed with exit code 2:"):
-            raise e
-
-    if return_scan_result_file_content is True:
-        # Get logs from scan result file
+        if exit_code not in (0, SCAN_CHECKS_FAILED_EXIT_CODE):
+            logs_str = "\n".join(soda_logs)
+            raise RuntimeError(f"Scan failed with exit code {exit_code}: {logs_str}")
+    except Exception:
+        if metrics is not None:
+            metrics.scan_finished(
+                data_source_name=data_source_name,
+                duration=time.monotonic() - start_time,
+                status=SCAN_STATUS_ERROR,
+            )
+        raise
+    duration = time.monotonic() - start_time
+
+    scan_logs = soda_logs
+    if return_scan_result is True:
+        soda_logs = ScanResult.from_file(scan_results_file)
+    elif return_scan_result_file_content is True:
         with open(scan_results_file, "r") as f:
             soda_logs = json.load(f)
 
+    if metrics is not None:
+        _record_scan_metrics(
+            metrics,
+            data_source_name=data_source_name,
+            duration=duration,
+            soda_logs=scan_logs,
+            scan_results=soda_logs if scan_results_file is not None else None,
+            scan_results_file=scan_results_file,
+        )
+
     return soda_logs
+
+
+@task
+async def soda_scan_dataframe(
+    dataframes: Dict[str, Any],
+    checks: SodaCLCheck,
+    data_source_name: str = "dask",
+    variables: Optional[Dict[str, str]] = None,
+    scan_results_file: Optional[str] = None,
+    verbose: bool = False,
+    return_scan_result_file_content: bool = False,
+    return_scan_result: bool = False,
+    metrics: Optional[ScanMetrics] = None,
+) -> Union[List, Dict, ScanResult]:
+    """
+    Task that executes a Soda scan of pandas or Dask DataFrames already
+    in memory, without writing them to a warehouse first.
+    The data frames are registered as the datasets of a Dask data source,
+    and the scan runs inside the current process with the soda-core `Scan`
+    API, so that the data is never serialized. No Soda configuration is
+    needed, but the `soda-core-pandas-dask` package must be installed.
+
+    Args:
+        dataframes: The pandas or Dask DataFrames to scan, keyed by the
+            dataset name the checks refer to them with.
+        checks: `SodaCLCheck` object with the checks of the data frames.
+        data_source_name: The name of the data source the data frames are
+            registered in. Default to `dask`.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scan_results_file: The path to the file where the scan results
+            will be stored, when they are returned. If not provided,
+            a file named after the task run is used.
+        verbose: Whether to run the checks with a verbose log or not.
+            Default to `False`.
+        return_scan_result_file_content: Whether to return the content
+            of the scan results instead of the scan logs.
+            Default to `False`.
+        return_scan_result: Whether to return the scan results as a typed
+            `ScanResult` object. Takes precedence over
+            `return_scan_result_file_content`. Default to `False`.
+        metrics: The `ScanMetrics` where the start and the end of the scan,
+            its duration, the outcomes of its checks and the size of its logs
+            and results are recorded. If not provided, they are not recorded.
+
+    Raises:
+        `RuntimeError` in case the scan encounters any error
+            during execution.
+
+    Returns:
+        Logs produced by the scan. If `return_scan_result_file_content`
+            is `True`, the content of the scan results. If
+            `return_scan_result` is `True`, a `ScanResult` object.
+
+    Example:
+        ```python
+        import pandas as pd
+        from prefect import flow
+        from prefect_soda_core.sodacl_check import SodaCLCheck
+        from prefect_soda_core.tasks import soda_scan_dataframe
+
+        @flow
+        def run_soda_scan():
+            orders = pd.DataFrame({"id": [1, 2, 3], "amount": [10.0, 5.5, 7.25]})
+            return soda_scan_dataframe(
+                dataframes={"orders": orders},
+                checks=SodaCLCheck(
+                    sodacl_yaml_path="checks.yaml",
+                    sodacl_yaml_str="checks for orders:\\n  - row_count > 0\\n",
+                ),
+                return_scan_result=True,
+            )
+        ```
+    """
+    return await _execute_dataframe_scan(
+        partial(execute_dataframe_scan_in_process, dataframes=dataframes),
+        data_source_name=data_source_name,
+        checks=checks,
+        variables=variables,
+        scan_results_file=scan_results_file,
+        verbose=verbose,
+        return_scan_result_file_content=return_scan_result_file_content,
+        return_scan_result=return_scan_result,
+        metrics=metrics,
+    )
+
+
+@task
+async def soda_scan_spark_dataframe(
+    spark_session: Any,
+    checks: SodaCLCheck,
+    dataframes: Optional[Dict[str, Any]] = None,
+    data_source_name: str = "spark_df",
+    variables: Optional[Dict[str, str]] = None,
+    scan_results_file: Optional[str] = None,
+    verbose: bool = False,
+    return_scan_result_file_content: bool = False,
+    return_scan_result: bool = False,
+    metrics: Optional[ScanMetrics] = None,
+) -> Union[List, Dict, ScanResult]:
+    """
+    Task that executes a Soda scan of Spark DataFrames with an existing
+    Spark session, without exporting them to a warehouse first.
+    The data frames are registered as temporary views of the Spark session,
+    and the scan runs inside the current process with the soda-core `Scan`
+    API, its queries running on the Spark session, so that the data never
+    leaves the cluster. No Soda configuration is needed, but the
+    `soda-core-spark-df` package must be installed.
+
+    Args:
+        spark_session: The `SparkSession` running the queries of the checks.
+        checks: `SodaCLCheck` object with the checks of the data frames.
+        dataframes: The Spark DataFrames to scan, keyed by the name of the
+            temporary view they are registered as, that the checks refer
+            to them with. If not provided, the checks run against the
+            tables and views already in the Spark session.
+        data_source_name: The name of the data source of the Spark session.
+            Default to `spark_df`.
+        variables: A `Dict[str, str]` that contains all variables
+            references within checks.
+        scan_results_file: The path to the file where the scan results
+            will be stored, when they are returned. If not provided,
+            a file named after the task run is used.
+        verbose: Whether to run the checks with a verbose log or not.
+            Default to `False`.
+        return_scan_result_file_content: Whether to return the content
+            of the scan results instead of the scan logs.
+            Default to `False`.
+        return_scan_result: Whether to return the scan results as a typed
+            `ScanResult` object. Takes precedence over
+            `return_scan_result_file_content`. Default to `False`.
+        metrics: The `ScanMetrics` where the start and the end of the scan,
+            its duration, the outcomes of its checks and the size of its logs
+            and results are recorded. If not provided, they are not recorded.
+
+    Raises:
+        `RuntimeError` in case the scan encounters any error
+            during execution.
+
+    Returns:
+        Logs produced by the scan. If `return_scan_result_file_content`
+            is `True`, the content of the scan results. If
+            `return_scan_result` is `True`, a `ScanResult` object.
+
+    Example:
+        ```python
+        from prefect import flow
+        from pyspark.sql import SparkSession
+        from prefect_soda_core.sodacl_check import SodaCLCheck
+        from prefect_soda_core.tasks import soda_scan_spark_dataframe
+
+        @flow
+        def run_soda_scan():
+            spark = SparkSession.builder.getOrCreate()
+            orders = spark.read.parquet("s3://bucket/orders/")
+            return soda_scan_spark_dataframe(
+                spark_session=spark,
+                dataframes={"orders": orders},
+                checks=SodaCLCheck.load("SODACL_CHECK_BLOCK_NAME"),
+                return_scan_result=True,
+            )
+        ```
+    """
+    return await _execute_dataframe_scan(
+        partial(
+            execute_spark_scan_in_process,
+            spark_session=spark_session,
+            dataframes=dataframes,
+        ),
+        data_source_name=data_source_name,
+        checks=checks,
+        variables=variables,
+        scan_results_file=scan_results_file,
+        verbose=verbose,
+        return_scan_result_file_content=return_scan_result_file_content,
+        return_scan_result=return_scan_result,
+        metrics=metrics,
+    )
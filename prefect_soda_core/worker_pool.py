@@ -0,0 +1,359 @@
+"""
+Pool of long-lived worker processes that can be used to run Soda scans
+out of process without paying for a new interpreter and soda-core import
+on every scan.
+"""
+import atexit
+import multiprocessing
+import queue
+import sys
+import threading
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+from prefect_soda_core.scan_engines import (
+    execute_scan_in_process,
+    patched_environment,
+    preload_soda_modules,
+)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+def _get_peak_memory_mb() -> Optional[float]:
+    """
+    Get the peak resident memory of the current process, in MB.
+    """
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is expressed in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return max_rss / (1024 * 1024)
+    return max_rss / 1024
+
+
+def _worker_main(connection, preload_modules: Optional[List[str]]):
+    """
+    Entrypoint of a worker process: import soda-core once, then run
+    the scan jobs received through `connection` until asked to stop.
+    """
+    preload_soda_modules(preload_modules)
+
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+
+        # A `None` job is the signal to stop the worker
+        if job is None:
+            break
+
+        try:
+            # The environment of a job does not leak into the next ones
+            with patched_environment(job.pop("env", None)):
+                exit_code, soda_logs = execute_scan_in_process(**job)
+            error = None
+        except Exception:
+            exit_code, soda_logs = None, None
+            error = traceback.format_exc()
+
+        connection.send((exit_code, soda_logs, error, _get_peak_memory_mb()))
+
+    connection.close()
+
+
+class _Worker:
+    """
+    A worker process of a `SodaWorkerPool`, together with the pipe used
+    to talk to it and the number of jobs it has run.
+    """
+
+    def __init__(self, context, preload_modules: Optional[List[str]]):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, preload_modules),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.jobs_count = 0
+
+    def stop(self):
+        """
+        Ask the worker process to stop, killing it if it does not comply.
+        """
+        try:
+            self.connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+    def kill(self):
+        """
+        Kill the worker process immediately.
+        """
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class SodaWorkerPool:
+    """
+    Pool of long-lived worker processes that keep soda-core and the
+    data source packages imported between scans.
+    Scan jobs are sent to an idle worker over a pipe, and the worker
+    sends back the scan exit code and logs. Workers are started on the
+    first scan, so that the pool can be created at the module level of
+    a flow script, that every worker imports again.
+
+    Args:
+        size: Number of worker processes in the pool. Default to `2`.
+        max_jobs_per_worker: Number of scans after which a worker
+            is replaced by a fresh one. Default to `100`.
+        max_memory_mb: Peak resident memory, in MB, above which a worker is
+            replaced by a fresh one after its current scan. If not provided,
+            workers are not recycled based on their memory.
+        preload_modules: The modules imported by every worker before
+            running its first scan, on top of soda-core. If not provided,
+            all the installed soda-core data source modules are imported.
+
+    Example:
+        Run scans in a pool of four workers.
+        ```python
+        from prefect_soda_core.tasks import soda_scan_execute
+        from prefect_soda_core.worker_pool import SodaWorkerPool
+
+        soda_worker_pool = SodaWorkerPool(size=4, max_memory_mb=1024)
+
+        @flow
+        def run_soda_scan():
+            return soda_scan_execute(
+                data_source_name="datasource",
+                configuration=soda_configuration_block,
+                checks=sodacl_check_block,
+                variables={"key": "value"},
+                execution_mode="worker_pool",
+                worker_pool=soda_worker_pool,
+            )
+        ```
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_jobs_per_worker: int = 100,
+        max_memory_mb: Optional[float] = None,
+        preload_modules: Optional[List[str]] = None,
+    ):
+        if size < 1:
+            raise ValueError("The size of the worker pool must be at least 1.")
+
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_memory_mb = max_memory_mb
+        self.preload_modules = preload_modules
+
+        # Workers are spawned, not forked, so that they do not inherit
+        #   the state of the (possibly multi-threaded) parent process
+        self._context = multiprocessing.get_context("spawn")
+        self._idle_workers: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._closed = False
+
+    def _ensure_started(self):
+        """
+        Start the workers of the pool, if they are not started yet.
+        """
+        with self._start_lock:
+            if self._started:
+                return
+            for _ in range(self.size):
+                self._add_worker()
+            self._started = True
+
+    def _add_worker(self):
+        """
+        Start a new worker process, keep track of it and make it available
+        for scans, unless the pool has been shut down.
+        """
+        if self._closed:
+            return
+        worker = _Worker(self._context, self.preload_modules)
+        with self._lock:
+            if not self._closed:
+                self._workers.append(worker)
+                self._idle_workers.put(worker)
+                return
+        # The pool has been shut down while the worker was starting
+        worker.stop()
+
+    def _retire_worker(self, worker: _Worker, kill: bool = False):
+        """
+        Stop a worker process and forget about it.
+        """
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+
+    def _should_recycle(self, worker: _Worker, peak_memory_mb: Optional[float]):
+        """
+        Whether a worker has run enough jobs or used enough memory to be recycled.
+        """
+        if worker.jobs_count >= self.max_jobs_per_worker:
+            return True
+        if self.max_memory_mb is not None and peak_memory_mb is not None:
+            return peak_memory_mb > self.max_memory_mb
+        return False
+
+    @property
+    def worker_pids(self) -> List[int]:
+        """
+        The process IDs of the current workers of the pool.
+        """
+        with self._lock:
+            return [worker.process.pid for worker in self._workers]
+
+    def execute_scan(
+        self,
+        data_source_name: str,
+        configuration_yaml_path: str,
+        sodacl_yaml_paths: List[str],
+        variables: Optional[Dict[str, str]] = None,
+        scan_results_file: Optional[str] = None,
+        verbose: bool = False,
+        reuse_connections: bool = False,
+        env: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, List[str]]:
+        """
+        Execute a Soda scan in one of the workers of the pool, blocking
+        until a worker is available and the scan is complete.
+
+        Args:
+            data_source_name: The name of the data source against
+                which the checks will be executed.
+            configuration_yaml_path: Path of the Soda configuration file.
+            sodacl_yaml_paths: Paths of the SodaCL checks files.
+            variables: A `Dict[str, str]` that contains all variables
+                references within checks.
+            scan_results_file: The path to the file where the scan results
+                will be stored, if any.
+            verbose: Whether to run the checks with a verbose log or not.
+            reuse_connections: Whether the worker reuses a connection to the
+                data source from its own connection pool, and puts the
+                connection back into the pool after the scan.
+            env: A `Dict[str, str]` that contains environment variables
+                to set in the worker while it runs the scan.
+
+        Raises:
+            `RuntimeError` if the pool is shut down, or if the worker
+                fails or dies while running the scan.
+
+        Returns:
+            A tuple made of the scan exit code and the scan log lines.
+        """
+        if self._closed:
+            raise RuntimeError("The Soda worker pool has been shut down.")
+        self._ensure_started()
+
+        job = dict(
+            data_source_name=data_source_name,
+            configuration_yaml_path=configuration_yaml_path,
+            sodacl_yaml_paths=sodacl_yaml_paths,
+            variables=variables,
+            scan_results_file=scan_results_file,
+            verbose=verbose,
+            reuse_connections=reuse_connections,
+            env=env,
+        )
+
+        worker = self._idle_workers.get()
+        if worker is None or self._closed:
+            # Wake the next caller waiting for a worker up, in turn
+            self._idle_workers.put(None)
+            raise RuntimeError("The Soda worker pool has been shut down.")
+        try:
+            worker.connection.send(job)
+            exit_code, soda_logs, error, peak_memory_mb = worker.connection.recv()
+        except (EOFError, OSError) as exc:
+            # The worker died while running the scan, replace it
+            self._retire_worker(worker, kill=True)
+            self._add_worker()
+            raise RuntimeError(
+                "The Soda worker process died while running the scan."
+            ) from exc
+
+        worker.jobs_count += 1
+        if self._should_recycle(worker, peak_memory_mb):
+            self._retire_worker(worker)
+            self._add_worker()
+        else:
+            self._idle_workers.put(worker)
+
+        if error is not None:
+            raise RuntimeError(f"The Soda worker failed to run the scan: {error}")
+
+        return exit_code, soda_logs
+
+    def shutdown(self):
+        """
+        Stop all the workers of the pool. The scans waiting for a worker
+        are woken up and raise an error.
+        """
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+        # Sentinel waking the callers waiting for an idle worker up
+        self._idle_workers.put(None)
+        for worker in workers:
+            self._retire_worker(worker)
+
+    def __enter__(self):
+        """
+        Use the pool as a context manager, shut down on exit.
+        """
+        return self
+
+    def __exit__(self, *exc):
+        """
+        Shut the pool down.
+        """
+        self.shutdown()
+
+
+_default_worker_pool: Optional[SodaWorkerPool] = None
+_default_worker_pool_lock = threading.Lock()
+
+
+def get_default_worker_pool() -> SodaWorkerPool:
+    """
+    Get the worker pool shared by all the scans of the current process
+    that do not provide their own pool, creating it on first use.
+
+    Returns:
+        The default `SodaWorkerPool`.
+    """
+    global _default_worker_pool
+
+    with _default_worker_pool_lock:
+        if _default_worker_pool is None:
+            _default_worker_pool = SodaWorkerPool()
+            atexit.register(_default_worker_pool.shutdown)
+        return _default_worker_pool
@@ -0,0 +1,63 @@
+"""
+Utilities to parse the YAML strings of the Soda blocks, once per content.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Tuple
+
+from yaml import load
+from yaml.error import YAMLError
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader
+
+# Number of parsed YAML strings kept in memory
+YAML_PARSE_CACHE_SIZE = 128
+
+# Outcomes of the parse of a YAML string, keyed by SHA-256 digest of the
+#   string and ordered from the least to the most recently used
+_parsed_yaml: "OrderedDict[str, Tuple[bool, Any]]" = OrderedDict()
+_parsed_yaml_lock = threading.Lock()
+
+
+def load_yaml_str(yaml_str: str) -> Any:
+    """
+    Parse a YAML string with the safe loader, using libyaml when available.
+    The outcome of the parse is memoized by content, so that the same YAML
+    string is only parsed once per process.
+
+    Args:
+        yaml_str: The YAML string to parse.
+
+    Raises:
+        `YAMLError` if the YAML string is not valid.
+
+    Returns:
+        The parsed YAML string. It is shared by all the callers parsing
+            the same YAML string, and must not be modified.
+    """
+    digest = hashlib.sha256(yaml_str.encode()).hexdigest()
+    with _parsed_yaml_lock:
+        outcome = _parsed_yaml.get(digest)
+        if outcome is not None:
+            _parsed_yaml.move_to_end(digest)
+
+    if outcome is None:
+        try:
+            outcome = (True, load(yaml_str, Loader=SafeLoader))
+        except YAMLError as exc:
+            outcome = (False, exc)
+
+        with _parsed_yaml_lock:
+            _parsed_yaml[digest] = outcome
+            while len(_parsed_yaml) > YAML_PARSE_CACHE_SIZE:
+                _parsed_yaml.popitem(last=False)
+
+    is_valid, value = outcome
+    if not is_valid:
+        # Clear the traceback of the previous raise of the memoized error
+        raise value.with_traceback(None)
+    return value
@@ -15,6 +15,7 @@ with open("README.md") as readme_file:
 def get_extra_requires():
     # DB engines currently supported by Soda Core
     # https://docs.soda.io/soda-core/installation.html#install
+    # Keep in sync with SODA_CORE_DATA_SOURCES in prefect_soda_core/scan_engines.py
     db_engines = {
         "athena",
         "redshift",
@@ -26,11 +27,15 @@ def get_extra_requires():
         "postgres",
         "snowflake",
         "trino",
+        "duckdb",
     }
 
     # Generate extra requires for each db engine
     extra_requires = {db_engine: f"soda-core-{db_engine}" for db_engine in db_engines}
 
+    # Data frames scanned in process with `soda_scan_dataframe`
+    extra_requires["pandas-dask"] = "soda-core-pandas-dask"
+
     # Does not work with the current cli-based integration
     # extra_requires["spark-hive"] = "soda-core-spark[hive]"
     # extra_requires["spark-odbc"] = "soda-core-spark[odbc]"
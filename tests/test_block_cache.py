@@ -0,0 +1,69 @@
+from unittest import mock
+
+import pytest
+
+from prefect_soda_core.block_cache import BlockCache
+from prefect_soda_core.soda_configuration import SodaConfiguration
+
+
+@pytest.fixture
+def block_name():
+    SodaConfiguration(
+        configuration_yaml_path="/path/to/configuration.yaml",
+        configuration_yaml_str="data_source test:\n  type: postgres\n",
+    ).save("block-cache-test", overwrite=True)
+    return "block-cache-test"
+
+
+@pytest.fixture
+def mock_get_block_document():
+    with mock.patch.object(
+        SodaConfiguration,
+        "_get_block_document",
+        wraps=SodaConfiguration._get_block_document,
+    ) as mock_get_block_document:
+        yield mock_get_block_document
+
+
+def test_load_serves_blocks_from_memory(block_name, mock_get_block_document):
+    block_cache = BlockCache(ttl_seconds=60)
+
+    first = block_cache.load(SodaConfiguration, block_name)
+    second = block_cache.load(SodaConfiguration, block_name)
+
+    assert first == second == SodaConfiguration.load(block_name)
+    assert first is not second
+    assert mock_get_block_document.call_count == 2
+
+
+def test_load_validates_again_only_changed_blocks(block_name, mock_get_block_document):
+    block_cache = BlockCache(ttl_seconds=0)
+
+    with mock.patch.object(
+        SodaConfiguration,
+        "_from_block_document",
+        wraps=SodaConfiguration._from_block_document,
+    ) as mock_from_block_document:
+        block_cache.load(SodaConfiguration, block_name)
+        block_cache.load(SodaConfiguration, block_name)
+        assert mock_from_block_document.call_count == 1
+
+        SodaConfiguration(
+            configuration_yaml_path="/path/to/other.yaml",
+        ).save(block_name, overwrite=True)
+        block = block_cache.load(SodaConfiguration, block_name)
+        assert mock_from_block_document.call_count == 2
+
+    assert block.configuration_yaml_path == "/path/to/other.yaml"
+
+
+def test_invalidate_and_eviction(block_name, mock_get_block_document):
+    block_cache = BlockCache(ttl_seconds=60, max_entries=1)
+
+    block_cache.load(SodaConfiguration, block_name)
+    block_cache.invalidate(SodaConfiguration, block_name)
+    assert len(block_cache) == 0
+
+    block_cache.load(SodaConfiguration, block_name)
+    assert len(block_cache) == 1
+    assert mock_get_block_document.call_count == 2
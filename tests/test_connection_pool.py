@@ -0,0 +1,161 @@
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from soda.scan import Scan
+
+from prefect_soda_core.connection_pool import (
+    DataSourceConnectionPool,
+    get_default_connection_pool,
+    pooled_data_source,
+)
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, query):
+        if not self.connection.healthy:
+            raise RuntimeError("Connection lost")
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, healthy=True):
+        self.healthy = healthy
+        self.closed = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+KEY = DataSourceConnectionPool.make_key("test", {"type": "postgres"})
+
+
+def test_make_key_depends_on_configuration():
+    assert KEY == DataSourceConnectionPool.make_key("test", {"type": "postgres"})
+    assert KEY != DataSourceConnectionPool.make_key("test", {"type": "snowflake"})
+    assert KEY != DataSourceConnectionPool.make_key("other", {"type": "postgres"})
+
+
+def test_acquire_reuses_released_connection():
+    pool = DataSourceConnectionPool()
+    connection = FakeConnection()
+
+    assert pool.acquire(KEY) is None
+
+    pool.release(KEY, connection)
+
+    assert len(pool) == 1
+    assert connection.rollbacks == 1
+    assert pool.acquire(("other", KEY[1])) is None
+    assert pool.acquire(KEY) is connection
+    # A connection is handed out to a single scan at a time
+    assert pool.acquire(KEY) is None
+
+
+def test_acquire_discards_unhealthy_connection():
+    pool = DataSourceConnectionPool()
+    healthy_connection = FakeConnection()
+    unhealthy_connection = FakeConnection(healthy=False)
+    pool.release(KEY, healthy_connection)
+    pool.release(KEY, unhealthy_connection)
+
+    assert pool.acquire(KEY) is healthy_connection
+    assert unhealthy_connection.closed
+    assert len(pool) == 0
+
+
+def test_acquire_closes_idle_connections():
+    pool = DataSourceConnectionPool(idle_timeout_seconds=0.01)
+    connection = FakeConnection()
+    pool.release(KEY, connection)
+    time.sleep(0.02)
+
+    assert pool.acquire(KEY) is None
+    assert connection.closed
+
+
+def test_release_closes_least_recently_released_connections():
+    pool = DataSourceConnectionPool(max_size=2)
+    connections = [FakeConnection() for _ in range(3)]
+    for connection in connections:
+        pool.release(KEY, connection)
+
+    assert len(pool) == 2
+    assert [connection.closed for connection in connections] == [True, False, False]
+
+    pool.clear()
+
+    assert len(pool) == 0
+    assert all(connection.closed for connection in connections)
+
+
+def test_pool_requires_positive_max_size():
+    with pytest.raises(ValueError, match="at least 1 connection"):
+        DataSourceConnectionPool(max_size=0)
+
+
+def _make_scan():
+    scan = Scan()
+    scan.add_configuration_yaml_str("data_source test:\n  type: postgres\n")
+    return scan
+
+
+@mock.patch("soda.execution.data_source.DataSource.create")
+def test_pooled_data_source_injects_pooled_connection(mock_create):
+    mock_create.return_value = SimpleNamespace(connection=None)
+    pool = DataSourceConnectionPool()
+    connection = FakeConnection()
+    pool.release(KEY, connection)
+    scan = _make_scan()
+
+    with pooled_data_source(scan, "test", pool):
+        data_source = scan._data_source_manager.data_sources["test"]
+        assert data_source.connection is connection
+        assert len(pool) == 0
+
+    assert pool.acquire(KEY) is connection
+
+
+def test_pooled_data_source_keeps_new_connection():
+    pool = DataSourceConnectionPool()
+    connection = FakeConnection()
+    scan = _make_scan()
+
+    with pooled_data_source(scan, "test", pool):
+        # Connection opened by soda-core during the scan
+        scan._data_source_manager.data_sources["test"] = SimpleNamespace(
+            connection=connection
+        )
+
+    assert not connection.closed
+    assert pool.acquire(KEY) is connection
+
+
+def test_pooled_data_source_ignores_unknown_data_source():
+    pool = DataSourceConnectionPool()
+    scan = _make_scan()
+
+    with pooled_data_source(scan, "unknown", pool):
+        pass
+
+    assert len(pool) == 0
+
+
+def test_get_default_connection_pool():
+    assert get_default_connection_pool() is get_default_connection_pool()
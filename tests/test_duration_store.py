@@ -0,0 +1,34 @@
+from prefect_soda_core.duration_store import ScanDurationStore, hash_sodacl_content
+
+
+def test_record_and_get_expected_duration(tmp_path):
+    duration_store = ScanDurationStore(path=str(tmp_path / "durations.db"))
+    checks_hash = hash_sodacl_content("checks for orders:\n  - row_count > 0\n")
+
+    assert duration_store.get_expected_duration("test", checks_hash) is None
+
+    duration_store.record("test", checks_hash, 1.0)
+    duration_store.record("test", checks_hash, 3.0)
+    duration_store.record("other", checks_hash, 10.0)
+
+    assert duration_store.get_expected_duration("test", checks_hash) == 2.0
+    # The store is persisted and shared by all its instances
+    assert (
+        ScanDurationStore(path=str(tmp_path / "durations.db")).get_expected_duration(
+            "other", checks_hash
+        )
+        == 10.0
+    )
+
+
+def test_sort_longest_first(tmp_path):
+    duration_store = ScanDurationStore(path=str(tmp_path / "durations.db"))
+    duration_store.record("short", "hash", 1.0)
+    duration_store.record("long", "hash", 5.0)
+
+    jobs = ["short", "long", "unknown", "short"]
+    sorted_jobs = duration_store.sort_longest_first(
+        jobs, get_key=lambda job: (job, "hash")
+    )
+
+    assert sorted_jobs == ["unknown", "long", "short", "short"]
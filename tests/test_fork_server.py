@@ -0,0 +1,49 @@
+from unittest import mock
+
+import pytest
+
+from prefect_soda_core.fork_server import execute_scan_in_fork_server
+
+
+def test_execute_scan_in_fork_server_returns_exit_code_and_logs(tmp_path):
+    exit_code, soda_logs = execute_scan_in_fork_server(
+        data_source_name="test",
+        configuration_yaml_path=str(tmp_path / "missing_config.yaml"),
+        sodacl_yaml_paths=[str(tmp_path / "missing_checks.yaml")],
+        variables={"foo": "bar"},
+    )
+
+    assert exit_code == 3
+    assert any("missing_config.yaml does not exist" in log for log in soda_logs)
+
+
+def test_execute_scan_in_fork_server_sets_env(tmp_path):
+    configuration_yaml_path = tmp_path / "config.yaml"
+    configuration_yaml_path.write_text("data_source test:\n  type: ${SODA_TYPE}\n")
+    sodacl_yaml_path = tmp_path / "checks.yaml"
+    sodacl_yaml_path.write_text("checks for table:\n  - row_count > 0\n")
+
+    _, soda_logs = execute_scan_in_fork_server(
+        data_source_name="test",
+        configuration_yaml_path=str(configuration_yaml_path),
+        sodacl_yaml_paths=[str(sodacl_yaml_path)],
+        env={"SODA_TYPE": "from_env"},
+    )
+
+    assert any('Data source type "from_env" not found' in log for log in soda_logs)
+
+
+@mock.patch("prefect_soda_core.fork_server._get_fork_server_context")
+def test_execute_scan_in_fork_server_dead_subprocess_raises(mock_get_context):
+    mock_connection = mock.MagicMock()
+    mock_connection.recv.side_effect = EOFError()
+    mock_context = mock_get_context.return_value
+    mock_context.Pipe.return_value = (mock_connection, mock.MagicMock())
+    mock_context.Process.return_value.exitcode = -9
+
+    with pytest.raises(RuntimeError, match="died while running the scan"):
+        execute_scan_in_fork_server(
+            data_source_name="test",
+            configuration_yaml_path="/path/to/config.yaml",
+            sodacl_yaml_paths=["/path/to/checks.yaml"],
+        )
@@ -0,0 +1,95 @@
+import pytest
+
+from prefect_soda_core.log_streaming import ScanLogSummary, stream_soda_scan_logs
+from prefect_soda_core.scan_timing import ScanTimer
+
+
+def test_scan_log_summary_keeps_bounded_tail_and_counters():
+    summary = ScanLogSummary(tail_size=2)
+    for line in [
+        "[08:00:00] Soda Core 3.0.0",
+        "[08:00:01] Scan summary:",
+        "[08:00:01] Oops! 1 error. 2 failures. 3 warnings. 4 pass.",
+    ]:
+        summary.add_line(line)
+
+    assert summary.to_dict() == {
+        "tail": [
+            "[08:00:01] Scan summary:",
+            "[08:00:01] Oops! 1 error. 2 failures. 3 warnings. 4 pass.",
+        ],
+        "lines": 3,
+        "bytes": 110,
+        "errors": 1,
+        "failures": 2,
+        "warnings": 3,
+        "passes": 4,
+    }
+
+
+def test_scan_log_summary_counts_checks_of_passing_scan():
+    summary = ScanLogSummary()
+    # Output of soda-core 3.1.3 for a scan where all checks pass
+    for line in [
+        "[08:00:00] Soda Core 3.1.3",
+        "[08:00:01] Scan summary:",
+        "[08:00:01] 2/2 checks PASSED: ",
+        "[08:00:01]     orders in postgres",
+        "[08:00:01]       row_count > 0 [PASSED]",
+        "[08:00:01]       missing_count(id) = 0 [PASSED]",
+        "[08:00:01] All is good. No failures. No warnings. No errors.",
+    ]:
+        summary.add_line(line)
+
+    assert summary.errors_count == 0
+    assert summary.failures_count == 0
+    assert summary.warnings_count == 0
+    assert summary.passes_count == 2
+
+
+async def test_stream_soda_scan_logs_yields_lines():
+    lines = [line async for line in stream_soda_scan_logs("printf 'a\\nb\\nc'")]
+
+    assert lines == ["a", "b", "c"]
+
+
+async def test_stream_soda_scan_logs_times_process_start_and_first_output():
+    timer = ScanTimer()
+    lines = [
+        line async for line in stream_soda_scan_logs("sleep 0.2; echo a", timer=timer)
+    ]
+
+    assert lines == ["a"]
+    assert list(timer.durations) == ["process_start", "first_output"]
+    assert timer.durations["first_output"] >= 0.2
+
+
+async def test_stream_soda_scan_logs_passes_env():
+    lines = [
+        line
+        async for line in stream_soda_scan_logs(
+            "echo $SODA_TEST_VAR", env={"SODA_TEST_VAR": "value"}
+        )
+    ]
+
+    assert lines == ["value"]
+
+
+async def test_stream_soda_scan_logs_tolerates_failed_checks():
+    lines = [line async for line in stream_soda_scan_logs("echo failed; exit 2")]
+
+    assert lines == ["failed"]
+
+
+async def test_stream_soda_scan_logs_raises_on_error():
+    with pytest.raises(RuntimeError, match="Command failed with exit code 3"):
+        async for _ in stream_soda_scan_logs("echo error; exit 3"):
+            pass
+
+
+async def test_stream_soda_scan_logs_stops_scan_when_consumer_stops():
+    logs = stream_soda_scan_logs("yes")
+    async for line in logs:
+        assert line == "y"
+        break
+    await logs.aclose()
@@ -0,0 +1,106 @@
+import os
+import stat
+from urllib.request import urlopen
+
+import pytest
+
+from prefect_soda_core.metrics import ScanMetrics
+
+
+def test_render_counters_and_histograms():
+    metrics = ScanMetrics(duration_buckets=(1, 10))
+    metrics.scan_started("orders_db")
+    metrics.scan_finished(
+        "orders_db",
+        duration=2.5,
+        outcome_counts={"pass": 3, "fail": 1},
+        log_bytes=100,
+        results_bytes=2048,
+    )
+    metrics.scan_started("orders_db")
+    metrics.scan_finished("orders_db", duration=0.5, status="error")
+    metrics.observe_queue_wait("orders_db", 20)
+
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE soda_scans_started_total counter" in lines
+    assert 'soda_scans_started_total{data_source="orders_db"} 2' in lines
+    assert (
+        'soda_scans_finished_total{data_source="orders_db",status="success"} 1' in lines
+    )
+    assert (
+        'soda_scans_finished_total{data_source="orders_db",status="error"} 1' in lines
+    )
+    assert 'soda_scan_checks_total{data_source="orders_db",outcome="pass"} 3' in lines
+    assert 'soda_scan_log_bytes_total{data_source="orders_db"} 100' in lines
+    assert 'soda_scan_results_bytes_total{data_source="orders_db"} 2048' in lines
+    assert "# TYPE soda_scan_duration_seconds histogram" in lines
+    assert (
+        'soda_scan_duration_seconds_bucket{data_source="orders_db",le="1"} 1' in lines
+    )
+    assert (
+        'soda_scan_duration_seconds_bucket{data_source="orders_db",le="10"} 2' in lines
+    )
+    assert (
+        'soda_scan_duration_seconds_bucket{data_source="orders_db",le="+Inf"} 2'
+        in lines
+    )
+    assert 'soda_scan_duration_seconds_sum{data_source="orders_db"} 3' in lines
+    assert 'soda_scan_duration_seconds_count{data_source="orders_db"} 2' in lines
+    assert (
+        'soda_scan_queue_wait_seconds_bucket{data_source="orders_db",le="10"} 0'
+        in lines
+    )
+    assert 'soda_scan_queue_wait_seconds_count{data_source="orders_db"} 1' in lines
+
+
+def test_render_escapes_label_values():
+    metrics = ScanMetrics()
+    metrics.scan_started('weird "db"\n')
+
+    assert 'soda_scans_started_total{data_source="weird \\"db\\"\\n"} 1' in (
+        metrics.render()
+    )
+
+
+def test_scan_finished_writes_textfile(tmp_path):
+    textfile_path = tmp_path / "soda.prom"
+    metrics = ScanMetrics(textfile_path=str(textfile_path))
+    metrics.scan_started("orders_db")
+
+    assert not textfile_path.exists()
+
+    previous_umask = os.umask(0o022)
+    try:
+        metrics.scan_finished("orders_db", duration=1)
+    finally:
+        os.umask(previous_umask)
+
+    # The textfile collector may run as another user
+    assert stat.S_IMODE(os.stat(textfile_path).st_mode) == 0o644
+
+    assert textfile_path.read_text() == metrics.render()
+    # Only the textfile is left in the directory
+    assert [path.name for path in tmp_path.iterdir()] == ["soda.prom"]
+
+
+def test_write_textfile_raises_without_path():
+    with pytest.raises(ValueError, match="A path is needed"):
+        ScanMetrics().write_textfile()
+
+
+def test_serve():
+    metrics = ScanMetrics()
+    metrics.scan_started("orders_db")
+    server = metrics.serve(port=0)
+    try:
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as r:
+            body = r.read().decode()
+            content_type = r.headers["Content-Type"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert server.server_address[0] == "127.0.0.1"
+    assert body == metrics.render()
+    assert content_type.startswith("text/plain; version=0.0.4")
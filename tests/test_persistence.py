@@ -0,0 +1,104 @@
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from prefect_soda_core.persistence import persist_yaml_str
+from prefect_soda_core.scan_engines import execute_scan_in_process
+
+
+def test_persist_yaml_str_skips_unchanged_content(tmp_path):
+    path = str(tmp_path / "checks.yaml")
+
+    assert persist_yaml_str("checks for a:\n  - row_count > 0\n", path) is True
+    mtime_ns = os.stat(path).st_mtime_ns
+    assert persist_yaml_str("checks for a:\n  - row_count > 0\n", path) is False
+    assert os.stat(path).st_mtime_ns == mtime_ns
+
+    assert persist_yaml_str("checks for b:\n  - row_count > 0\n", path) is True
+    with open(path, "r") as f:
+        assert f.read() == "checks for b:\n  - row_count > 0\n"
+
+
+def test_persist_yaml_str_detects_external_changes(tmp_path):
+    path = str(tmp_path / "checks.yaml")
+    persist_yaml_str("checks for a:\n  - row_count > 0\n", path)
+
+    with open(path, "w") as f:
+        f.write("tampered")
+
+    assert persist_yaml_str("checks for a:\n  - row_count > 0\n", path) is True
+
+
+def test_persist_yaml_str_concurrent_writers(tmp_path):
+    path = str(tmp_path / "checks.yaml")
+    yaml_strs = [f"checks for table_{i}:\n  - row_count > 0\n" for i in range(4)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(lambda i: persist_yaml_str(yaml_strs[i % 4], path), range(64))
+        )
+
+    # The file always holds one complete content, and no temporary file is left
+    with open(path, "r") as f:
+        assert f.read() in yaml_strs
+    assert os.listdir(tmp_path) == ["checks.yaml"]
+
+
+def test_persist_yaml_str_file_permissions(tmp_path):
+    path = tmp_path / "checks.yaml"
+    previous_umask = os.umask(0o027)
+    try:
+        persist_yaml_str("checks for t:\n  - row_count > 0\n", str(path))
+    finally:
+        os.umask(previous_umask)
+
+    # New files are created as `open` would create them
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+    path.chmod(0o600)
+    persist_yaml_str("checks for t:\n  - row_count > 1\n", str(path))
+
+    # Replaced files keep their permissions
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert [file.name for file in tmp_path.iterdir()] == ["checks.yaml"]
+
+
+def test_persist_yaml_str_writes_yaml_str_as_is(tmp_path):
+    path = str(tmp_path / "checks.yaml")
+    yaml_str = (
+        "# Checks of the orders\n"
+        "checks for orders:\n"
+        "  - invalid_count(status) = 0:\n"
+        "      valid values: [yes, no, on, off]\n"
+    )
+
+    persist_yaml_str(yaml_str, path)
+
+    with open(path, "r") as f:
+        assert f.read() == yaml_str
+
+
+def test_persist_yaml_str_runs_in_process_scan(tmp_path):
+    duckdb = pytest.importorskip("duckdb")
+    pytest.importorskip("soda.data_sources.duckdb_data_source")
+    database_path = str(tmp_path / "test.duckdb")
+    with duckdb.connect(database_path) as connection:
+        connection.execute("CREATE TABLE orders AS SELECT * FROM range(3) t(id)")
+    configuration_path = str(tmp_path / "configuration.yaml")
+    checks_path = str(tmp_path / "checks.yaml")
+    persist_yaml_str(
+        f"data_source test:\n  type: duckdb\n  path: {database_path}\n",
+        configuration_path,
+    )
+    persist_yaml_str("checks for orders:\n  - row_count = 3\n", checks_path)
+
+    exit_code, soda_logs = execute_scan_in_process(
+        data_source_name="test",
+        configuration_yaml_path=configuration_path,
+        sodacl_yaml_paths=[checks_path],
+    )
+
+    assert exit_code == 0, "\n".join(soda_logs)
+    assert any("1/1 check PASSED" in line for line in soda_logs)
@@ -0,0 +1,65 @@
+import pytest
+from prefect import flow
+
+from prefect_soda_core.profiling import (
+    build_profiled_soda_command,
+    create_profile_artifacts,
+    get_hot_functions,
+    run_profiled,
+)
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_run_profiled_writes_profile(tmp_path):
+    profile_file = str(tmp_path / "scan.prof")
+
+    assert run_profiled(_busy, profile_file, n=1000) == _busy(1000)
+
+    hot_functions = get_hot_functions(profile_file, top_n=2)
+    assert len(hot_functions) == 2
+    assert set(hot_functions[0]) == {
+        "function",
+        "calls",
+        "own_time",
+        "cumulative_time",
+    }
+    assert hot_functions[0]["own_time"] >= hot_functions[1]["own_time"]
+
+
+def test_run_profiled_writes_profile_on_error(tmp_path):
+    profile_file = tmp_path / "scan.prof"
+
+    with pytest.raises(ZeroDivisionError):
+        run_profiled(lambda: 1 / 0, str(profile_file))
+
+    assert profile_file.exists()
+
+
+def test_build_profiled_soda_command():
+    command = build_profiled_soda_command(
+        "soda scan -d test -c config.yaml checks.yaml", "/tmp/scan.prof"
+    )
+
+    assert command.endswith(
+        "-m prefect_soda_core.profiling /tmp/scan.prof "
+        "scan -d test -c config.yaml checks.yaml"
+    )
+
+
+def test_build_profiled_soda_command_raises():
+    with pytest.raises(ValueError, match="Not a soda CLI command"):
+        build_profiled_soda_command("echo soda", "/tmp/scan.prof")
+
+
+async def test_create_profile_artifacts(tmp_path):
+    profile_file = str(tmp_path / "scan.prof")
+    run_profiled(_busy, profile_file, n=1000)
+
+    @flow(name="test_create_profile_artifacts")
+    async def test_flow():
+        await create_profile_artifacts(profile_file, top_n=3, key="soda-profile")
+
+    await test_flow()
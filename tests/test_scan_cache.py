@@ -0,0 +1,92 @@
+import os
+import stat
+import time
+
+import pytest
+from prefect.settings import PREFECT_HOME, temporary_settings
+
+from prefect_soda_core.scan_cache import ScanResultCache
+
+
+@pytest.fixture
+def scan_files(tmp_path):
+    configuration_yaml_path = tmp_path / "configuration.yaml"
+    configuration_yaml_path.write_text("data_source test:\n  type: postgres\n")
+    sodacl_yaml_path = tmp_path / "checks.yaml"
+    sodacl_yaml_path.write_text("checks for table:\n  - row_count > 0\n")
+    return str(configuration_yaml_path), str(sodacl_yaml_path)
+
+
+def test_make_key_depends_on_content_and_options(scan_files):
+    configuration_yaml_path, sodacl_yaml_path = scan_files
+
+    def make_key(**kwargs):
+        return ScanResultCache.make_key(
+            configuration_yaml_path=configuration_yaml_path,
+            sodacl_yaml_paths=[sodacl_yaml_path],
+            **{"data_source_name": "test", "variables": {"a": "1"}, **kwargs},
+        )
+
+    key = make_key()
+    assert key == make_key(variables={"a": "1"})
+    assert key != make_key(variables={"a": "2"})
+    assert key != make_key(data_source_name="other")
+    assert key != make_key(verbose=True)
+
+    with open(sodacl_yaml_path, "a") as f:
+        f.write("  - missing_count(id) = 0\n")
+    assert key != make_key()
+
+
+def test_get_and_set(tmp_path):
+    cache = ScanResultCache(directory=str(tmp_path))
+    missing = object()
+
+    assert cache.get("key", default=missing) is missing
+    cache.set("key", {"result": None})
+    assert cache.get("key") == {"result": None}
+
+    cache.clear()
+    assert cache.get("key", default=missing) is missing
+
+
+def test_entries_expire(tmp_path):
+    cache = ScanResultCache(directory=str(tmp_path), ttl_seconds=0)
+
+    cache.set("key", "value")
+    time.sleep(0.01)
+
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ScanResultCache(directory=str(tmp_path), max_entries=2)
+
+    cache.set("first", 1)
+    cache.set("second", 2)
+    # Make "first" the most recently used entry
+    os.utime(cache._entry_path("second"), (time.time() - 10, time.time() - 10))
+    assert cache.get("first") == 1
+    cache.set("third", 3)
+
+    assert cache.get("first") == 1
+    assert cache.get("second") is None
+    assert cache.get("third") == 3
+
+
+def test_default_directory_is_private(tmp_path):
+    with temporary_settings({PREFECT_HOME: str(tmp_path)}):
+        cache = ScanResultCache()
+
+    assert cache.directory == os.path.join(str(tmp_path), "soda_scan_cache")
+    assert stat.S_IMODE(os.stat(cache.directory).st_mode) & 0o077 == 0
+
+
+def test_directory_writable_by_others_raises(tmp_path):
+    directory = tmp_path / "cache"
+    directory.mkdir()
+    directory.chmod(0o777)
+
+    with pytest.raises(ValueError, match="not be writable by other users"):
+        ScanResultCache(directory=str(directory))
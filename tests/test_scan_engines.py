@@ -0,0 +1,188 @@
+import os
+from unittest import mock
+
+import pytest
+
+from prefect_soda_core.connection_pool import get_default_connection_pool
+from prefect_soda_core.scan_engines import (
+    ExecutionMode,
+    build_soda_command,
+    execute_dataframe_scan_in_process,
+    execute_scan_in_process,
+    execute_spark_scan_in_process,
+    patched_environment,
+)
+
+
+def test_build_soda_command_minimal():
+    command = build_soda_command(
+        data_source_name="test",
+        configuration_yaml_path="/path/to/config.yaml",
+        sodacl_yaml_paths=["/path/to/checks.yaml"],
+    )
+
+    assert command == "soda scan -d test -c /path/to/config.yaml /path/to/checks.yaml"
+
+
+def test_build_soda_command_with_all_options():
+    command = build_soda_command(
+        data_source_name="test",
+        configuration_yaml_path="/path/to/config.yaml",
+        sodacl_yaml_paths=["/path/to/checks.yaml", "/path/to/other_checks.yaml"],
+        variables={"foo": "bar"},
+        scan_results_file="results.json",
+        verbose=True,
+    )
+
+    assert command == (
+        'soda scan -d test -c /path/to/config.yaml -v "foo=bar"  -srf results.json'
+        " -V /path/to/checks.yaml /path/to/other_checks.yaml"
+    )
+
+
+def test_execution_mode_from_string():
+    assert ExecutionMode("in_process") is ExecutionMode.IN_PROCESS
+    assert ExecutionMode("cli") is ExecutionMode.CLI
+
+
+@mock.patch("soda.scan.Scan")
+def test_execute_scan_in_process_configures_scan(mock_scan_cls):
+    mock_scan = mock_scan_cls.return_value
+    mock_scan.execute.return_value = 2
+    mock_scan.get_logs_text.return_value = "INFO   | line 1\nINFO   | line 2"
+
+    exit_code, soda_logs = execute_scan_in_process(
+        data_source_name="test",
+        configuration_yaml_path="/path/to/config.yaml",
+        sodacl_yaml_paths=["/path/to/checks.yaml"],
+        variables={"foo": "bar"},
+        scan_results_file="results.json",
+        verbose=True,
+    )
+
+    assert exit_code == 2
+    assert soda_logs == ["INFO   | line 1", "INFO   | line 2"]
+    mock_scan.add_variables.assert_called_once_with({"foo": "bar"})
+    mock_scan.set_verbose.assert_called_once()
+    mock_scan.set_data_source_name.assert_called_once_with("test")
+    mock_scan.add_configuration_yaml_file.assert_called_once_with(
+        "/path/to/config.yaml"
+    )
+    mock_scan.add_sodacl_yaml_files.assert_called_once_with("/path/to/checks.yaml")
+    mock_scan.set_scan_results_file.assert_called_once_with("results.json")
+
+
+@mock.patch("soda.scan.Scan")
+def test_execute_scan_in_process_without_logs(mock_scan_cls):
+    mock_scan = mock_scan_cls.return_value
+    mock_scan.execute.return_value = 0
+    mock_scan.get_logs_text.return_value = None
+
+    exit_code, soda_logs = execute_scan_in_process(
+        data_source_name="test",
+        configuration_yaml_path="/path/to/config.yaml",
+        sodacl_yaml_paths=["/path/to/checks.yaml"],
+    )
+
+    assert exit_code == 0
+    assert soda_logs == []
+    mock_scan.set_scan_results_file.assert_not_called()
+
+
+@mock.patch("prefect_soda_core.scan_engines.pooled_data_source")
+@mock.patch("soda.scan.Scan")
+def test_execute_scan_in_process_reuses_connections(
+    mock_scan_cls, mock_pooled_data_source
+):
+    mock_scan = mock_scan_cls.return_value
+    mock_scan.execute.return_value = 0
+    mock_scan.get_logs_text.return_value = None
+
+    exit_code, _ = execute_scan_in_process(
+        data_source_name="test",
+        configuration_yaml_path="/path/to/config.yaml",
+        sodacl_yaml_paths=["/path/to/checks.yaml"],
+        reuse_connections=True,
+    )
+
+    assert exit_code == 0
+    mock_pooled_data_source.assert_called_once_with(
+        mock_scan, "test", get_default_connection_pool()
+    )
+    mock_pooled_data_source.return_value.__enter__.assert_called_once()
+
+
+@mock.patch("soda.scan.Scan")
+def test_execute_dataframe_scan_in_process(mock_scan_cls):
+    pandas = pytest.importorskip("pandas")
+    mock_scan = mock_scan_cls.return_value
+    mock_scan.execute.return_value = 2
+    mock_scan.get_logs_text.return_value = "line 1\nline 2"
+    pandas_df = pandas.DataFrame({"id": [1, 2]})
+    # Any other data frame is a Dask one, whatever the module of its class
+    dask_df = object()
+
+    exit_code, soda_logs = execute_dataframe_scan_in_process(
+        data_source_name="frames",
+        dataframes={"orders": pandas_df, "users": dask_df},
+        sodacl_yaml_strs=["checks for orders:\n  - row_count > 0\n"],
+        variables={"var": "value"},
+        scan_results_file="/path/to/results.json",
+    )
+
+    assert exit_code == 2
+    assert soda_logs == ["line 1", "line 2"]
+    mock_scan.add_variables.assert_called_once_with({"var": "value"})
+    mock_scan.set_data_source_name.assert_called_once_with("frames")
+    mock_scan.add_pandas_dataframe.assert_called_once_with(
+        "orders", pandas_df, data_source_name="frames"
+    )
+    mock_scan.add_dask_dataframe.assert_called_once_with(
+        "users", dask_df, data_source_name="frames"
+    )
+    mock_scan.add_sodacl_yaml_str.assert_called_once_with(
+        "checks for orders:\n  - row_count > 0\n"
+    )
+    mock_scan.set_scan_results_file.assert_called_once_with("/path/to/results.json")
+    mock_scan.add_configuration_yaml_file.assert_not_called()
+
+
+@mock.patch("soda.scan.Scan")
+def test_execute_spark_scan_in_process(mock_scan_cls):
+    mock_scan = mock_scan_cls.return_value
+    mock_scan.execute.return_value = 0
+    mock_scan.get_logs_text.return_value = "line 1"
+    spark_session = mock.MagicMock()
+    spark_df = mock.MagicMock()
+
+    exit_code, soda_logs = execute_spark_scan_in_process(
+        data_source_name="spark_df",
+        spark_session=spark_session,
+        sodacl_yaml_strs=["checks for orders:\n  - row_count > 0\n"],
+        dataframes={"orders": spark_df},
+    )
+
+    assert exit_code == 0
+    assert soda_logs == ["line 1"]
+    spark_df.createOrReplaceTempView.assert_called_once_with("orders")
+    mock_scan.set_data_source_name.assert_called_once_with("spark_df")
+    mock_scan.add_spark_session.assert_called_once_with(
+        spark_session, data_source_name="spark_df"
+    )
+    mock_scan.add_sodacl_yaml_str.assert_called_once_with(
+        "checks for orders:\n  - row_count > 0\n"
+    )
+    mock_scan.set_scan_results_file.assert_not_called()
+
+
+def test_patched_environment(monkeypatch):
+    monkeypatch.setenv("SODA_KEPT", "kept")
+    monkeypatch.setenv("SODA_REPLACED", "before")
+
+    with patched_environment({"SODA_REPLACED": "after", "SODA_ADDED": "added"}):
+        assert os.environ["SODA_KEPT"] == "kept"
+        assert os.environ["SODA_REPLACED"] == "after"
+        assert os.environ["SODA_ADDED"] == "added"
+
+    assert os.environ["SODA_REPLACED"] == "before"
+    assert "SODA_ADDED" not in os.environ
@@ -0,0 +1,246 @@
+import json
+import pickle
+
+import pytest
+
+from prefect_soda_core.scan_results import (
+    CheckOutcome,
+    ScanResult,
+    iter_scan_results,
+    iter_scan_results_checks,
+    merge_scan_results,
+    split_scan_results_by_checks_file,
+)
+
+
+def _check(file_path, outcome):
+    return {
+        "name": f"check in {file_path}",
+        "location": {"filePath": file_path, "line": 1, "col": 1},
+        "outcome": outcome,
+    }
+
+
+def test_split_scan_results_by_checks_file():
+    scan_results = {
+        "defaultDataSource": "test",
+        "hasErrors": False,
+        "hasWarnings": True,
+        "hasFailures": True,
+        "metrics": [{"identity": "metric"}],
+        "checks": [
+            _check("/path/to/a.yaml", "pass"),
+            _check("/path/to/b.yaml", "fail"),
+            _check("/path/to/a.yaml", "warn"),
+        ],
+        "logs": [{"message": "log"}],
+    }
+
+    results = split_scan_results_by_checks_file(
+        scan_results=scan_results,
+        sodacl_yaml_paths=["/path/to/a.yaml", "/path/to/b.yaml", "/path/to/c.yaml"],
+    )
+
+    assert list(results) == ["/path/to/a.yaml", "/path/to/b.yaml", "/path/to/c.yaml"]
+    assert results["/path/to/a.yaml"] == {
+        "defaultDataSource": "test",
+        "hasErrors": False,
+        "hasWarnings": True,
+        "hasFailures": False,
+        "checks": [
+            _check("/path/to/a.yaml", "pass"),
+            _check("/path/to/a.yaml", "warn"),
+        ],
+    }
+    assert results["/path/to/b.yaml"]["hasFailures"] is True
+    assert results["/path/to/b.yaml"]["hasWarnings"] is False
+    assert results["/path/to/c.yaml"]["checks"] == []
+
+
+def test_split_scan_results_by_checks_file_normalizes_paths():
+    scan_results = {"checks": [_check("/path/to/a.yaml", "pass")]}
+
+    results = split_scan_results_by_checks_file(
+        scan_results=scan_results, sodacl_yaml_paths=["/path/to/../to/a.yaml"]
+    )
+
+    assert results["/path/to/../to/a.yaml"]["checks"] == scan_results["checks"]
+
+
+@pytest.fixture
+def scan_results_file(tmp_path):
+    scan_results = {
+        "defaultDataSource": "test",
+        "hasErrors": False,
+        "metrics": [{"identity": "metric-1", "value": 12345}, {"identity": "m2"}],
+        "checks": [
+            {
+                "name": "row_count > 0",
+                "outcome": "pass",
+                "diagnostics": {"value": 1234567, "blocks": []},
+            },
+            {
+                "name": "missing_count(id) = 0",
+                "outcome": "fail",
+                "diagnostics": {
+                    "value": 3,
+                    "blocks": [{"failedRowsSample": ["x" * 100] * 10}],
+                },
+            },
+        ],
+        "queries": [],
+        "duration": 1.5e3,
+        "escaped": 'a "quoted" \\ value ]}',
+    }
+    path = tmp_path / "scan_results.json"
+    with open(path, "w") as f:
+        json.dump(scan_results, f)
+    return str(path), scan_results
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_scan_results_matches_json_load(scan_results_file, chunk_size):
+    path, scan_results = scan_results_file
+
+    items = list(iter_scan_results(path, chunk_size=chunk_size))
+
+    assert items == [
+        ("defaultDataSource", "test"),
+        ("hasErrors", False),
+        ("metrics", scan_results["metrics"][0]),
+        ("metrics", scan_results["metrics"][1]),
+        ("checks", scan_results["checks"][0]),
+        ("checks", scan_results["checks"][1]),
+        ("duration", 1.5e3),
+        ("escaped", 'a "quoted" \\ value ]}'),
+    ]
+
+
+# Documents whose numbers and nested scalars may be split by any chunk boundary
+SCALAR_DOCUMENTS = [
+    '{"a": 0.1}',
+    '{"checks":[0.1, 2]}',
+    '{"a":[1.5]}',
+    '{"a": -12.5e-3, "b": 1E+10, "c": [0, -0.0, 3e2]}',
+    '{"checks": [{"value": 0.25, "nested": [1.5e1, true, null]}, false], "n": 10}',
+]
+
+
+@pytest.mark.parametrize(
+    "document, chunk_size",
+    [
+        (document, chunk_size)
+        for document in SCALAR_DOCUMENTS
+        for chunk_size in range(1, len(document) + 1)
+    ],
+)
+def test_iter_scan_results_numbers_across_chunks(tmp_path, document, chunk_size):
+    path = tmp_path / "scan_results.json"
+    path.write_text(document)
+
+    items = list(iter_scan_results(str(path), chunk_size=chunk_size))
+
+    expected_items = []
+    for key, value in json.loads(document).items():
+        if isinstance(value, list):
+            expected_items.extend((key, item) for item in value)
+        else:
+            expected_items.append((key, value))
+    assert items == expected_items
+
+
+def test_iter_scan_results_invalid_file_raises(tmp_path):
+    path = tmp_path / "scan_results.json"
+    path.write_text('["not", "an", "object"]')
+
+    with pytest.raises(ValueError, match="Invalid scan results file"):
+        list(iter_scan_results(str(path)))
+
+
+def test_iter_scan_results_checks(scan_results_file):
+    path, scan_results = scan_results_file
+
+    assert list(iter_scan_results_checks(path)) == scan_results["checks"]
+
+
+def test_iter_scan_results_checks_spills_large_payloads(scan_results_file, tmp_path):
+    path, scan_results = scan_results_file
+    spill_directory = tmp_path / "spill"
+    spill_directory.mkdir()
+
+    checks = list(
+        iter_scan_results_checks(
+            path, max_payload_bytes=100, spill_directory=str(spill_directory)
+        )
+    )
+
+    assert checks[0] == scan_results["checks"][0]
+    blocks = checks[1]["diagnostics"]["blocks"]
+    assert blocks["truncated"] is True
+    with open(blocks["spilledTo"], "r") as f:
+        assert json.load(f) == scan_results["checks"][1]["diagnostics"]["blocks"]
+    assert checks[1]["diagnostics"]["value"] == 3
+
+
+def test_scan_result_from_file(scan_results_file):
+    path, scan_results = scan_results_file
+
+    scan_result = ScanResult.from_file(path)
+
+    assert scan_result == ScanResult.from_dict(scan_results)
+    assert scan_result.data_source == "test"
+    assert scan_result.has_errors is False
+    assert scan_result.outcome_counts == {"pass": 1, "warn": 0, "fail": 1}
+    assert scan_result.metrics == {"metric-1": 12345, "m2": None}
+    assert scan_result.failed_checks == [
+        CheckOutcome.from_dict(scan_results["checks"][1])
+    ]
+    assert (
+        scan_result.failed_checks[0].diagnostics
+        == scan_results["checks"][1]["diagnostics"]
+    )
+    assert scan_result.get_section("queries") == []
+    assert pickle.loads(pickle.dumps(scan_result)) == scan_result
+
+
+def test_scan_result_duration():
+    scan_result = ScanResult.from_dict(
+        {
+            "scanStartTimestamp": "2023-01-01T00:00:00+00:00",
+            "scanEndTimestamp": "2023-01-01T00:01:30Z",
+            "logs": [{"level": "INFO", "message": "Scan summary"}],
+        }
+    )
+
+    assert scan_result.duration == 90
+    assert scan_result.logs == [{"level": "INFO", "message": "Scan summary"}]
+    assert ScanResult().duration is None
+
+
+def test_merge_scan_results():
+    merged_results = merge_scan_results(
+        [
+            {
+                "defaultDataSource": "test",
+                "scanStartTimestamp": "2023-01-01T00:00:02+00:00",
+                "scanEndTimestamp": "2023-01-01T00:00:05+00:00",
+                "hasFailures": False,
+                "checks": [_check("a.yaml", "pass")],
+            },
+            {
+                "defaultDataSource": "test",
+                "scanStartTimestamp": "2023-01-01T00:00:01+00:00",
+                "scanEndTimestamp": "2023-01-01T00:00:04+00:00",
+                "hasFailures": True,
+                "checks": [_check("b.yaml", "fail")],
+            },
+        ]
+    )
+
+    assert merged_results == {
+        "defaultDataSource": "test",
+        "scanStartTimestamp": "2023-01-01T00:00:01+00:00",
+        "scanEndTimestamp": "2023-01-01T00:00:05+00:00",
+        "hasFailures": True,
+        "checks": [_check("a.yaml", "pass"), _check("b.yaml", "fail")],
+    }
@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+
+import pytest
+
+from prefect_soda_core.scan_timing import ScanTimer
+
+
+def _make_span_hook(spans):
+    @contextmanager
+    def span_hook(name, attributes):
+        spans.append(("start", name, attributes))
+        try:
+            yield
+        except Exception as exc:
+            spans.append(("error", name, str(exc)))
+            raise
+        spans.append(("end", name, attributes))
+
+    return span_hook
+
+
+def test_scan_timer_adds_up_durations_of_phases():
+    timer = ScanTimer(attributes={"data_source_name": "test"})
+
+    with timer.phase("persist_checks"):
+        pass
+    with timer.phase("persist_checks"):
+        pass
+    phase_timing = timer.start("scan")
+    phase_timing.end()
+    # Ending a phase twice only records it once
+    phase_timing.end()
+
+    assert list(timer.durations) == ["persist_checks", "scan"]
+    assert all(duration >= 0 for duration in timer.durations.values())
+    assert timer.to_event() == {
+        "data_source_name": "test",
+        "durations": timer.durations,
+    }
+
+
+def test_scan_timer_opens_spans():
+    spans = []
+    timer = ScanTimer(
+        span_hook=_make_span_hook(spans), attributes={"data_source_name": "test"}
+    )
+
+    with timer.phase("scan"):
+        with timer.phase("process_start"):
+            pass
+
+    assert spans == [
+        ("start", "soda_scan.scan", {"data_source_name": "test"}),
+        ("start", "soda_scan.process_start", {"data_source_name": "test"}),
+        ("end", "soda_scan.process_start", {"data_source_name": "test"}),
+        ("end", "soda_scan.scan", {"data_source_name": "test"}),
+    ]
+
+
+def test_scan_timer_passes_errors_to_spans():
+    spans = []
+    timer = ScanTimer(span_hook=_make_span_hook(spans))
+
+    with pytest.raises(RuntimeError, match="error!"):
+        with timer.phase("scan"):
+            raise RuntimeError("error!")
+
+    assert spans[-1] == ("error", "soda_scan.scan", "error!")
+    assert "scan" in timer.durations
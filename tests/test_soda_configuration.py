@@ -1,8 +1,8 @@
 import pyfakefs  # noqa
 import pytest
-from yaml import safe_load
 
 from prefect_soda_core.exceptions import SodaConfigurationException
+from prefect_soda_core.scan_engines import ExecutionMode
 from prefect_soda_core.soda_configuration import SodaConfiguration
 
 
@@ -61,6 +61,49 @@ def test_persist_configuration_succeed(fs):
     sc.persist_configuration()
 
     with open(expected_path, "r") as f:
-        persisted_yaml = safe_load(stream=f)
+        persisted_yaml = f.read()
 
     assert persisted_yaml == expected_yaml
+
+
+def test_persist_configuration_skips_unchanged_configuration(fs):
+    sc = SodaConfiguration(
+        configuration_yaml_path="/path/to/configuration.yaml",
+        configuration_yaml_str="data_source test:\n  type: postgres\n",
+    )
+
+    fs.create_dir("/path/to/")
+
+    assert sc.persist_configuration() is True
+    assert sc.persist_configuration() is False
+
+
+def test_soda_configuration_execution_mode_defaults_to_cli():
+    sc = SodaConfiguration(configuration_yaml_path="/path/to/configuration.yaml")
+
+    assert sc.execution_mode is ExecutionMode.CLI
+
+
+def test_get_data_source_names_from_yaml_str():
+    sc = SodaConfiguration(
+        configuration_yaml_path="/path/to/configuration.yaml",
+        configuration_yaml_str="""
+        data_source first:
+            type: postgres
+        soda_cloud:
+            host: cloud.soda.io
+        data_source second:
+            type: snowflake
+        """,
+    )
+
+    assert sc.get_data_source_names() == ["first", "second"]
+
+
+def test_get_data_source_names_from_file(fs):
+    fs.create_file(
+        "/path/to/configuration.yaml", contents="data_source only:\n  type: mysql\n"
+    )
+    sc = SodaConfiguration(configuration_yaml_path="/path/to/configuration.yaml")
+
+    assert sc.get_data_source_names() == ["only"]
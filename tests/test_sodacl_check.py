@@ -1,6 +1,5 @@
 import pyfakefs  # noqa
 import pytest
-from yaml import safe_load
 
 from prefect_soda_core.exceptions import SodaConfigurationException
 from prefect_soda_core.sodacl_check import SodaCLCheck
@@ -55,6 +54,43 @@ def test_persist_checks_succeed(fs):
     sc.persist_checks()
 
     with open(expected_path, "r") as f:
-        persisted_yaml = safe_load(stream=f)
+        persisted_yaml = f.read()
 
     assert persisted_yaml == expected_yaml
+
+
+def test_persist_checks_skips_unchanged_checks(fs):
+    sc = SodaCLCheck(
+        sodacl_yaml_path="/path/to/checks.yaml",
+        sodacl_yaml_str="checks for table:\n  - row_count > 0\n",
+    )
+
+    fs.create_dir("/path/to/")
+
+    assert sc.persist_checks() is True
+    assert sc.persist_checks() is False
+
+
+def test_materialize_checks_in_directory(fs):
+    sc = SodaCLCheck(
+        sodacl_yaml_path="/path/to/checks.yaml",
+        sodacl_yaml_str="checks for table:\n  - row_count > 0\n",
+        materialization="memory",
+    )
+
+    fs.create_dir("/dev/shm/workspace")
+    path = sc.materialize_checks("/dev/shm/workspace")
+
+    assert path == "/dev/shm/workspace/checks.yaml"
+    with open(path, "r") as f:
+        assert f.read() == sc.sodacl_yaml_str
+    assert not fs.exists("/path/to/checks.yaml")
+
+
+def test_get_index_from_file(fs):
+    fs.create_file(
+        "/path/to/checks.yaml", contents="checks for orders:\n  - row_count > 0\n"
+    )
+    sc = SodaCLCheck(sodacl_yaml_path="/path/to/checks.yaml")
+
+    assert sc.get_index().checks_count_by_table == {"orders": 1}
@@ -0,0 +1,132 @@
+from unittest import mock
+
+import pytest
+
+from prefect_soda_core import sodacl_index as sodacl_index_module
+from prefect_soda_core.sodacl_index import get_sodacl_index, split_sodacl_by_table
+from prefect_soda_core.yaml_parsing import load_yaml_str
+
+SODACL_YAML_STR = """
+checks for customers:
+  - row_count > ${MIN_ROWS}
+  - missing_count(id) = 0
+checks for orders [daily]:
+  - freshness(created_at) < ${MAX_DELAY}
+checks for orders:
+  - duplicate_count(id) = 0
+for each dataset T:
+  datasets:
+    - include ${PREFIX}%
+  checks:
+    - row_count > 0
+"""
+
+
+def test_get_sodacl_index():
+    sodacl_index = get_sodacl_index(SODACL_YAML_STR)
+
+    assert sodacl_index.tables == ("customers", "orders")
+    assert sodacl_index.checks_count_by_table == {"customers": 2, "orders": 2}
+    assert sodacl_index.checks_count == 4
+    assert sodacl_index.variables_by_section == {
+        "checks for customers": ("MIN_ROWS",),
+        "checks for orders [daily]": ("MAX_DELAY",),
+        "checks for orders": (),
+        "for each dataset T": ("PREFIX",),
+    }
+    assert sodacl_index.variables == ("MAX_DELAY", "MIN_ROWS", "PREFIX")
+
+
+def test_get_sodacl_index_builds_once_per_content():
+    with mock.patch.object(
+        sodacl_index_module,
+        "_build_sodacl_index",
+        wraps=sodacl_index_module._build_sodacl_index,
+    ) as mock_build_sodacl_index:
+        first = get_sodacl_index("checks for built_once:\n  - row_count > 0\n")
+        second = get_sodacl_index("checks for built_once:\n  - row_count > 0\n")
+
+    assert first is second
+    assert mock_build_sodacl_index.call_count == 1
+
+
+def test_get_sodacl_index_empty_content():
+    assert get_sodacl_index(None).tables == ()
+
+
+def test_split_sodacl_by_table():
+    shards = [load_yaml_str(shard) for shard in split_sodacl_by_table(SODACL_YAML_STR)]
+
+    assert shards == [
+        {"checks for customers": ["row_count > ${MIN_ROWS}", "missing_count(id) = 0"]},
+        {
+            "checks for orders [daily]": ["freshness(created_at) < ${MAX_DELAY}"],
+            "checks for orders": ["duplicate_count(id) = 0"],
+        },
+        {
+            "for each dataset T": {
+                "datasets": ["include ${PREFIX}%"],
+                "checks": ["row_count > 0"],
+            }
+        },
+    ]
+
+
+def test_split_sodacl_by_table_balances_shards():
+    sodacl_yaml_str = "".join(
+        f"checks for table_{index}:\n" + "  - row_count > 0\n" * checks_count
+        for index, checks_count in enumerate([5, 1, 3, 3, 2])
+    )
+    sodacl_yaml_str += "filter table_1 [daily]:\n  where: day = today\n"
+
+    shards = [
+        load_yaml_str(shard)
+        for shard in split_sodacl_by_table(sodacl_yaml_str, max_shards=2)
+    ]
+
+    assert [sorted(shard) for shard in shards] == [
+        ["checks for table_0", "checks for table_4"],
+        [
+            "checks for table_1",
+            "checks for table_2",
+            "checks for table_3",
+            "filter table_1 [daily]",
+        ],
+    ]
+
+    with pytest.raises(ValueError, match="at least 1"):
+        split_sodacl_by_table(sodacl_yaml_str, max_shards=0)
+
+
+def test_split_sodacl_by_table_keeps_sections_text():
+    sodacl_yaml_str = (
+        "# Checks of the customers\n"
+        "checks for customers:\n"
+        "  - invalid_count(active) = 0:\n"
+        "      valid values: [yes, no, on, off]\n"
+        "\n"
+        "# Checks of the orders\n"
+        "checks for orders:\n"
+        "  - row_count > 0  # never empty\n"
+        "checks for customers [daily]:\n"
+        "  - row_count > 0\n"
+    )
+
+    assert split_sodacl_by_table(sodacl_yaml_str) == [
+        "# Checks of the customers\n"
+        "checks for customers:\n"
+        "  - invalid_count(active) = 0:\n"
+        "      valid values: [yes, no, on, off]\n"
+        "checks for customers [daily]:\n"
+        "  - row_count > 0\n",
+        "\n"
+        "# Checks of the orders\n"
+        "checks for orders:\n"
+        "  - row_count > 0  # never empty\n",
+    ]
+
+
+def test_split_sodacl_by_table_flow_mapping():
+    sodacl_yaml_str = "{checks for a: [row_count > 0], checks for b: [row_count > 0]}"
+
+    assert split_sodacl_by_table(sodacl_yaml_str) == [sodacl_yaml_str]
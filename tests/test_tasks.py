@@ -1,11 +1,29 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
 from unittest import mock
 
+import anyio
 import pytest
 from prefect import flow
 
+from prefect_soda_core.duration_store import ScanDurationStore, hash_sodacl_content
+from prefect_soda_core.metrics import ScanMetrics
+from prefect_soda_core.persistence import get_memory_directory
+from prefect_soda_core.scan_cache import ScanResultCache
+from prefect_soda_core.scan_results import ScanResult
 from prefect_soda_core.soda_configuration import SodaConfiguration
 from prefect_soda_core.sodacl_check import SodaCLCheck
-from prefect_soda_core.tasks import soda_scan_execute
+from prefect_soda_core.tasks import (
+    soda_scan_dataframe,
+    soda_scan_execute,
+    soda_scan_execute_batch,
+    soda_scan_execute_fan_out,
+    soda_scan_execute_sharded,
+    soda_scan_spark_dataframe,
+)
 
 
 def _mock_shell_run_command_fn(**kwargs):
@@ -97,6 +115,174 @@ async def test_soda_scan_execute_return_scan_result_file_content_succeed(
     assert flow_result == {"result": "fake"}
 
 
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_return_scan_result_succeed(
+    mock_shell_run_command_fn, tmp_path
+):
+    mock_shell_run_command_fn.return_value = _mock_shell_run_command_fn()
+    scan_result_file_path = f"{tmp_path}/scan_result_file.json"
+
+    with open(scan_result_file_path, "w") as f:
+        json.dump(
+            {
+                "defaultDataSource": "test",
+                "checks": [{"name": "row_count > 0", "outcome": "fail"}],
+            },
+            f,
+        )
+
+    @flow(name="test_soda_scan_execute_return_scan_result_succeed")
+    async def test_flow():
+        result = await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables={"foo": "bar"},
+            return_scan_result=True,
+            scan_results_file=scan_result_file_path,
+        )
+        return result
+
+    flow_result = await test_flow()
+
+    assert isinstance(flow_result, ScanResult)
+    assert flow_result.data_source == "test"
+    assert flow_result.outcome_counts == {"pass": 0, "warn": 0, "fail": 1}
+
+
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_times_phases(
+    mock_shell_run_command_fn, tmp_path, caplog
+):
+    mock_shell_run_command_fn.return_value = _mock_shell_run_command_fn()
+    scan_result_file_path = f"{tmp_path}/scan_result_file.json"
+    with open(scan_result_file_path, "w") as f:
+        json.dump({"defaultDataSource": "test"}, f)
+    spans = []
+
+    @contextmanager
+    def span_hook(name, attributes):
+        spans.append((name, attributes))
+        yield
+
+    @flow(name="test_soda_scan_execute_times_phases")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            return_scan_result_file_content=True,
+            scan_results_file=scan_result_file_path,
+            span_hook=span_hook,
+        )
+
+    await test_flow()
+
+    phases = [
+        "persist_configuration",
+        "persist_checks",
+        "build_command",
+        "scan",
+        "parse_results",
+    ]
+    assert spans == [
+        (
+            f"soda_scan.{phase}",
+            {"data_source_name": "test", "execution_mode": "cli"},
+        )
+        for phase in phases
+    ]
+    (timings,) = [
+        record.soda_scan_timings
+        for record in caplog.records
+        if hasattr(record, "soda_scan_timings")
+    ]
+    assert timings["data_source_name"] == "test"
+    assert list(timings["durations"]) == phases
+
+
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_cache_skips_identical_scans(
+    mock_shell_run_command_fn, tmp_path
+):
+    mock_shell_run_command_fn.return_value = _mock_shell_run_command_fn()
+    cache = ScanResultCache(directory=str(tmp_path / "cache"))
+
+    @flow(name="test_soda_scan_execute_cache_skips_identical_scans")
+    async def test_flow(variables):
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "config.yaml"),
+                configuration_yaml_str="data_source test:\n  type: postgres\n",
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                sodacl_yaml_str="checks for table:\n  - row_count > 0\n",
+            ),
+            variables=variables,
+            cache=cache,
+        )
+
+    assert await test_flow({"foo": "bar"}) == "this is the log".split(" ")
+    assert await test_flow({"foo": "bar"}) == "this is the log".split(" ")
+    assert mock_shell_run_command_fn.call_count == 1
+
+    await test_flow({"foo": "baz"})
+    assert mock_shell_run_command_fn.call_count == 2
+
+
+async def test_soda_scan_execute_memory_materialization(tmp_path):
+    materialized_paths = []
+
+    async def _mock_shell_run_command_fn(command, env, return_all):
+        # The command is "soda scan -d test -c <configuration> <checks>"
+        materialized_paths.extend(command.split(" ")[5:])
+        for path in materialized_paths:
+            assert os.path.isfile(path)
+        return []
+
+    @flow(name="soda_scan_execute_memory_materialization")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "config.yaml"),
+                configuration_yaml_str="data_source test:\n  type: postgres\n",
+                materialization="memory",
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                sodacl_yaml_str="checks for table:\n  - row_count > 0\n",
+                materialization="memory",
+            ),
+            variables=None,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=_mock_shell_run_command_fn,
+    ):
+        await test_flow()
+
+    assert len(materialized_paths) == 2
+    for path in materialized_paths:
+        assert path.startswith(get_memory_directory())
+        assert not os.path.exists(path)
+    assert os.listdir(tmp_path) == []
+
+
 @mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
 async def test_soda_scan_execute_return_none_logs_succeed(mock_shell_run_command_fn):
     mock_shell_run_command_fn.return_value = _mock_shell_run_command_fn()
@@ -122,3 +308,1082 @@ async def test_soda_scan_execute_return_none_logs_succeed(mock_shell_run_command
     flow_result = await test_flow()
 
     assert flow_result == []
+
+
+@mock.patch("prefect_soda_core.tasks.execute_scan_in_process")
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_in_process_succeed(
+    mock_shell_run_command_fn, mock_execute_scan_in_process
+):
+    mock_execute_scan_in_process.return_value = (2, ["this", "is", "the", "log"])
+
+    @flow(name="soda_scan_execute_in_process_succeed")
+    async def test_flow():
+        result = await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables={"foo": "bar"},
+            execution_mode="in_process",
+        )
+        return result
+
+    flow_result = await test_flow()
+
+    assert flow_result == "this is the log".split(" ")
+    mock_shell_run_command_fn.assert_not_called()
+    mock_execute_scan_in_process.assert_called_once_with(
+        data_source_name="test",
+        configuration_yaml_path="/path/to/config.yaml",
+        sodacl_yaml_paths=["/path/to/checks.yaml"],
+        variables={"foo": "bar"},
+        scan_results_file=None,
+        verbose=False,
+    )
+
+
+@mock.patch("prefect_soda_core.tasks.create_profile_artifacts")
+@mock.patch("prefect_soda_core.tasks.execute_scan_in_process")
+async def test_soda_scan_execute_in_process_profile(
+    mock_execute_scan_in_process, mock_create_profile_artifacts, tmp_path, monkeypatch
+):
+    mock_execute_scan_in_process.return_value = (0, ["this", "is", "the", "log"])
+    monkeypatch.chdir(tmp_path)
+
+    @flow(name="soda_scan_execute_in_process_profile")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            execution_mode="in_process",
+            profile=True,
+            profile_top_n=5,
+        )
+
+    flow_result = await test_flow()
+
+    assert flow_result == "this is the log".split(" ")
+    mock_execute_scan_in_process.assert_called_once()
+    (profile_file,) = tmp_path.glob("*--profile.prof")
+    mock_create_profile_artifacts.assert_called_once_with(
+        os.path.basename(profile_file), top_n=5
+    )
+
+
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_cli_profile(mock_shell_run_command_fn):
+    mock_shell_run_command_fn.return_value = _mock_shell_run_command_fn()
+
+    @flow(name="soda_scan_execute_cli_profile")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            profile=True,
+        )
+
+    await test_flow()
+
+    command = mock_shell_run_command_fn.call_args.kwargs["command"]
+    assert " -m prefect_soda_core.profiling " in command
+    assert command.endswith(
+        "--profile.prof scan -d test -c /path/to/config.yaml /path/to/checks.yaml"
+    )
+
+
+async def test_soda_scan_execute_cli_profile_raises_on_scan_error(
+    tmp_path, monkeypatch
+):
+    # The profiled scan runs in a new interpreter, out of the repository
+    monkeypatch.setenv("PYTHONPATH", str(Path(__file__).parents[1]))
+    monkeypatch.chdir(tmp_path)
+    checks_path = tmp_path / "checks.yaml"
+    checks_path.write_text("checks for orders:\n  - row_count > 0\n")
+
+    @flow(name="soda_scan_execute_cli_profile_raises_on_scan_error")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "missing_config.yaml"),
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(sodacl_yaml_path=str(checks_path), sodacl_yaml_str=None),
+            variables=None,
+            profile=True,
+        )
+
+    # The exit code of soda is kept under the profiler
+    with pytest.raises(RuntimeError, match="Command failed with exit code 3"):
+        await test_flow()
+
+    assert len(list(tmp_path.glob("*--profile.prof"))) == 1
+
+
+@mock.patch("prefect_soda_core.tasks.execute_scan_in_process")
+async def test_soda_scan_execute_in_process_from_block_raises(
+    mock_execute_scan_in_process,
+):
+    mock_execute_scan_in_process.return_value = (3, ["error!"])
+
+    @flow(name="soda_scan_execute_in_process_from_block_raises")
+    async def test_flow():
+        result = await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+                execution_mode="in_process",
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+        )
+        return result
+
+    with pytest.raises(RuntimeError, match="Scan failed with exit code 3"):
+        await test_flow()
+
+
+async def test_soda_scan_execute_worker_pool_succeed():
+    mock_worker_pool = mock.MagicMock()
+    mock_worker_pool.execute_scan.return_value = (0, ["this", "is", "the", "log"])
+
+    @flow(name="soda_scan_execute_worker_pool_succeed")
+    async def test_flow():
+        result = await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            execution_mode="worker_pool",
+            worker_pool=mock_worker_pool,
+        )
+        return result
+
+    flow_result = await test_flow()
+
+    assert flow_result == "this is the log".split(" ")
+    mock_worker_pool.execute_scan.assert_called_once()
+
+
+@mock.patch("prefect_soda_core.tasks.execute_scan_in_fork_server")
+async def test_soda_scan_execute_fork_server_succeed(mock_execute_scan_in_fork_server):
+    mock_execute_scan_in_fork_server.return_value = (0, ["this", "is", "the", "log"])
+
+    @flow(name="soda_scan_execute_fork_server_succeed")
+    async def test_flow():
+        result = await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+                execution_mode="fork_server",
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+        )
+        return result
+
+    flow_result = await test_flow()
+
+    assert flow_result == "this is the log".split(" ")
+    mock_execute_scan_in_fork_server.assert_called_once()
+
+
+@mock.patch("prefect_soda_core.tasks.execute_scan_in_fork_server")
+async def test_soda_scan_execute_fork_server_passes_shell_env(
+    mock_execute_scan_in_fork_server,
+):
+    mock_execute_scan_in_fork_server.return_value = (0, [])
+
+    @flow(name="soda_scan_execute_fork_server_passes_shell_env")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            shell_env={"PASSWORD": "secret"},
+            execution_mode="fork_server",
+        )
+
+    await test_flow()
+
+    assert mock_execute_scan_in_fork_server.call_args.kwargs["env"] == {
+        "PASSWORD": "secret"
+    }
+
+
+@mock.patch("prefect_soda_core.tasks.execute_scan_in_process")
+async def test_soda_scan_execute_in_process_warns_about_shell_env(
+    mock_execute_scan_in_process, caplog
+):
+    mock_execute_scan_in_process.return_value = (0, [])
+
+    @flow(name="soda_scan_execute_in_process_warns_about_shell_env")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            shell_env={"PASSWORD": "secret"},
+            execution_mode="in_process",
+        )
+
+    await test_flow()
+
+    assert "env" not in mock_execute_scan_in_process.call_args.kwargs
+    assert "shell_env is ignored" in caplog.text
+
+
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_batch_succeed(mock_shell_run_command_fn, tmp_path):
+    mock_shell_run_command_fn.return_value = _mock_shell_run_command_fn()
+    scan_result_file_path = f"{tmp_path}/scan_result_file.json"
+    scan_results = {
+        "hasErrors": False,
+        "checks": [
+            {"location": {"filePath": "/path/to/a.yaml"}, "outcome": "pass"},
+            {"location": {"filePath": "/path/to/b.yaml"}, "outcome": "fail"},
+        ],
+    }
+    with open(scan_result_file_path, "w") as f:
+        json.dump(scan_results, f)
+
+    @flow(name="soda_scan_execute_batch_succeed")
+    async def test_flow():
+        result = await soda_scan_execute_batch(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=[
+                SodaCLCheck(sodacl_yaml_path="/path/to/a.yaml", sodacl_yaml_str=None),
+                SodaCLCheck(sodacl_yaml_path="/path/to/b.yaml", sodacl_yaml_str=None),
+            ],
+            variables=None,
+            scan_results_file=scan_result_file_path,
+        )
+        return result
+
+    flow_result = await test_flow()
+
+    command = mock_shell_run_command_fn.call_args.kwargs["command"]
+    assert command.endswith("/path/to/a.yaml /path/to/b.yaml")
+    assert flow_result["/path/to/a.yaml"]["hasFailures"] is False
+    assert flow_result["/path/to/b.yaml"]["hasFailures"] is True
+    assert flow_result["/path/to/b.yaml"]["checks"] == [scan_results["checks"][1]]
+
+
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_batch_glob_without_match_raises(
+    mock_shell_run_command_fn, tmp_path
+):
+    @flow(name="soda_scan_execute_batch_glob_without_match_raises")
+    async def test_flow():
+        result = await soda_scan_execute_batch(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=f"{tmp_path}/*.yaml",
+            variables=None,
+        )
+        return result
+
+    with pytest.raises(ValueError, match="No SodaCL checks file to scan"):
+        await test_flow()
+
+    mock_shell_run_command_fn.assert_not_called()
+
+
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_batch_duplicate_paths_raises(
+    mock_shell_run_command_fn, tmp_path
+):
+    @flow(name="soda_scan_execute_batch_duplicate_paths_raises")
+    async def test_flow():
+        return await soda_scan_execute_batch(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=[
+                SodaCLCheck(
+                    sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                    sodacl_yaml_str="checks for orders:\n  - row_count > 0\n",
+                ),
+                SodaCLCheck(
+                    sodacl_yaml_path=str(tmp_path / "other" / ".." / "checks.yaml"),
+                    sodacl_yaml_str="checks for users:\n  - row_count > 0\n",
+                ),
+            ],
+            variables=None,
+        )
+
+    with pytest.raises(ValueError, match="share the same path"):
+        await test_flow()
+
+    mock_shell_run_command_fn.assert_not_called()
+    assert os.listdir(tmp_path) == []
+
+
+async def test_soda_scan_execute_fan_out_respects_concurrency_limits():
+    running = {"total": 0, "max_total": 0, "by_data_source": {}, "max_by_ds": 0}
+
+    async def _mock_shell_run_command(command, **kwargs):
+        data_source_name = command.split(" -d ")[1].split(" ")[0]
+        running["total"] += 1
+        running["by_data_source"][data_source_name] = (
+            running["by_data_source"].get(data_source_name, 0) + 1
+        )
+        running["max_total"] = max(running["max_total"], running["total"])
+        running["max_by_ds"] = max(
+            running["max_by_ds"], running["by_data_source"][data_source_name]
+        )
+        await anyio.sleep(0.05)
+        running["total"] -= 1
+        running["by_data_source"][data_source_name] -= 1
+        return [data_source_name]
+
+    checks = SodaCLCheck(sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None)
+
+    @flow(name="soda_scan_execute_fan_out_respects_concurrency_limits")
+    async def test_flow():
+        return await soda_scan_execute_fan_out(
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            variables=None,
+            scans=[("a", checks), ("a", checks), ("b", checks), ("c", checks)],
+            max_concurrency=2,
+            max_concurrency_per_data_source=1,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=_mock_shell_run_command,
+    ):
+        flow_result = await test_flow()
+
+    assert flow_result == {"a": [["a"], ["a"]], "b": [["b"]], "c": [["c"]]}
+    assert running["max_total"] == 2
+    assert running["max_by_ds"] == 1
+
+
+async def test_soda_scan_execute_fan_out_records_metrics():
+    async def _mock_stream_soda_scan_logs(command, env, timer=None):
+        await anyio.sleep(0.05)
+        yield "Oops! 0 errors. 1 failure. 0 warnings. 2 pass."
+
+    checks = SodaCLCheck(sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None)
+    metrics = ScanMetrics(duration_buckets=(0.01,))
+
+    @flow(name="soda_scan_execute_fan_out_records_metrics")
+    async def test_flow():
+        return await soda_scan_execute_fan_out(
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            variables=None,
+            scans=[("a", checks), ("a", checks)],
+            max_concurrency=1,
+            metrics=metrics,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.stream_soda_scan_logs",
+        side_effect=_mock_stream_soda_scan_logs,
+    ):
+        await test_flow()
+
+    lines = metrics.render().splitlines()
+    assert 'soda_scans_started_total{data_source="a"} 2' in lines
+    assert 'soda_scans_finished_total{data_source="a",status="success"} 2' in lines
+    assert 'soda_scan_checks_total{data_source="a",outcome="fail"} 2' in lines
+    assert 'soda_scan_checks_total{data_source="a",outcome="pass"} 4' in lines
+    assert 'soda_scan_log_bytes_total{data_source="a"} 94' in lines
+    # The second scan waited for the first one to finish
+    assert 'soda_scan_queue_wait_seconds_bucket{data_source="a",le="0.01"} 1' in lines
+    assert 'soda_scan_queue_wait_seconds_count{data_source="a"} 2' in lines
+
+
+@mock.patch("prefect_soda_core.tasks.stream_soda_scan_logs")
+async def test_soda_scan_execute_records_metrics_of_failed_scans(
+    mock_stream_soda_scan_logs,
+):
+    mock_stream_soda_scan_logs.side_effect = RuntimeError("error!")
+    metrics = ScanMetrics()
+
+    @flow(name="soda_scan_execute_records_metrics_of_failed_scans")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            metrics=metrics,
+        )
+
+    with pytest.raises(RuntimeError, match="error!"):
+        await test_flow()
+
+    lines = metrics.render().splitlines()
+    assert 'soda_scans_started_total{data_source="test"} 1' in lines
+    assert 'soda_scans_finished_total{data_source="test",status="error"} 1' in lines
+
+
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_records_metrics_of_failing_checks(
+    mock_shell_run_command_fn,
+):
+    soda_logs = [
+        "Scan summary:",
+        "1/2 checks FAILED:",
+        "Oops! 1 failures. 0 warnings. 0 errors. 1 pass.",
+    ]
+
+    async def _mock_stream_soda_scan_logs(command, env, timer=None):
+        # Soda exits with code 2 when checks fail, which is not an error
+        for line in soda_logs:
+            yield line
+
+    metrics = ScanMetrics()
+
+    @flow(name="soda_scan_execute_records_metrics_of_failing_checks")
+    async def test_flow():
+        return await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            metrics=metrics,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.stream_soda_scan_logs",
+        side_effect=_mock_stream_soda_scan_logs,
+    ):
+        flow_result = await test_flow()
+
+    assert flow_result == soda_logs
+    mock_shell_run_command_fn.assert_not_called()
+    lines = metrics.render().splitlines()
+    assert 'soda_scan_checks_total{data_source="test",outcome="fail"} 1' in lines
+    assert 'soda_scan_checks_total{data_source="test",outcome="pass"} 1' in lines
+    assert 'soda_scan_log_bytes_total{data_source="test"} 81' in lines
+
+
+async def test_soda_scan_execute_fan_out_raises_once_all_scans_are_done():
+    finished = []
+
+    async def _mock_shell_run_command(command, **kwargs):
+        data_source_name = command.split(" ")[3]
+        if data_source_name == "b":
+            raise RuntimeError("Command failed with exit code 3:")
+        await anyio.sleep(0.05)
+        finished.append(data_source_name)
+        return []
+
+    checks = SodaCLCheck(sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None)
+
+    @flow(name="soda_scan_execute_fan_out_raises_once_all_scans_are_done")
+    async def test_flow():
+        return await soda_scan_execute_fan_out(
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            variables=None,
+            scans=[("a", checks), ("b", checks), ("c", checks)],
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=_mock_shell_run_command,
+    ):
+        with pytest.raises(RuntimeError) as exc_info:
+            await test_flow()
+
+    assert str(exc_info.value) == (
+        "1 of 3 Soda scans failed:\n"
+        "- data source b: Command failed with exit code 3:"
+    )
+    # The other scans have not been cancelled
+    assert sorted(finished) == ["a", "c"]
+
+
+@mock.patch("prefect_soda_core.tasks.shell_run_command.fn")
+async def test_soda_scan_execute_fan_out_discovers_data_sources(
+    mock_shell_run_command_fn,
+):
+    mock_shell_run_command_fn.return_value = _mock_shell_run_command_fn()
+
+    @flow(name="soda_scan_execute_fan_out_discovers_data_sources")
+    async def test_flow():
+        return await soda_scan_execute_fan_out(
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str="data_source a:\n  type: postgres\n"
+                "data_source b:\n  type: postgres\n",
+            ),
+            variables=None,
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+        )
+
+    with mock.patch("prefect_soda_core.tasks.SodaConfiguration.persist_configuration"):
+        flow_result = await test_flow()
+
+    assert sorted(flow_result) == ["a", "b"]
+    assert mock_shell_run_command_fn.call_count == 2
+
+
+async def test_soda_scan_execute_fan_out_without_scans_nor_checks_raises():
+    @flow(name="soda_scan_execute_fan_out_without_scans_nor_checks_raises")
+    async def test_flow():
+        return await soda_scan_execute_fan_out(
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            variables=None,
+        )
+
+    with pytest.raises(ValueError, match="Either scans or checks must be provided"):
+        await test_flow()
+
+
+async def test_soda_scan_execute_stream_logs_succeed():
+    async def _mock_stream_soda_scan_logs(command, env, timer=None):
+        for line in [
+            "first",
+            "second",
+            "Oops! 0 errors. 1 failure. 0 warnings. 2 pass.",
+        ]:
+            yield line
+
+    @flow(name="soda_scan_execute_stream_logs_succeed")
+    async def test_flow():
+        result = await soda_scan_execute(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path="/path/to/config.yaml",
+                configuration_yaml_str=None,
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml", sodacl_yaml_str=None
+            ),
+            variables=None,
+            stream_logs=True,
+            log_tail_size=1,
+        )
+        return result
+
+    with mock.patch(
+        "prefect_soda_core.tasks.stream_soda_scan_logs",
+        side_effect=_mock_stream_soda_scan_logs,
+    ):
+        flow_result = await test_flow()
+
+    assert flow_result["tail"] == ["Oops! 0 errors. 1 failure. 0 warnings. 2 pass."]
+    assert flow_result["lines"] == 3
+    assert flow_result["failures"] == 1
+    assert flow_result["passes"] == 2
+
+
+async def test_soda_scan_execute_fan_out_isolate_workspace(tmp_path):
+    commands = []
+
+    async def _mock_shell_run_command_fn(command, env, return_all):
+        commands.append(command)
+        scan_results_file = command.split(" -srf ")[1].split(" ")[0]
+        with open(scan_results_file, "w") as f:
+            json.dump({"command": command}, f)
+        return []
+
+    @flow(name="soda_scan_execute_fan_out_isolate_workspace")
+    async def test_flow():
+        return await soda_scan_execute_fan_out(
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "config.yaml"),
+                configuration_yaml_str="data_source a:\n  type: postgres\n",
+            ),
+            variables=None,
+            scans=[
+                (
+                    "a",
+                    SodaCLCheck(
+                        sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                        sodacl_yaml_str=f"checks for table_{index}:\n  - row_count > 0",
+                    ),
+                )
+                for index in range(3)
+            ],
+            max_concurrency_per_data_source=3,
+            return_scan_result_file_content=True,
+            isolate_workspace=True,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=_mock_shell_run_command_fn,
+    ):
+        flow_result = await test_flow()
+
+    # Every scan ran with its own files, removed once the scan completed
+    assert sorted(result["command"] for result in flow_result["a"]) == sorted(commands)
+    paths = [
+        path
+        for command in commands
+        for path in command.split(" ")[5:]
+        if path != "-srf"
+    ]
+    assert len(set(paths)) == len(paths) == 9
+    assert not any(os.path.exists(path) for path in paths)
+    assert os.listdir(tmp_path) == []
+
+
+async def test_soda_scan_execute_sharded(tmp_path):
+    async def _mock_shell_run_command_fn(command, env, return_all):
+        scan_results_file = command.split(" -srf ")[1].split(" ")[0]
+        sodacl_yaml_path = command.split(" ")[-1]
+        with open(scan_results_file, "w") as f:
+            json.dump(
+                {
+                    "hasFailures": "orders" in open(sodacl_yaml_path).read(),
+                    "checks": [{"location": {"filePath": sodacl_yaml_path}}],
+                },
+                f,
+            )
+        return []
+
+    @flow(name="soda_scan_execute_sharded")
+    async def test_flow():
+        return await soda_scan_execute_sharded(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "config.yaml"),
+                configuration_yaml_str="data_source test:\n  type: postgres\n",
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                sodacl_yaml_str=(
+                    "checks for customers:\n  - row_count > 0\n"
+                    "checks for orders:\n  - row_count > 0\n"
+                ),
+            ),
+            variables=None,
+            max_concurrency=2,
+            isolate_workspace=True,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=_mock_shell_run_command_fn,
+    ) as mock_shell_run_command_fn:
+        flow_result = await test_flow()
+
+    assert mock_shell_run_command_fn.call_count == 2
+    assert flow_result["hasFailures"] is True
+    assert len(flow_result["checks"]) == 2
+
+
+async def test_soda_scan_execute_sharded_writes_shards_to_temporary_directory(
+    tmp_path,
+):
+    sodacl_yaml_paths = []
+
+    async def _mock_shell_run_command_fn(command, env, return_all):
+        sodacl_yaml_paths.append(command.split(" ")[-1])
+        with open(command.split(" -srf ")[1].split(" ")[0], "w") as f:
+            json.dump({"checks": []}, f)
+        return []
+
+    @flow(name="soda_scan_execute_sharded_writes_shards_to_temporary_directory")
+    async def test_flow():
+        return await soda_scan_execute_sharded(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "config.yaml"),
+                configuration_yaml_str="data_source test:\n  type: postgres\n",
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                sodacl_yaml_str=(
+                    "checks for customers:\n  - row_count > 0\n"
+                    "checks for orders:\n  - row_count > 0\n"
+                ),
+            ),
+            variables=None,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=_mock_shell_run_command_fn,
+    ):
+        await test_flow()
+
+    assert len(sodacl_yaml_paths) == 2
+    assert all(os.path.dirname(path) != str(tmp_path) for path in sodacl_yaml_paths)
+    # The shards and their scan results have been removed
+    assert not any(os.path.exists(path) for path in sodacl_yaml_paths)
+    assert os.listdir(tmp_path) == ["config.yaml"]
+
+
+async def test_soda_scan_execute_sharded_raises_once_all_shards_are_done(tmp_path):
+    finished = []
+
+    async def _mock_shell_run_command_fn(command, env, return_all):
+        sodacl_yaml_str = open(command.split(" ")[-1]).read()
+        if "orders" in sodacl_yaml_str:
+            raise RuntimeError("Command failed with exit code 3:")
+        await anyio.sleep(0.05)
+        with open(command.split(" -srf ")[1].split(" ")[0], "w") as f:
+            json.dump({"checks": []}, f)
+        finished.append(sodacl_yaml_str)
+        return []
+
+    @flow(name="soda_scan_execute_sharded_raises_once_all_shards_are_done")
+    async def test_flow():
+        return await soda_scan_execute_sharded(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "config.yaml"),
+                configuration_yaml_str="data_source test:\n  type: postgres\n",
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                sodacl_yaml_str=(
+                    "checks for orders:\n  - row_count > 0\n"
+                    "checks for customers:\n  - row_count > 0\n"
+                ),
+            ),
+            variables=None,
+            isolate_workspace=True,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=_mock_shell_run_command_fn,
+    ):
+        with pytest.raises(RuntimeError) as exc_info:
+            await test_flow()
+
+    assert str(exc_info.value) == (
+        "1 of 2 Soda scans failed:\n- shard 0: Command failed with exit code 3:"
+    )
+    # The other shard has not been cancelled
+    assert len(finished) == 1
+
+
+async def test_soda_scan_execute_fan_out_longest_first(tmp_path):
+    duration_store = ScanDurationStore(path=str(tmp_path / "durations.db"))
+    sodacl_check = SodaCLCheck(
+        sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+        sodacl_yaml_str="checks for orders:\n  - row_count > 0\n",
+    )
+    checks_hash = hash_sodacl_content(sodacl_check.sodacl_yaml_str)
+    duration_store.record("short", checks_hash, 1.0)
+    duration_store.record("long", checks_hash, 10.0)
+    commands = []
+
+    async def _mock_shell_run_command_fn(command, env, return_all):
+        commands.append(command)
+        return []
+
+    @flow(name="soda_scan_execute_fan_out_longest_first")
+    async def test_flow():
+        return await soda_scan_execute_fan_out(
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "config.yaml"),
+                configuration_yaml_str="data_source a:\n  type: postgres\n",
+            ),
+            variables=None,
+            scans=[("short", sodacl_check), ("long", sodacl_check)],
+            max_concurrency=1,
+            duration_store=duration_store,
+        )
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=_mock_shell_run_command_fn,
+    ):
+        flow_result = await test_flow()
+
+    assert list(flow_result) == ["short", "long"]
+    assert [command.split(" ")[3] for command in commands] == ["long", "short"]
+    # The durations of both scans have been recorded
+    assert duration_store.get_expected_duration("long", checks_hash) < 10.0
+
+
+async def test_soda_scan_execute_fan_out_duration_store_off_event_loop(tmp_path):
+    duration_store = ScanDurationStore(path=str(tmp_path / "durations.db"))
+    sodacl_check = SodaCLCheck(
+        sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+        sodacl_yaml_str="checks for orders:\n  - row_count > 0\n",
+    )
+    store_threads = []
+
+    def _spy(method):
+        def wrapper(*args, **kwargs):
+            store_threads.append(threading.current_thread())
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    @flow(name="soda_scan_execute_fan_out_duration_store_off_event_loop")
+    async def test_flow():
+        event_loop_thread = threading.current_thread()
+        await soda_scan_execute_fan_out(
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "config.yaml"),
+                configuration_yaml_str="data_source a:\n  type: postgres\n",
+            ),
+            variables=None,
+            scans=[("a", sodacl_check), ("b", sodacl_check)],
+            duration_store=duration_store,
+        )
+        return event_loop_thread
+
+    with mock.patch(
+        "prefect_soda_core.tasks.shell_run_command.fn",
+        side_effect=lambda **kwargs: [],
+    ), mock.patch.object(
+        duration_store, "record", _spy(duration_store.record)
+    ), mock.patch.object(
+        duration_store, "sort_longest_first", _spy(duration_store.sort_longest_first)
+    ):
+        event_loop_thread = await test_flow()
+
+    # One sort and two records, none of them on the event loop
+    assert len(store_threads) == 3
+    assert event_loop_thread not in store_threads
+
+
+@mock.patch("prefect_soda_core.tasks.execute_dataframe_scan_in_process")
+async def test_soda_scan_dataframe_succeed(
+    mock_execute_dataframe_scan_in_process, tmp_path
+):
+    scan_results_file = str(tmp_path / "results.json")
+    orders = object()
+
+    def _mock_execute(scan_results_file, **kwargs):
+        with open(scan_results_file, "w") as f:
+            json.dump({"checks": []}, f)
+        return 2, ["this", "is", "the", "log"]
+
+    mock_execute_dataframe_scan_in_process.side_effect = _mock_execute
+
+    @flow(name="soda_scan_dataframe_succeed")
+    async def test_flow():
+        return await soda_scan_dataframe(
+            dataframes={"orders": orders},
+            checks=SodaCLCheck(
+                sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                sodacl_yaml_str="checks for orders:\n  - row_count > 0\n",
+            ),
+            variables={"foo": "bar"},
+            scan_results_file=scan_results_file,
+            return_scan_result_file_content=True,
+        )
+
+    flow_result = await test_flow()
+
+    assert flow_result == {"checks": []}
+    mock_execute_dataframe_scan_in_process.assert_called_once_with(
+        dataframes={"orders": orders},
+        data_source_name="dask",
+        sodacl_yaml_strs=["checks for orders:\n  - row_count > 0\n"],
+        variables={"foo": "bar"},
+        scan_results_file=scan_results_file,
+        verbose=False,
+    )
+
+
+@mock.patch("prefect_soda_core.tasks.execute_dataframe_scan_in_process")
+async def test_soda_scan_dataframe_raises(mock_execute_dataframe_scan_in_process):
+    mock_execute_dataframe_scan_in_process.return_value = (3, ["Missing module"])
+    metrics = ScanMetrics()
+
+    @flow(name="soda_scan_dataframe_raises")
+    async def test_flow():
+        return await soda_scan_dataframe(
+            dataframes={"orders": object()},
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml",
+                sodacl_yaml_str="checks for orders:\n  - row_count > 0\n",
+            ),
+            metrics=metrics,
+        )
+
+    with pytest.raises(RuntimeError, match="exit code 3: Missing module"):
+        await test_flow()
+
+    assert 'soda_scans_finished_total{data_source="dask",status="error"} 1' in (
+        metrics.render()
+    )
+
+
+@mock.patch("prefect_soda_core.tasks.execute_spark_scan_in_process")
+async def test_soda_scan_spark_dataframe_succeed(mock_execute_spark_scan_in_process):
+    mock_execute_spark_scan_in_process.return_value = (2, ["this", "is", "the", "log"])
+    spark_session = object()
+    orders = object()
+
+    @flow(name="soda_scan_spark_dataframe_succeed")
+    async def test_flow():
+        return await soda_scan_spark_dataframe(
+            spark_session=spark_session,
+            dataframes={"orders": orders},
+            checks=SodaCLCheck(
+                sodacl_yaml_path="/path/to/checks.yaml",
+                sodacl_yaml_str="checks for orders:\n  - row_count > 0\n",
+            ),
+        )
+
+    flow_result = await test_flow()
+
+    assert flow_result == "this is the log".split(" ")
+    mock_execute_spark_scan_in_process.assert_called_once_with(
+        spark_session=spark_session,
+        dataframes={"orders": orders},
+        data_source_name="spark_df",
+        sodacl_yaml_strs=["checks for orders:\n  - row_count > 0\n"],
+        variables=None,
+        scan_results_file=None,
+        verbose=False,
+    )
+
+
+async def test_soda_scan_spark_dataframe_local_session(tmp_path):
+    pyspark_sql = pytest.importorskip("pyspark.sql")
+    pytest.importorskip("soda.data_sources.spark_df_data_source")
+    spark = (
+        pyspark_sql.SparkSession.builder.master("local[1]")
+        .appName("prefect-soda-core-tests")
+        .getOrCreate()
+    )
+    orders = spark.createDataFrame([(1, 10.0), (2, None)], ["id", "amount"])
+
+    @flow(name="soda_scan_spark_dataframe_local_session")
+    async def test_flow():
+        return await soda_scan_spark_dataframe(
+            spark_session=spark,
+            dataframes={"orders": orders},
+            checks=SodaCLCheck(
+                sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                sodacl_yaml_str=(
+                    "checks for orders:\n"
+                    "  - row_count = 2\n"
+                    "  - missing_count(amount) = 0\n"
+                ),
+            ),
+            scan_results_file=str(tmp_path / "results.json"),
+            return_scan_result=True,
+        )
+
+    try:
+        scan_result = await test_flow()
+    finally:
+        spark.stop()
+
+    assert scan_result.outcome_counts["pass"] == 1
+    assert scan_result.outcome_counts["fail"] == 1
+
+
+async def test_soda_scan_execute_sharded_in_process_duckdb(tmp_path):
+    duckdb = pytest.importorskip("duckdb")
+    pytest.importorskip("soda.data_sources.duckdb_data_source")
+    database_path = str(tmp_path / "test.duckdb")
+    with duckdb.connect(database_path) as connection:
+        connection.execute(
+            "CREATE TABLE customers AS SELECT 'on' AS active UNION ALL SELECT 'off'"
+        )
+        connection.execute("CREATE TABLE orders AS SELECT * FROM range(3) t(id)")
+
+    @flow(name="soda_scan_execute_sharded_in_process_duckdb")
+    async def test_flow():
+        return await soda_scan_execute_sharded(
+            data_source_name="test",
+            configuration=SodaConfiguration(
+                configuration_yaml_path=str(tmp_path / "configuration.yaml"),
+                configuration_yaml_str=(
+                    f"data_source test:\n  type: duckdb\n  path: {database_path}\n"
+                ),
+            ),
+            checks=SodaCLCheck(
+                sodacl_yaml_path=str(tmp_path / "checks.yaml"),
+                sodacl_yaml_str=(
+                    "# Booleans of YAML 1.1 are plain strings for Soda\n"
+                    "checks for customers:\n"
+                    "  - invalid_count(active) = 0:\n"
+                    "      valid values: [on, off]\n"
+                    "checks for orders:\n"
+                    "  - row_count = 3\n"
+                ),
+            ),
+            variables=None,
+            execution_mode="in_process",
+        )
+
+    flow_result = await test_flow()
+
+    assert sorted(
+        (check["table"], check["outcome"]) for check in flow_result["checks"]
+    ) == [("customers", "pass"), ("orders", "pass")]
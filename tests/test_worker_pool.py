@@ -0,0 +1,179 @@
+import subprocess
+import sys
+import textwrap
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from prefect_soda_core.worker_pool import SodaWorkerPool
+
+
+@pytest.fixture(scope="module")
+def soda_worker_pool():
+    with SodaWorkerPool(size=1, max_jobs_per_worker=2, preload_modules=[]) as pool:
+        yield pool
+
+
+def test_soda_worker_pool_with_invalid_size_raises():
+    with pytest.raises(ValueError, match="must be at least 1"):
+        SodaWorkerPool(size=0)
+
+
+def test_soda_worker_pool_execute_scan_returns_exit_code_and_logs(
+    soda_worker_pool, tmp_path
+):
+    exit_code, soda_logs = soda_worker_pool.execute_scan(
+        data_source_name="test",
+        configuration_yaml_path=str(tmp_path / "missing_config.yaml"),
+        sodacl_yaml_paths=[str(tmp_path / "missing_checks.yaml")],
+        variables={"foo": "bar"},
+    )
+
+    assert exit_code == 3
+    assert any("missing_config.yaml does not exist" in log for log in soda_logs)
+
+
+def test_soda_worker_pool_recycles_workers(soda_worker_pool, tmp_path):
+    scan_kwargs = dict(
+        data_source_name="test",
+        configuration_yaml_path=str(tmp_path / "missing_config.yaml"),
+        sodacl_yaml_paths=[str(tmp_path / "missing_checks.yaml")],
+    )
+    soda_worker_pool.execute_scan(**scan_kwargs)
+    worker_pids = soda_worker_pool.worker_pids
+    soda_worker_pool.execute_scan(**scan_kwargs)
+    soda_worker_pool.execute_scan(**scan_kwargs)
+
+    assert soda_worker_pool.worker_pids != worker_pids
+    assert len(soda_worker_pool.worker_pids) == 1
+
+
+def test_soda_worker_pool_shutdown_raises_on_execute(tmp_path):
+    pool = SodaWorkerPool(size=1, preload_modules=[])
+    pool.shutdown()
+
+    assert pool.worker_pids == []
+    with pytest.raises(RuntimeError, match="has been shut down"):
+        pool.execute_scan(
+            data_source_name="test",
+            configuration_yaml_path=str(tmp_path / "config.yaml"),
+            sodacl_yaml_paths=[str(tmp_path / "checks.yaml")],
+        )
+
+
+def test_soda_worker_pool_starts_workers_on_first_scan(tmp_path):
+    pool = SodaWorkerPool(size=2, preload_modules=[])
+
+    assert pool.worker_pids == []
+
+    pool.execute_scan(
+        data_source_name="test",
+        configuration_yaml_path=str(tmp_path / "missing_config.yaml"),
+        sodacl_yaml_paths=[str(tmp_path / "missing_checks.yaml")],
+    )
+
+    assert len(pool.worker_pids) == 2
+    pool.shutdown()
+
+
+def test_soda_worker_pool_created_at_module_level(tmp_path):
+    # Every worker imports the main module again, creating the pool again
+    script_path = tmp_path / "flow_script.py"
+    script_path.write_text(
+        textwrap.dedent(
+            f"""
+            from prefect_soda_core.worker_pool import SodaWorkerPool
+
+            soda_worker_pool = SodaWorkerPool(size=1, preload_modules=[])
+
+            if __name__ == "__main__":
+                with soda_worker_pool:
+                    exit_code, _ = soda_worker_pool.execute_scan(
+                        data_source_name="test",
+                        configuration_yaml_path={str(tmp_path / "config.yaml")!r},
+                        sodacl_yaml_paths=[{str(tmp_path / "checks.yaml")!r}],
+                    )
+                print(exit_code)
+            """
+        )
+    )
+
+    process = subprocess.run(
+        [sys.executable, str(script_path)],
+        capture_output=True,
+        text=True,
+        env={"PYTHONPATH": str(Path(__file__).parents[1])},
+        timeout=120,
+    )
+
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip().splitlines()[-1] == "3"
+
+
+def test_soda_worker_pool_shutdown_does_not_replace_dead_worker(tmp_path):
+    pool = SodaWorkerPool(size=1, preload_modules=[])
+    scan_kwargs = dict(
+        data_source_name="test",
+        configuration_yaml_path=str(tmp_path / "config.yaml"),
+        sodacl_yaml_paths=[str(tmp_path / "checks.yaml")],
+    )
+    pool.execute_scan(**scan_kwargs)
+    worker = pool._workers[0]
+
+    def _shutdown_during_scan():
+        # The pool is shut down while the scan is in flight
+        pool._closed = True
+        raise EOFError()
+
+    with mock.patch.object(worker, "connection") as mock_connection:
+        mock_connection.recv.side_effect = _shutdown_during_scan
+        with pytest.raises(RuntimeError, match="died while running the scan"):
+            pool.execute_scan(**scan_kwargs)
+
+    assert pool.worker_pids == []
+
+
+def test_soda_worker_pool_shutdown_wakes_waiting_scans(tmp_path):
+    pool = SodaWorkerPool(size=1, preload_modules=[])
+    scan_kwargs = dict(
+        data_source_name="test",
+        configuration_yaml_path=str(tmp_path / "config.yaml"),
+        sodacl_yaml_paths=[str(tmp_path / "checks.yaml")],
+    )
+    pool.execute_scan(**scan_kwargs)
+    # The only worker is busy, so that the scans wait for it
+    pool._idle_workers.get()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(pool.execute_scan, **scan_kwargs) for _ in range(2)]
+        time.sleep(0.5)
+        assert not any(future.done() for future in futures)
+
+        pool.shutdown()
+
+        for future in futures:
+            with pytest.raises(RuntimeError, match="has been shut down"):
+                future.result(timeout=10)
+
+
+def test_soda_worker_pool_sets_env_of_scan_only(soda_worker_pool, tmp_path):
+    configuration_yaml_path = tmp_path / "config.yaml"
+    configuration_yaml_path.write_text("data_source test:\n  type: ${SODA_TYPE}\n")
+    sodacl_yaml_path = tmp_path / "checks.yaml"
+    sodacl_yaml_path.write_text("checks for table:\n  - row_count > 0\n")
+    scan_kwargs = dict(
+        data_source_name="test",
+        configuration_yaml_path=str(configuration_yaml_path),
+        sodacl_yaml_paths=[str(sodacl_yaml_path)],
+    )
+
+    _, soda_logs = soda_worker_pool.execute_scan(
+        **scan_kwargs, env={"SODA_TYPE": "from_env"}
+    )
+    assert any('Data source type "from_env" not found' in log for log in soda_logs)
+
+    _, soda_logs = soda_worker_pool.execute_scan(**scan_kwargs)
+    assert not any("from_env" in log for log in soda_logs)
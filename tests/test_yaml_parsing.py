@@ -0,0 +1,39 @@
+from unittest import mock
+
+import pytest
+from yaml.error import YAMLError
+
+from prefect_soda_core import yaml_parsing
+from prefect_soda_core.yaml_parsing import load_yaml_str
+
+
+def test_load_yaml_str_parses_once_per_content():
+    yaml_str = "checks for memoized_table:\n  - row_count > 0\n"
+
+    with mock.patch.object(yaml_parsing, "load", wraps=yaml_parsing.load) as mock_load:
+        first = load_yaml_str(yaml_str)
+        second = load_yaml_str(str(yaml_str))
+
+    assert first == {"checks for memoized_table": ["row_count > 0"]}
+    assert second is first
+    assert mock_load.call_count == 1
+
+
+def test_load_yaml_str_memoizes_errors():
+    yaml_str = "checks for invalid_table: [row_count > 0"
+
+    with mock.patch.object(yaml_parsing, "load", wraps=yaml_parsing.load) as mock_load:
+        for _ in range(2):
+            with pytest.raises(YAMLError):
+                load_yaml_str(yaml_str)
+
+    assert mock_load.call_count == 1
+
+
+def test_load_yaml_str_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(yaml_parsing, "YAML_PARSE_CACHE_SIZE", 2)
+
+    for index in range(5):
+        load_yaml_str(f"key: {index}")
+
+    assert len(yaml_parsing._parsed_yaml) <= 2